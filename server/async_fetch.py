@@ -0,0 +1,103 @@
+"""
+Async fetch mode for the enrichment worker.
+
+A prefork worker process blocks on one profile fetch at a time, for up to
+ENRICH_HTTP_TIMEOUT seconds, so throughput is bounded by the process
+count. With ENRICH_FETCH_MODE=async, batch enrichment hands each lane of
+URLs to one task that keeps up to ENRICH_ASYNC_CONCURRENCY fetches in
+flight on an httpx.AsyncClient. Parsing runs on a small thread pool so a
+large page does not hold up the event loop between network events, and
+the blocking Redis writes (the profile cache, on_result storing results)
+run off the loop too.
+
+Results and fallbacks match enrich_linkedin_task: non-200 responses are
+reported as {"error": ...}, fetch or parse exceptions fall back to the URL
+slug, and only parsed pages are cached.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import httpx
+
+import http_client
+from enrichment_cache import enrichment_cache
+from profile_parser import parse_profile, slug_profile
+from snapshot_store import snapshot_store
+
+logger = logging.getLogger(__name__)
+
+# "sync": one enrich_linkedin_task per URL; "async": one task per batch lane
+ENRICH_FETCH_MODE = os.getenv("ENRICH_FETCH_MODE", "sync")
+ENRICH_ASYNC_CONCURRENCY = int(os.getenv("ENRICH_ASYNC_CONCURRENCY", "20"))
+# Parsing holds the GIL, so more threads than this buy nothing
+PARSE_THREADS = 2
+
+_parse_pool = ThreadPoolExecutor(max_workers=PARSE_THREADS, thread_name_prefix="profile-parse")
+
+
+def _transport() -> httpx.AsyncBaseTransport:
+    # Retries connection failures only; unlike the requests session, status
+    # codes are not retried, a 429 is reported like any other non-200
+    return httpx.AsyncHTTPTransport(retries=http_client.ENRICH_HTTP_RETRIES)
+
+
+def _save_and_parse(html: str, url: str) -> dict:
+    # On the parse pool, so snapshot file and cache writes stay off the event loop too
+    snapshot_store.save(url, html)
+    result = parse_profile(html, url)
+    enrichment_cache.set(url, result)
+    return result
+
+
+async def _enrich_one(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str) -> dict:
+    async with semaphore:
+        try:
+            response = await client.get(url, headers={"User-Agent": http_client.user_agent()})
+            if response.status_code != 200:
+                return {"error": f"Failed to fetch profile: {response.status_code}"}
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(_parse_pool, _save_and_parse, response.text, url)
+        except Exception as e:
+            logger.warning("Scraping error: %s", e)
+            return slug_profile(url)
+    return result
+
+
+async def fetch_profiles(
+    urls: List[str],
+    concurrency: int = ENRICH_ASYNC_CONCURRENCY,
+    on_result: Optional[Callable[[int, dict], None]] = None,
+) -> List[dict]:
+    """
+    Enrich urls with at most concurrency fetches in flight; results are in
+    input order. on_result(index, result) runs as each one finishes, on a
+    worker thread so its blocking writes do not stall the other fetches.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        transport=_transport(),
+        limits=limits,
+        timeout=http_client.ENRICH_HTTP_TIMEOUT,
+        follow_redirects=True,
+        headers=http_client.DEFAULT_HEADERS,
+    ) as client:
+        async def run(index: int, url: str) -> dict:
+            result = await _enrich_one(client, semaphore, url)
+            if on_result is not None:
+                await asyncio.to_thread(on_result, index, result)
+            return result
+
+        return await asyncio.gather(*(run(index, url) for index, url in enumerate(urls)))
+
+
+def enrich_many(
+    urls: List[str],
+    concurrency: int = ENRICH_ASYNC_CONCURRENCY,
+    on_result: Optional[Callable[[int, dict], None]] = None,
+) -> List[dict]:
+    """fetch_profiles from synchronous code (a Celery task)."""
+    return asyncio.run(fetch_profiles(urls, concurrency, on_result))
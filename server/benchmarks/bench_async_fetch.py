@@ -0,0 +1,97 @@
+"""
+Benchmark: profiles enriched per second by one worker process against a
+slow local HTTP server (every response takes DELAY seconds), standing in
+for LinkedIn.
+
+- sync: the prefork path, one fetch at a time (http_client session);
+- async: async_fetch with ENRICH_ASYNC_CONCURRENCY fetches in flight.
+
+Both run in this single process, so profiles/s is throughput per core.
+CPU ms per profile shows what each fetch costs once the waiting is gone.
+
+Run from server/:  python benchmarks/bench_async_fetch.py
+"""
+import multiprocessing
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import async_fetch
+import http_client
+from enrichment_cache import enrichment_cache
+from profile_parser import parse_profile
+
+DELAY = 0.2
+SYNC_PROFILES = 20
+ASYNC_PROFILES = 400
+BODY = (
+    b'<html><head><meta property="og:title" content="Jane Smith - CTO at TechCo | LinkedIn">'
+    + b"<p>filler</p>" * 2000
+    + b"</head></html>"
+)
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port):
+    server = ThreadingHTTPServer(("127.0.0.1", port), SlowHandler)
+    server.request_queue_size = 1024
+    server.serve_forever()
+
+
+def run_sync(urls):
+    session = http_client.get_session()
+    for url in urls:
+        response = session.get(url, headers={"User-Agent": http_client.user_agent()}, timeout=10)
+        parse_profile(response.text, url)
+
+
+def run_async(urls):
+    async_fetch.enrich_many(urls)
+
+
+def measure(label, fn, urls):
+    wall, cpu = time.perf_counter(), time.process_time()
+    fn(urls)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"  {label:34s} {len(urls) / wall:8.1f} profiles/s   {cpu / len(urls) * 1000:6.2f} ms CPU/profile")
+
+
+def main():
+    enrichment_cache.redis = None  # measure fetching and parsing only
+    http_client.user_agent()  # build the session and user-agent pool up front
+    port = 18765
+    server = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    time.sleep(0.5)
+    base = f"http://127.0.0.1:{port}/in/profile-"
+    try:
+        print(f"{DELAY * 1000:.0f} ms per response, {len(BODY) // 1024} KiB pages, one process")
+        measure("sync (one fetch at a time)", run_sync, [base + str(i) for i in range(SYNC_PROFILES)])
+        measure(
+            f"async ({async_fetch.ENRICH_ASYNC_CONCURRENCY} in flight)",
+            run_async, [base + str(i) for i in range(ASYNC_PROFILES)],
+        )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: encoding a full 500-item page (the le=500 maximum) of connections
+and logs via the pydantic models vs. the orjson fast path in serializers.py.
+
+Run from server/:  python benchmarks/bench_list_serialization.py
+"""
+import os
+import sys
+import timeit
+import uuid
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models import Connection, Log, PaginatedConnections, PaginatedLogs
+from serializers import JSON, encode_connections, encode_logs, paginated, render
+
+PAGE_SIZE = 500
+ROUNDS = 20
+
+
+def make_connections(n):
+    now = datetime.datetime.utcnow()
+    return [
+        Connection(
+            id=str(uuid.uuid4()),
+            name=f"Person {i}",
+            role="Engineering Manager",
+            company="Acme Corp",
+            location="San Francisco",
+            industry="Technology",
+            howMet="Conference",
+            frequency=30,
+            lastContact=now,
+            notes="Met at PyCon. " * 40,
+            linkedin=f"https://linkedin.com/in/person-{i}",
+            email=f"person{i}@acme.com",
+            goals="Collaborate on open source",
+            tags_json='["work", "python", "Investor"]',
+            created_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def make_logs(n):
+    now = datetime.datetime.utcnow()
+    return [
+        Log(
+            id=str(uuid.uuid4()),
+            connection_id=str(uuid.uuid4()),
+            type="meeting",
+            notes="Had coffee to discuss the project roadmap. " * 5,
+            tags_json='["Coffee Chat"]',
+            created_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def bench(label, fn):
+    best = min(timeit.repeat(fn, number=1, repeat=ROUNDS))
+    size = len(fn())
+    print(f"  {label:<12} {best * 1000:8.2f} ms   {size / 1024:8.1f} KiB")
+    return best
+
+
+def main():
+    connections = make_connections(PAGE_SIZE)
+    logs = make_logs(PAGE_SIZE)
+
+    def connections_model():
+        page = PaginatedConnections(items=connections, total=PAGE_SIZE, limit=PAGE_SIZE, offset=0)
+        return JSONResponse(jsonable_encoder(page)).body
+
+    def connections_fast():
+        return render(JSON, paginated(encode_connections(connections), PAGE_SIZE, PAGE_SIZE, 0)).body
+
+    def logs_model():
+        page = PaginatedLogs(items=logs, total=PAGE_SIZE, limit=PAGE_SIZE, offset=0)
+        return JSONResponse(jsonable_encoder(page)).body
+
+    def logs_fast():
+        return render(JSON, paginated(encode_logs(logs), PAGE_SIZE, PAGE_SIZE, 0)).body
+
+    print(f"GET /connections, {PAGE_SIZE} items (best of {ROUNDS})")
+    slow = bench("pydantic", connections_model)
+    fast = bench("orjson", connections_fast)
+    print(f"  speedup      {slow / fast:8.1f}x")
+
+    print(f"GET /logs, {PAGE_SIZE} items (best of {ROUNDS})")
+    slow = bench("pydantic", logs_model)
+    fast = bench("orjson", logs_fast)
+    print(f"  speedup      {slow / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
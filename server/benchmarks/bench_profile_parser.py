@@ -0,0 +1,114 @@
+"""
+Benchmark: extracting a profile from a large LinkedIn-like page with a full
+BeautifulSoup tree (the previous implementation, reproduced below) vs. the
+targeted extractor in profile_parser.py. Also checks both agree on every
+saved fixture.
+
+Run from server/:  python benchmarks/bench_profile_parser.py
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from profile_parser import parse_profile
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures" / "profiles"
+URL = "https://www.linkedin.com/in/test-user"
+ROUNDS = 20
+
+
+def soup_parse(html, url):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    name = "Unknown"
+    role = ""
+    company = ""
+    location = ""
+
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string)
+            graph = data.get("@graph", [data])
+            for item in graph:
+                if item.get("@type") == "Person":
+                    name = item.get("name", name)
+                    address = item.get("address", {})
+                    if isinstance(address, dict):
+                        location = address.get("addressLocality", "")
+                    works_for = item.get("worksFor", [])
+                    if works_for and len(works_for) > 0:
+                        current_job = works_for[0]
+                        company = current_job.get("name", "")
+                        job_location = current_job.get("location", "")
+                        if job_location and not location:
+                            location = job_location
+                    job_titles = item.get("jobTitle", [])
+                    if job_titles and len(job_titles) > 0:
+                        for title in job_titles:
+                            if "***" not in title:
+                                role = title
+                                break
+                    break
+        except (json.JSONDecodeError, TypeError):
+            continue
+
+    if name == "Unknown":
+        og_title = soup.find("meta", property="og:title")
+        if og_title:
+            content = og_title.get("content", "")
+            main_part = content.split("|")[0].strip()
+            parts = main_part.split(" - ", 1)
+            name = parts[0].strip()
+            if len(parts) > 1:
+                headline = parts[1].strip()
+                if " at " in headline:
+                    role_company = headline.split(" at ", 1)
+                    role = role_company[0].strip()
+                    company = role_company[1].strip()
+                elif headline[0].isupper() and len(headline.split()) <= 4:
+                    company = headline
+                else:
+                    role = headline
+
+    if name == "Unknown" or "Join LinkedIn" in name:
+        slug = url.split('/')[-1] or url.split('/')[-2]
+        name = slug.replace('-', ' ').title()
+
+    return {"name": name, "role": role, "company": company, "location": location, "industry": ""}
+
+
+def outcome(fn, html):
+    try:
+        return fn(html, URL)
+    except Exception as e:
+        return type(e).__name__
+
+
+def bench(fn, html):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(html, URL)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        assert outcome(soup_parse, html) == outcome(parse_profile, html), path.name
+
+    html = (FIXTURES / "json_ld_graph_large.html").read_text(encoding="utf-8")
+    soup_time = bench(soup_parse, html)
+    targeted_time = bench(parse_profile, html)
+    print(f"{len(html) // 1024} KiB page, {ROUNDS} rounds")
+    print(f"  BeautifulSoup tree    {soup_time * 1000:8.2f} ms/page")
+    print(f"  targeted extractor    {targeted_time * 1000:8.2f} ms/page  ({soup_time / targeted_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
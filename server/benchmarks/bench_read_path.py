@@ -0,0 +1,113 @@
+"""
+Benchmark: reading a 500-row page of connections through the ORM
+(select(Connection), hydrated and tracked in the identity map) vs. the Core
+read path in queries.py (selected columns mapped into __slots__ DTOs).
+
+Reports peak memory per page (tracemalloc) and CPU time per request.
+
+Run from server/:  python benchmarks/bench_read_path.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from models import Connection, User
+from queries import fetch_connections
+from serializers import JSON, encode_connections, paginated, render
+
+PAGE_SIZE = 500
+ROUNDS = 50
+
+
+def seed(engine):
+    now = datetime.datetime.utcnow()
+    with Session(engine) as session:
+        user = User(firebase_uid="bench", email="bench@example.com", name="Bench")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        for i in range(PAGE_SIZE):
+            session.add(Connection(
+                id=str(uuid.uuid4()),
+                user_id=user.id,
+                name=f"Person {i}",
+                role="Engineering Manager",
+                company="Acme Corp",
+                location="San Francisco",
+                industry="Technology",
+                howMet="Conference",
+                frequency=30,
+                lastContact=now,
+                notes="Met at PyCon. " * 40,
+                linkedin=f"https://linkedin.com/in/person-{i}",
+                email=f"person{i}@acme.com",
+                goals="Collaborate on open source",
+                tags_json='["work", "python"]',
+                created_at=now,
+            ))
+        session.commit()
+        return user.id
+
+
+def orm_page(engine, user_id):
+    with Session(engine) as session:
+        rows = session.exec(
+            select(Connection).where(Connection.user_id == user_id).limit(PAGE_SIZE)
+        ).all()
+        return render(JSON, paginated(encode_connections(rows), PAGE_SIZE, PAGE_SIZE, 0)).body
+
+
+def core_page(engine, user_id):
+    with Session(engine) as session:
+        rows = fetch_connections(session, [Connection.user_id == user_id], limit=PAGE_SIZE)
+        return render(JSON, paginated(encode_connections(rows), PAGE_SIZE, PAGE_SIZE, 0)).body
+
+
+def peak_memory(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def cpu_time(fn, *args):
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.process_time()
+        fn(*args)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    user_id = seed(engine)
+
+    # Warm up statement caches before measuring
+    orm_page(engine, user_id)
+    core_page(engine, user_id)
+
+    orm_mem, core_mem = peak_memory(orm_page, engine, user_id), peak_memory(core_page, engine, user_id)
+    orm_cpu, core_cpu = cpu_time(orm_page, engine, user_id), cpu_time(core_page, engine, user_id)
+
+    print(f"GET /connections, {PAGE_SIZE}-row page")
+    print(f"  {'':<6} {'peak memory':>14} {'cpu/request':>14}")
+    print(f"  {'ORM':<6} {orm_mem / 1024:11.1f} KiB {orm_cpu * 1000:11.2f} ms")
+    print(f"  {'Core':<6} {core_mem / 1024:11.1f} KiB {core_cpu * 1000:11.2f} ms")
+    print(f"  memory -{(1 - core_mem / orm_mem) * 100:.0f}%, cpu -{(1 - core_cpu / orm_cpu) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: JSON (orjson) vs. MessagePack encoding of a 500-item page of
+connections and logs -- encode time and payload size, raw and brotli'd.
+
+Run from server/:  python benchmarks/bench_wire_format.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_list_serialization import PAGE_SIZE, make_connections, make_logs
+from compression import compress
+from serializers import JSON, MSGPACK, encode_connections, encode_logs, paginated
+
+ROUNDS = 20
+
+
+def bench(label, fmt, encode):
+    fn = lambda: fmt.dumps(paginated(encode(fmt), PAGE_SIZE, PAGE_SIZE, 0))
+    best = min(timeit.repeat(fn, number=1, repeat=ROUNDS))
+    body = fn()
+    print(
+        f"  {label:<8} {best * 1000:8.2f} ms   {len(body) / 1024:8.1f} KiB"
+        f"   {len(compress(body, 'br')) / 1024:8.1f} KiB br"
+    )
+
+
+def main():
+    connections = make_connections(PAGE_SIZE)
+    logs = make_logs(PAGE_SIZE)
+
+    print(f"GET /connections, {PAGE_SIZE} items (best of {ROUNDS})")
+    bench("json", JSON, lambda fmt: encode_connections(connections, fmt=fmt))
+    bench("msgpack", MSGPACK, lambda fmt: encode_connections(connections, fmt=fmt))
+
+    print(f"GET /logs, {PAGE_SIZE} items (best of {ROUNDS})")
+    bench("json", JSON, lambda fmt: encode_logs(logs, fmt))
+    bench("msgpack", MSGPACK, lambda fmt: encode_logs(logs, fmt))
+
+
+if __name__ == "__main__":
+    main()
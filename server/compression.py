@@ -0,0 +1,106 @@
+"""
+Response compression middleware (brotli preferred, gzip fallback).
+
+Only single-chunk responses at or above the size threshold are compressed;
+streaming responses (e.g. text/event-stream) pass through untouched.
+The threshold is configurable with COMPRESSION_MIN_SIZE (bytes).
+"""
+import gzip
+import os
+
+import brotli
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Favor speed over ratio: JSON compresses well even at low levels
+BROTLI_QUALITY = 4
+GZIP_LEVEL = 6
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str):
+    accepted = _accepted_encodings(accept_encoding)
+    if "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = start_message["headers"]
+            already_encoded = any(name == b"content-encoding" for name, _ in headers)
+            if message.get("more_body", False) or already_encoded or len(body) < self.minimum_size:
+                # Streaming, pre-encoded or small: send as-is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            vary = b"Accept-Encoding"
+            for name, value in headers:
+                if name == b"vary":
+                    vary = value + b", Accept-Encoding"
+            headers = [
+                (name, value) for name, value in headers
+                if name not in (b"content-length", b"vary")
+            ]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", vary),
+            ]
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
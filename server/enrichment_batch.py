@@ -0,0 +1,189 @@
+"""
+Batch enrichment: many profile URLs behind one batch id.
+
+start_batch normalizes and dedups the URLs and, like /enrich, resolves
+cached profiles immediately and reuses the task of any profile that is
+already queued. The rest are fanned out as a Celery group of at most
+ENRICH_BATCH_CONCURRENCY lanes, so a batch never occupies more worker
+slots than that however many URLs it has, and single enrichments are not
+starved behind a large import. How a lane fetches depends on
+ENRICH_FETCH_MODE (see async_fetch).
+
+The batch record ({user_id, items: [[url, task_id], ...]}) is kept in
+Redis for ENRICH_BATCH_TTL seconds. batch_status reads the profile cache
+for every URL in one MGET and only asks Celery about the rest.
+"""
+import json
+import logging
+import math
+import os
+import uuid
+from typing import List, Optional, Tuple
+
+import redis
+from celery import group
+from celery.result import AsyncResult
+
+from enrichment_cache import EnrichmentCache, normalize_linkedin_url
+import async_fetch
+from worker import continue_lane_task, enrich_linkedin_task, enrich_profiles_task
+
+logger = logging.getLogger(__name__)
+
+ENRICH_BATCH_CONCURRENCY = int(os.getenv("ENRICH_BATCH_CONCURRENCY", "4"))
+# Matches Celery's default result_expires: task states are gone after this anyway
+ENRICH_BATCH_TTL = 24 * 3600
+BATCH_PREFIX = "enrich:batch:"
+
+
+def lanes(items: List[Tuple[str, str]], concurrency: int) -> List[List[Tuple[str, str]]]:
+    """Deal items round-robin into at most concurrency lanes."""
+    count = max(1, min(concurrency, len(items)))
+    return [items[i::count] for i in range(count)]
+
+
+def lane_head(lane: List[Tuple[str, str]]):
+    """
+    The lane's first item under its pre-assigned task id. Once it finishes,
+    whether it succeeded or failed (a time limit included), continue_lane_task
+    queues the next one: a chain would stop at the first failure and leave
+    the rest of the lane Pending.
+    """
+    (url, task_id), rest = lane[0], lane[1:]
+    head = enrich_linkedin_task.si(url).set(task_id=task_id)
+    if rest:
+        then = continue_lane_task.si(rest)
+        head.link(then)
+        head.link_error(then)
+    return head
+
+
+def build_canvas(
+    queued: List[Tuple[str, str]],
+    concurrency: int = ENRICH_BATCH_CONCURRENCY,
+    mode: Optional[str] = None,
+):
+    """
+    A group with one member per lane. In sync fetch mode each member is the
+    lane's head (see lane_head), which runs its (url, task_id) items one
+    after another; in async mode it is one task fetching the whole lane
+    concurrently and storing each result under its task id.
+    """
+    if (mode or async_fetch.ENRICH_FETCH_MODE) == "async":
+        return group([enrich_profiles_task.si(lane) for lane in lanes(queued, concurrency)])
+    return group([lane_head(lane) for lane in lanes(queued, concurrency)])
+
+
+def claim_ttl(
+    cache: EnrichmentCache,
+    pending: int,
+    concurrency: int = ENRICH_BATCH_CONCURRENCY,
+    mode: Optional[str] = None,
+) -> int:
+    """
+    Seconds to claim each of pending URLs for. A lane works through its URLs
+    in turn (async mode: ENRICH_ASYNC_CONCURRENCY at a time), so its last
+    URL may only start after the ones ahead of it have each taken up to
+    inflight_ttl.
+    """
+    depth = math.ceil(pending / max(1, concurrency))
+    if (mode or async_fetch.ENRICH_FETCH_MODE) == "async":
+        depth = math.ceil(depth / async_fetch.ENRICH_ASYNC_CONCURRENCY)
+    return cache.inflight_ttl * max(1, depth)
+
+
+def _queue(queued: List[Tuple[str, str]]):
+    build_canvas(queued).apply_async()
+
+
+def start_batch(cache: EnrichmentCache, user_id, urls: List[str]) -> Optional[dict]:
+    """
+    Queue enrichment of urls; returns {batch_id, total, queued}, or None
+    when there is no Redis to keep the batch in.
+    """
+    if cache.redis is None:
+        return None
+    urls = list(dict.fromkeys(normalize_linkedin_url(url) for url in urls))
+
+    profiles = cache.get_many(urls)
+    ttl = claim_ttl(cache, sum(profile is None for profile in profiles))
+    items = []
+    queued = []
+    for url, profile in zip(urls, profiles):
+        if profile is not None:
+            items.append((url, cache.cached_task_id(url)))
+            continue
+        task_id = str(uuid.uuid4())
+        pending = cache.claim(url, task_id, ttl)
+        if pending is not None:
+            items.append((url, pending))
+        else:
+            items.append((url, task_id))
+            queued.append((url, task_id))
+
+    batch_id = str(uuid.uuid4())
+    record = json.dumps({"user_id": str(user_id), "items": items})
+    try:
+        cache.redis.set(BATCH_PREFIX + batch_id, record, ex=ENRICH_BATCH_TTL)
+    except redis.RedisError as e:
+        logger.warning("Batch enrichment: could not store batch (%s)", e)
+        for url, task_id in queued:
+            cache.release(url, task_id)
+        return None
+    if queued:
+        _queue(queued)
+    return {"batch_id": batch_id, "total": len(items), "queued": len(queued)}
+
+
+def _item_status(url: str, task_id: str, profile: Optional[dict]) -> dict:
+    item = {"url": url, "task_id": task_id}
+    if profile is not None:
+        return {**item, "status": "Success", "data": profile}
+    result = AsyncResult(task_id, app=enrich_linkedin_task.app)
+    state = result.state
+    if state == "SUCCESS":
+        data = result.result
+        # The task reports fetch failures (e.g. a 999 from LinkedIn) as data
+        if isinstance(data, dict) and "error" in data:
+            return {**item, "status": "Failure", "error": data["error"]}
+        return {**item, "status": "Success", "data": data}
+    if state == "FAILURE":
+        return {**item, "status": "Failure", "error": str(result.result)}
+    return {**item, "status": "Pending"}
+
+
+def batch_status(cache: EnrichmentCache, user_id, batch_id: str) -> Optional[dict]:
+    """
+    Counts and per-URL results so far, or None for an unknown, expired or
+    someone else's batch.
+    """
+    if cache.redis is None:
+        return None
+    try:
+        record = cache.redis.get(BATCH_PREFIX + batch_id)
+    except redis.RedisError as e:
+        logger.warning("Batch enrichment: could not read batch (%s)", e)
+        return None
+    if record is None:
+        return None
+    record = json.loads(record)
+    if record["user_id"] != str(user_id):
+        return None
+
+    items = record["items"]
+    profiles = cache.get_many([url for url, _ in items])
+    results = [
+        _item_status(url, task_id, profile)
+        for (url, task_id), profile in zip(items, profiles)
+    ]
+    counts = {"Success": 0, "Failure": 0, "Pending": 0}
+    for item in results:
+        counts[item["status"]] += 1
+    return {
+        "batch_id": batch_id,
+        "total": len(results),
+        "completed": counts["Success"],
+        "failed": counts["Failure"],
+        "pending": counts["Pending"],
+        "results": results,
+    }
@@ -0,0 +1,156 @@
+"""
+LinkedIn enrichment result cache and in-flight dedup, in Redis.
+
+Profiles are keyed by their normalized URL, so the many spellings of one
+profile (locale or mobile subdomains, trailing slashes, tracking query
+strings, case) share one entry:
+
+- a parsed profile is kept for ENRICHMENT_CACHE_TTL seconds; /enrich
+  answers from it without queueing anything, with a task id that
+  /tasks/{id} resolves straight from the cache;
+- while a task for a URL is queued or running, /enrich hands out that
+  task's id instead of queueing a duplicate. The claim expires after
+  ENRICHMENT_INFLIGHT_TTL seconds (batches scale it by how many URLs wait
+  ahead in a lane) in case the worker dies.
+
+Without Redis, or when it errors, every call just queues a task.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import List, Optional
+from urllib.parse import quote, unquote, urlsplit
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+ENRICHMENT_CACHE_TTL = int(os.getenv("ENRICHMENT_CACHE_TTL", str(7 * 24 * 3600)))
+ENRICHMENT_INFLIGHT_TTL = int(os.getenv("ENRICHMENT_INFLIGHT_TTL", "300"))
+
+RESULT_PREFIX = "enrich:result:"
+TASK_PREFIX = "enrich:task:"
+# Task ids handed out for cache hits; they never reach Celery
+CACHED_TASK_PREFIX = "cached-"
+
+
+def normalize_linkedin_url(url: str) -> str:
+    """
+    Canonical form of a profile URL: https, www.linkedin.com for any
+    LinkedIn subdomain, lower-case path without trailing slash, and no
+    query string or fragment.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        host = "www.linkedin.com"
+    # Decode first so %C3%A9 and é (and %c3%a9) compare equal
+    path = quote(unquote(parts.path).lower().rstrip("/"), safe="/")
+    return f"https://{host}{path}"
+
+
+def url_key(normalized_url: str) -> str:
+    return hashlib.sha256(normalized_url.encode()).hexdigest()[:32]
+
+
+class EnrichmentCache:
+    def __init__(
+        self,
+        client=None,
+        ttl: int = ENRICHMENT_CACHE_TTL,
+        inflight_ttl: int = ENRICHMENT_INFLIGHT_TTL,
+    ):
+        """URLs passed to the methods below must already be normalized."""
+        self.redis = client
+        self.ttl = ttl
+        self.inflight_ttl = inflight_ttl
+
+    def _failed(self, error: Exception):
+        logger.warning("Enrichment cache: Redis unavailable (%s)", error)
+
+    def get(self, url: str) -> Optional[dict]:
+        if self.redis is None:
+            return None
+        try:
+            data = self.redis.get(RESULT_PREFIX + url_key(url))
+        except redis.RedisError as e:
+            self._failed(e)
+            return None
+        return json.loads(data) if data is not None else None
+
+    def get_many(self, urls: List[str]) -> List[Optional[dict]]:
+        """get() for each of urls, in one round trip."""
+        if self.redis is None or not urls:
+            return [None] * len(urls)
+        try:
+            values = self.redis.mget([RESULT_PREFIX + url_key(url) for url in urls])
+        except redis.RedisError as e:
+            self._failed(e)
+            return [None] * len(urls)
+        return [json.loads(value) if value is not None else None for value in values]
+
+    def set(self, url: str, result: dict):
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(RESULT_PREFIX + url_key(url), json.dumps(result), ex=self.ttl)
+        except redis.RedisError as e:
+            self._failed(e)
+
+    def cached_task_id(self, url: str) -> str:
+        return CACHED_TASK_PREFIX + url_key(url)
+
+    def result_for_task(self, task_id: str) -> Optional[dict]:
+        """The cached profile behind a cached_task_id, None once it has expired."""
+        if self.redis is None:
+            return None
+        try:
+            data = self.redis.get(RESULT_PREFIX + task_id[len(CACHED_TASK_PREFIX):])
+        except redis.RedisError as e:
+            self._failed(e)
+            return None
+        return json.loads(data) if data is not None else None
+
+    def claim(self, url: str, task_id: str, ttl: Optional[int] = None) -> Optional[str]:
+        """
+        Register task_id as the task enriching url for ttl seconds (default
+        inflight_ttl). Returns the id of the task already doing so instead,
+        if there is one; None means queue task_id.
+        """
+        if self.redis is None:
+            return None
+        key = TASK_PREFIX + url_key(url)
+        try:
+            if self.redis.set(key, task_id, nx=True, ex=ttl or self.inflight_ttl):
+                return None
+            pending = self.redis.get(key)
+        except redis.RedisError as e:
+            self._failed(e)
+            return None
+        # The claim may have been released in between
+        return pending.decode() if pending is not None else None
+
+    def release(self, url: str, task_id: Optional[str]):
+        """Drop task_id's claim on url (a no-op if another task holds it)."""
+        if self.redis is None or not task_id:
+            return
+        key = TASK_PREFIX + url_key(url)
+        try:
+            if self.redis.get(key) == task_id.encode():
+                self.redis.delete(key)
+        except redis.RedisError as e:
+            self._failed(e)
+
+
+def _connect(url: Optional[str]):
+    if not url:
+        return None
+    return redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+
+enrichment_cache = EnrichmentCache(_connect(REDIS_URL))
@@ -0,0 +1,56 @@
+"""
+Weak ETags and conditional GET helpers.
+
+ETags are derived from cheap values that are already in hand (the user's
+data_version counter, the request URL) so a matching If-None-Match can be
+answered with 304 before any list query runs or anything is serialized.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+# Responses are per-user: only private (browser/app) caches may store them,
+# and they must revalidate every time so edits show up immediately.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(
+        "\x1f".join(str(part) for part in parts).encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    # Weak comparison (RFC 9110 8.8.3.2) ignores the W/ prefix
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = _opaque(etag)
+    return any(_opaque(candidate) == target for candidate in header.split(","))
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def normalized_query(request: Request) -> str:
+    """Query string with parameters sorted, so ?a=1&b=2 and ?b=2&a=1 share an ETag."""
+    return urlencode(sorted(request.query_params.multi_items()))
+
+
+def request_etag(request: Request, user, *parts) -> str:
+    """ETag for a per-user GET: user, data version, route and normalized query string."""
+    return make_etag(user.id, user.data_version, request.url.path, normalized_query(request), *parts)
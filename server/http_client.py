@@ -0,0 +1,116 @@
+"""
+Per-process HTTP resources for the enrichment worker.
+
+A pooled requests.Session (keep-alive connections, retries with backoff on
+connection errors and 429/5xx) and a rotation of user agents sampled from
+fake_useragent once, instead of a new connection and a dataset load per
+task. The worker builds them on worker_process_init, i.e. after the fork,
+so no process shares sockets with its parent; anything else (tests, the
+API process, eager tasks) builds them on first use.
+"""
+import itertools
+import logging
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+ENRICH_HTTP_TIMEOUT = float(os.getenv("ENRICH_HTTP_TIMEOUT", "10"))
+ENRICH_HTTP_RETRIES = int(os.getenv("ENRICH_HTTP_RETRIES", "2"))
+ENRICH_HTTP_POOL_SIZE = int(os.getenv("ENRICH_HTTP_POOL_SIZE", "10"))
+# User agents sampled from the fake_useragent dataset per process
+USER_AGENT_POOL_SIZE = 50
+
+# Used when the fake_useragent dataset cannot be loaded
+FALLBACK_USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    "Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+)
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class UserAgentPool:
+    """Round-robin over user agents sampled once from fake_useragent."""
+
+    def __init__(self, size: int = USER_AGENT_POOL_SIZE):
+        try:
+            from fake_useragent import UserAgent
+
+            ua = UserAgent()
+            agents = list(dict.fromkeys(ua.random for _ in range(size)))
+        except Exception as e:
+            logger.warning("fake_useragent unavailable, using built-in user agents (%s)", e)
+            agents = list(FALLBACK_USER_AGENTS)
+        self.agents = agents
+        self._cycle = itertools.cycle(agents)
+        self._lock = threading.Lock()
+
+    def next(self) -> str:
+        with self._lock:
+            return next(self._cycle)
+
+
+def build_session(retries: int = ENRICH_HTTP_RETRIES, pool_size: int = ENRICH_HTTP_POOL_SIZE) -> requests.Session:
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+        # Hand the last response back instead of raising, callers check status
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+class _Resources:
+    def __init__(self):
+        self.session = build_session()
+        self.user_agents = UserAgentPool()
+
+
+_resources: Optional[_Resources] = None
+_init_lock = threading.Lock()
+
+
+def init():
+    """(Re)build this process's session and user-agent pool."""
+    global _resources
+    with _init_lock:
+        old, _resources = _resources, _Resources()
+    if old is not None:
+        old.session.close()
+
+
+def _get() -> _Resources:
+    global _resources
+    if _resources is None:
+        with _init_lock:
+            if _resources is None:
+                _resources = _Resources()
+    return _resources
+
+
+def get_session() -> requests.Session:
+    return _get().session
+
+
+def user_agent() -> str:
+    return _get().user_agents.next()
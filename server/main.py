@@ -1,21 +1,38 @@
 from typing import List, Optional, Dict
-from fastapi import FastAPI, HTTPException, Depends, status, Query, Request
-from sqlmodel import Session, select, func
+from fastapi import FastAPI, HTTPException, Depends, status, Query, Request, Response
+from sqlalchemy import event
+from sqlmodel import Session, select, func, or_
 from fastapi.middleware.cors import CORSMiddleware
 from database import create_db_and_tables, get_session, engine
 from models import (
     Connection, ConnectionCreate, ConnectionRead, ConnectionUpdate,
+    ConnectionBulkUpdate, BulkUpdateResult, EnrichBatch, ProfileIngest, TagMerge, TagRename,
     Log, LogCreate, LogRead,
     User, UserCreate, UserRead, UserUpdate,
     PaginatedConnections, PaginatedLogs,
-    TagDefinition
+    TagDefinition, Tombstone, UserTagUsage
 )
+from serializers import (
+    CONNECTION_READ_FIELDS, connection_fieldset, connection_to_dict,
+    encode_connections, encode_logs, log_to_dict, negotiate, paginated, render, render_encoded,
+)
+from queries import (
+    dashboard_changes_at, dashboard_stats, fetch_connections, fetch_log_page, fetch_logs,
+    not_contacted_changes_at, suggest_tags, tags_json_contains,
+)
+from etags import cache_headers, etag_matches, make_etag, not_modified, request_etag
+from sync import sync_page
+from response_cache import cached_render, response_cache
+import tag_catalog as tag_catalog_module
+import tag_merge
+import writes
 import uuid
 import datetime
 import asyncio
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from firebase_auth import verify_firebase_token
+from compression import CompressionMiddleware
 
 
 
@@ -60,6 +77,19 @@ async def get_current_user(
     return user
 
 
+def bump_data_version(session: Session, user: User):
+    """
+    Invalidate the user's ETags. Call from every mutating endpoint, in the
+    same transaction as the write.
+    """
+    writes.bump_data_version(session, user.id)
+
+
+def record_tombstone(session: Session, user: User, entity_type: str, entity_id: str):
+    """Remember a hard delete so /sync can report it to other clients."""
+    session.add(Tombstone(user_id=user.id, entity_type=entity_type, entity_id=entity_id))
+
+
 # CORS Setup
 import os
 origins = [
@@ -72,6 +102,7 @@ frontend_url = os.getenv("FRONTEND_URL")
 if frontend_url:
     origins.append(frontend_url)
 
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -116,46 +147,42 @@ def seed_tags(session: Session):
 
 def ensure_custom_tags(session: Session, tags: List[str], tag_type: str):
     """
-    Check if any of the provided tags are NOT in the standard list.
-    If they are new, insert them as custom tags.
+    Insert any of tags not yet in the catalog as custom tags.
+
+    Only writes: the new tags commit with the rest of the request, and the
+    tag catalog is invalidated once they have (see _invalidate_tag_catalog).
     """
     if not tags:
         return
+    if writes.ensure_tag_definitions(session, tag_type, tags):
+        session.info.setdefault(ADDED_TAG_TYPES, set()).add(tag_type)
 
-    # Flatten standard tags for quick lookup
-    standard_names = set()
-    for cat, names in STANDARD_TAGS.get(tag_type, {}).items():
-         standard_names.update(names)
 
-    # Note: We also need to check existing CUSTOM tags in DB to avoid dupes
-    # But since we are iterating list, we can just check existence.
-    
-    for tag in tags:
-        if tag not in standard_names:
-            # Check if already exists in DB as custom or standard (names are unique-ish?)
-            # Actually, standard tags are in DB too now.
-            # So simpler: just check DB.
-            stmt = select(TagDefinition).where(
-                TagDefinition.type == tag_type,
-                TagDefinition.name == tag
-            )
-            existing = session.exec(stmt).first()
-            if not existing:
-                # Insert as custom
-                new_tag = TagDefinition(
-                    type=tag_type,
-                    category="custom",
-                    name=tag,
-                    is_custom=True
-                )
-                session.add(new_tag)
-    session.commit()
+# session.info key: tag types given new custom tags in the open transaction
+ADDED_TAG_TYPES = "added_tag_types"
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_tag_catalog(session):
+    for tag_type in session.info.pop(ADDED_TAG_TYPES, ()):
+        tag_catalog.invalidate(tag_type)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_added_tags(session):
+    session.info.pop(ADDED_TAG_TYPES, None)
 
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
     with Session(engine) as session:
         seed_tags(session)
+    tag_catalog.invalidate(broadcast=False)
+    tag_catalog.start_listener()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    tag_catalog.stop_listener()
 
 # ===== AUTH ENDPOINTS =====
 
@@ -197,8 +224,10 @@ def login(request: Request, body: dict, session: Session = Depends(get_session))
         # Update fields if changed
         if email and user.email != email:
             user.email = email
+            bump_data_version(session, user)
         if phone_number and user.phone_number != phone_number:
             user.phone_number = phone_number
+            bump_data_version(session, user)
         if name and user.name != name and user.name == "User": 
              # Only auto-update name if it was generic "User"
              # Or maybe we rely on frontend Onboarding to set real name?
@@ -223,7 +252,15 @@ def login(request: Request, body: dict, session: Session = Depends(get_session))
 
 
 @app.get("/users/me", response_model=UserRead)
-def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+):
+    etag = request_etag(request, current_user)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
     return current_user
 
 @app.put("/users/me", response_model=UserRead)
@@ -232,15 +269,11 @@ def update_user_me(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    if user_update.name is not None:
-        current_user.name = user_update.name
-    if user_update.is_onboarded is not None:
-        current_user.is_onboarded = user_update.is_onboarded
-    
-    session.add(current_user)
+    changes = {key: value for key, value in user_update.dict().items() if value is not None}
+    # One UPDATE ... RETURNING, which also bumps data_version
+    updated = writes.update_user(session, current_user.id, changes)
     session.commit()
-    session.refresh(current_user)
-    return current_user
+    return updated
 
 @app.delete("/users/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user_me(
@@ -261,6 +294,20 @@ def delete_user_me(
     ).all()
     for connection in connections:
         session.delete(connection)
+
+    # Delete the user's sync tombstones
+    tombstones = session.exec(
+        select(Tombstone).where(Tombstone.user_id == current_user.id)
+    ).all()
+    for tombstone in tombstones:
+        session.delete(tombstone)
+
+    # Delete the user's tag usage counts (global counts are kept)
+    usages = session.exec(
+        select(UserTagUsage).where(UserTagUsage.user_id == current_user.id)
+    ).all()
+    for usage in usages:
+        session.delete(usage)
     
     # Delete the user
     session.delete(current_user)
@@ -273,6 +320,7 @@ def delete_user_me(
 
 @app.post("/connections", response_model=ConnectionRead, status_code=status.HTTP_201_CREATED)
 def create_connection(
+    request: Request,
     connection: ConnectionCreate,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
@@ -280,91 +328,221 @@ def create_connection(
     # Ensure custom tags are saved
     ensure_custom_tags(session, connection.tags, 'connection')
 
-    db_connection = Connection.from_orm(connection)
-    db_connection.id = str(uuid.uuid4())
-    db_connection.user_id = current_user.id
-    db_connection.created_at = datetime.datetime.utcnow()
-    # Handle tags manual serialization
-    db_connection.tags = connection.tags
-
-    session.add(db_connection)
+    row = writes.insert_connection(session, current_user.id, connection.dict())
+    writes.record_tag_usage(session, current_user.id, 'connection', connection.tags)
+    bump_data_version(session, current_user)
     session.commit()
-    session.refresh(db_connection)
-    return db_connection
+    fmt = negotiate(request)
+    return render(fmt, connection_to_dict(row, fmt=fmt), status_code=status.HTTP_201_CREATED)
+
+# Sort keys accepted by GET /connections; prefix with "-" for descending.
+# Each one is backed by a (user_id, column) index on Connection.
+CONNECTION_SORTS = {
+    "name": Connection.name,
+    "lastContact": Connection.lastContact,
+    "created_at": Connection.created_at,
+    "next_due": Connection.next_due,
+}
+
+def _connection_filters(
+    user_id,
+    company: Optional[str] = None,
+    industry: Optional[str] = None,
+    location: Optional[str] = None,
+    howMet: Optional[str] = None,
+    not_contacted_days: Optional[int] = None,
+    tag: Optional[str] = None,
+    now: Optional[datetime.datetime] = None,
+):
+    filters = [Connection.user_id == user_id]
+    if company is not None:
+        filters.append(Connection.company == company)
+    if industry is not None:
+        filters.append(Connection.industry == industry)
+    if location is not None:
+        filters.append(Connection.location == location)
+    if howMet is not None:
+        filters.append(Connection.howMet == howMet)
+    if not_contacted_days is not None:
+        cutoff = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=not_contacted_days)
+        filters.append(or_(Connection.lastContact.is_(None), Connection.lastContact < cutoff))
+    if tag is not None:
+        # Exact element match, the same on every dialect: "Investor" matches
+        # neither "Investors" nor "investor"
+        filters.append(tags_json_contains(Connection.tags_json, tag))
+    return filters
+
+def _connection_order_by(sort: Optional[str]):
+    if sort is None:
+        return []
+    descending = sort.startswith("-")
+    column = CONNECTION_SORTS.get(sort.lstrip("-"))
+    if column is None:
+        raise HTTPException(status_code=400, detail="Invalid sort key")
+    # Tie-break on id so pages stay stable across requests
+    if descending:
+        return [column.desc(), Connection.id.desc()]
+    return [column.asc(), Connection.id.asc()]
 
-@app.get("/connections")
+@app.get("/connections", response_model=PaginatedConnections)
 def get_connections(
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
     limit: int = Query(default=100, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
+    company: Optional[str] = Query(default=None),
+    industry: Optional[str] = Query(default=None),
+    location: Optional[str] = Query(default=None),
+    howMet: Optional[str] = Query(default=None),
+    not_contacted_days: Optional[int] = Query(default=None, ge=0, le=3650),
+    tag: Optional[str] = Query(default=None),
+    sort: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None),
 ):
-    # Count total
-    count_statement = select(func.count()).select_from(Connection).where(Connection.user_id == current_user.id)
-    total = session.exec(count_statement).one()
+    fmt = negotiate(request)
+    now = datetime.datetime.utcnow()
+    parts = [fmt.media_type]
+    if not_contacted_days is not None:
+        # The cutoff moves with time: the ETag changes when it next passes a lastContact
+        changes_at = not_contacted_changes_at(session, current_user.id, not_contacted_days, now)
+        parts.append(changes_at.isoformat() if changes_at else "")
+    etag = request_etag(request, current_user, *parts)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-    # Fetch page
-    statement = (
-        select(Connection)
-        .where(Connection.user_id == current_user.id)
-        .offset(offset)
-        .limit(limit)
+    filters = _connection_filters(
+        current_user.id, company, industry, location, howMet, not_contacted_days, tag, now
     )
-    connections = session.exec(statement).all()
+    order_by = _connection_order_by(sort)
+    fieldset = CONNECTION_READ_FIELDS
+    if fields:
+        try:
+            fieldset = connection_fieldset(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    return PaginatedConnections(
-        items=connections,
-        total=total,
-        limit=limit,
-        offset=offset,
-    )
+    def build():
+        # Count total
+        count_statement = select(func.count()).select_from(Connection).where(*filters)
+        total = session.exec(count_statement).one()
+
+        # Fetch page
+        connections = fetch_connections(session, filters, order_by, limit, offset, fieldset)
+        return paginated(encode_connections(connections, fieldset, fmt), total, limit, offset)
+
+    return cached_render(fmt, etag, build)
+
+@app.patch("/connections", response_model=BulkUpdateResult)
+def bulk_update_connections(
+    bulk: ConnectionBulkUpdate,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply one update to many connections, selected by id list or filter.
+    Runs in batches of writes.BULK_BATCH_SIZE, each committed on its own to
+    keep row locks short, so a failure part-way leaves earlier batches applied.
+    """
+    changes = bulk.update.dict(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    if bulk.ids is not None:
+        filters = [Connection.user_id == current_user.id, Connection.id.in_(set(bulk.ids))]
+    else:
+        criteria = bulk.filter
+        filters = _connection_filters(
+            current_user.id, criteria.company, criteria.industry, criteria.location,
+            criteria.howMet, criteria.not_contacted_days, criteria.tag,
+        )
+
+    # Register custom tags once, not per row or per batch
+    if 'tags' in changes:
+        ensure_custom_tags(session, changes['tags'], 'connection')
+
+    updated = 0
+    for connection_ids in writes.id_batches(session, Connection, filters, writes.BULK_BATCH_SIZE):
+        count, previous = writes.update_connections(session, current_user.id, connection_ids, changes)
+        if changes.get('tags'):
+            writes.record_added_tag_usage(
+                session, current_user.id, 'connection', changes['tags'], previous
+            )
+        updated += count
+        bump_data_version(session, current_user)
+        session.commit()
+    return {"updated": updated}
 
 @app.get("/connections/{connection_id}", response_model=ConnectionRead)
 def get_connection(
     connection_id: str,
+    request: Request,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    include: Optional[str] = Query(default=None),
+    logs_limit: int = Query(default=20, ge=1, le=500),
 ):
-    statement = select(Connection).where(
-        Connection.id == connection_id,
-        Connection.user_id == current_user.id
+    """
+    With include=logs, the connection's most recent `logs_limit` logs are
+    embedded along with a cursor for GET /logs?before= to load older ones.
+    """
+    if include is None:
+        statement = select(Connection).where(
+            Connection.id == connection_id,
+            Connection.user_id == current_user.id
+        )
+        connection = session.exec(statement).first()
+        if not connection:
+            raise HTTPException(status_code=404, detail="Connection not found")
+        return connection
+
+    if include != "logs":
+        raise HTTPException(status_code=400, detail="Invalid include")
+
+    fmt = negotiate(request)
+    rows = fetch_connections(
+        session,
+        [Connection.id == connection_id, Connection.user_id == current_user.id],
+        limit=1,
     )
-    connection = session.exec(statement).first()
-    if not connection:
+    if not rows:
         raise HTTPException(status_code=404, detail="Connection not found")
-    return connection
+    logs, next_cursor = fetch_log_page(
+        session,
+        [Log.connection_id == connection_id, Log.user_id == current_user.id],
+        logs_limit,
+    )
+    detail = connection_to_dict(rows[0], fmt=fmt)
+    detail["logs"] = {"items": encode_logs(logs, fmt), "next_cursor": next_cursor}
+    return render(fmt, detail)
 
 @app.put("/connections/{connection_id}", response_model=ConnectionRead)
 def update_connection(
+    request: Request,
     connection_id: str,
     connection: ConnectionUpdate,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    statement = select(Connection).where(
-        Connection.id == connection_id,
-        Connection.user_id == current_user.id
-    )
-    db_connection = session.exec(statement).first()
-    if not db_connection:
+    connection_data = connection.dict(exclude_unset=True)
+
+    # Ownership is part of the UPDATE's WHERE clause; no row back means 404
+    row = writes.update_connection(session, current_user.id, connection_id, connection_data)
+    if row is None:
         raise HTTPException(status_code=404, detail="Connection not found")
 
-    connection_data = connection.dict(exclude_unset=True)
-    
-    # Handle custom tags
+    # Custom tags are registered only once the connection is known to be the user's
     if 'tags' in connection_data:
         ensure_custom_tags(session, connection_data['tags'], 'connection')
-
-    for key, value in connection_data.items():
-        if key == 'tags':
-             db_connection.tags = value
-        else:
-             setattr(db_connection, key, value)
-
-    session.add(db_connection)
+    # Usage counts only the tags this save adds; clients resend every tag
+    if connection_data.get('tags'):
+        writes.record_added_tag_usage(
+            session, current_user.id, 'connection', connection_data['tags'], [row.previous_tags]
+        )
+    bump_data_version(session, current_user)
     session.commit()
-    session.refresh(db_connection)
-    return db_connection
+    fmt = negotiate(request)
+    return render(fmt, connection_to_dict(row, fmt=fmt))
 
 @app.delete("/connections/{connection_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_connection(
@@ -380,6 +558,8 @@ def delete_connection(
     if not connection:
         raise HTTPException(status_code=404, detail="Connection not found")
     session.delete(connection)
+    record_tombstone(session, current_user, "connection", connection_id)
+    bump_data_version(session, current_user)
     session.commit()
 
 
@@ -387,83 +567,79 @@ def delete_connection(
 
 @app.post("/logs", response_model=LogRead, status_code=status.HTTP_201_CREATED)
 def create_log(
+    request: Request,
     log: LogCreate,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    # Verify connection belongs to user if provided
-    connection = None
+    log_data = log.dict()
+    log_data["created_at"] = log.created_at or datetime.datetime.utcnow()
+
+    # Verify connection belongs to user if provided, moving its lastContact
+    # forward if this log is more recent (one conditional UPDATE). It commits
+    # with the log INSERT below, or not at all.
     if log.connection_id:
-        statement = select(Connection).where(
-            Connection.id == log.connection_id,
-            Connection.user_id == current_user.id
+        owned = writes.touch_last_contact(
+            session, current_user.id, log.connection_id, log_data["created_at"]
         )
-        connection = session.exec(statement).first()
-        if not connection:
+        if not owned:
             raise HTTPException(status_code=403, detail="Not authorized for this connection")
 
     # Ensure custom tags (interaction type)
     ensure_custom_tags(session, log.tags, 'interaction')
 
-    db_log = Log(
-        id=str(uuid.uuid4()),
-        user_id=current_user.id,
-        connection_id=log.connection_id,
-        type=log.type,
-        notes=log.notes,
-        created_at=log.created_at if log.created_at else datetime.datetime.utcnow()
-    )
-    db_log.tags = log.tags
-
-    session.add(db_log)
-    
-    # Update connection's lastContact if this log is more recent
-    if connection:
-        # Normalize datetimes for comparison (strip timezone info)
-        log_created = db_log.created_at.replace(tzinfo=None) if db_log.created_at else None
-        last_contact = connection.lastContact.replace(tzinfo=None) if connection.lastContact else None
-        
-        if not last_contact or (log_created and log_created > last_contact):
-            connection.lastContact = db_log.created_at
-            session.add(connection)
-    
+    row = writes.insert_log(session, current_user.id, log_data)
+    writes.record_tag_usage(session, current_user.id, 'interaction', log.tags)
+    bump_data_version(session, current_user)
     session.commit()
-    session.refresh(db_log)
-    return db_log
+    fmt = negotiate(request)
+    return render(fmt, log_to_dict(row, fmt), status_code=status.HTTP_201_CREATED)
 
-@app.get("/logs")
+@app.get("/logs", response_model=PaginatedLogs)
 def get_logs(
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
     connection_id: Optional[str] = Query(default=None),
     limit: int = Query(default=100, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
+    before: Optional[str] = Query(default=None),
 ):
+    """
+    Offset pages return {items, total, limit, offset}. Passing a `before`
+    cursor switches to keyset paging, which skips the COUNT and returns
+    {items, next_cursor}.
+    """
+    fmt = negotiate(request)
+    etag = request_etag(request, current_user, fmt.media_type)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     # Build base query with user filter
     base_filter = Log.user_id == current_user.id
     if connection_id:
         base_filter = base_filter & (Log.connection_id == connection_id)
-    
-    # Count total
-    count_statement = select(func.count()).select_from(Log).where(base_filter)
-    total = session.exec(count_statement).one()
 
-    # Fetch page
-    statement = (
-        select(Log)
-        .where(base_filter)
-        .order_by(Log.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-    )
-    logs = session.exec(statement).all()
+    if before is not None:
+        def build():
+            try:
+                logs, next_cursor = fetch_log_page(session, [base_filter], limit, before)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return {"items": encode_logs(logs, fmt), "next_cursor": next_cursor}
 
-    return PaginatedLogs(
-        items=logs,
-        total=total,
-        limit=limit,
-        offset=offset,
-    )
+        return cached_render(fmt, etag, build)
+
+    def build():
+        # Count total
+        count_statement = select(func.count()).select_from(Log).where(base_filter)
+        total = session.exec(count_statement).one()
+
+        # Fetch page
+        logs = fetch_logs(session, [base_filter], limit, offset)
+        return paginated(encode_logs(logs, fmt), total, limit, offset)
+
+    return cached_render(fmt, etag, build)
 
 @app.delete("/logs/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_log(
@@ -471,7 +647,11 @@ def delete_log(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    log = session.get(Log, log_id)
+    # Only the owner's logs: the tombstone and data_version bump below are
+    # theirs, so their other clients see the delete on /sync
+    log = session.exec(
+        select(Log).where(Log.id == log_id, Log.user_id == current_user.id)
+    ).first()
     if not log:
         raise HTTPException(status_code=404, detail="Log not found")
 
@@ -490,6 +670,7 @@ def delete_log(
     connection_id = log.connection_id
     
     session.delete(log)
+    record_tombstone(session, current_user, "log", log_id)
     
     # Recalculate lastContact from remaining logs
     if connection and connection_id:
@@ -502,14 +683,106 @@ def delete_log(
         connection.lastContact = max_date_result  # Will be None if no logs remain
         session.add(connection)
     
+    bump_data_version(session, current_user)
     session.commit()
 
 
+# ===== DASHBOARD & BOOTSTRAP =====
+
+@app.get("/dashboard")
+def get_dashboard(
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Headline counts: total connections/logs, overdue and due-soon follow-ups."""
+    fmt = negotiate(request)
+    now = datetime.datetime.utcnow()
+    # Overdue/due-soon counts move with time: the ETag changes when they next would
+    changes_at = dashboard_changes_at(session, current_user.id, now)
+    etag = request_etag(
+        request, current_user, fmt.media_type, changes_at.isoformat() if changes_at else ""
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return cached_render(fmt, etag, lambda: dashboard_stats(session, current_user.id, now))
+
+@app.get("/bootstrap")
+def bootstrap(
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    connections_limit: int = Query(default=100, ge=1, le=500),
+    logs_limit: int = Query(default=20, ge=1, le=500),
+):
+    """
+    Everything the app needs after login in one response: the user, both tag
+    catalogs, the first page of connections and logs, and dashboard stats.
+    Auth, user lookup and session setup happen once, and every read runs in
+    the same session and transaction, one after another, so the counts and
+    pages come from one snapshot.
+    """
+    fmt = negotiate(request)
+    now = datetime.datetime.utcnow()
+    catalogs = {
+        tag_type: tag_catalog.entry(session, tag_type) for tag_type in ("connection", "interaction")
+    }
+    # The embedded dashboard counts change with time as well as with writes
+    changes_at = dashboard_changes_at(session, current_user.id, now)
+    etag = request_etag(
+        request, current_user, fmt.media_type, changes_at.isoformat() if changes_at else "",
+        *(catalog.state for catalog in catalogs.values()),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    user_filter = [Connection.user_id == current_user.id]
+    dashboard = dashboard_stats(session, current_user.id, now)
+    connections = fetch_connections(session, user_filter, limit=connections_limit)
+    logs = fetch_logs(session, [Log.user_id == current_user.id], limit=logs_limit)
+
+    bundle = {
+        "user": UserRead.model_validate(current_user).model_dump(),
+        "tags": {tag_type: catalog.content for tag_type, catalog in catalogs.items()},
+        "connections": paginated(
+            encode_connections(connections, fmt=fmt),
+            dashboard["total_connections"], connections_limit, 0,
+        ),
+        "logs": paginated(encode_logs(logs, fmt), dashboard["total_logs"], logs_limit, 0),
+        "dashboard": dashboard,
+    }
+    return render(fmt, bundle, headers=cache_headers(etag))
+
+
+# ===== SYNC ENDPOINT =====
+
+@app.get("/sync")
+def sync(
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    since: Optional[str] = Query(default=None),
+    limit: int = Query(default=500, ge=1, le=1000),
+):
+    """
+    Changed and deleted connections/logs, plus new tags, since `since`.
+    Omit `since` for a full sync; keep passing the returned cursor while
+    has_more is true, then store it for the next refresh.
+    """
+    fmt = negotiate(request)
+    try:
+        page = sync_page(session, current_user.id, since, limit, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return render(fmt, page)
+
+
 # ===== TAGS ENDPOINTS =====
 
 @app.get("/tags/{tag_type}")
 def get_tags(
     tag_type: str,
+    request: Request,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
@@ -519,14 +792,76 @@ def get_tags(
     """
     if tag_type not in ["connection", "interaction"]:
         raise HTTPException(status_code=400, detail="Invalid tag type")
-    
+
     # Get standard tags + custom tags
     # Actually, all tags are in the DB now. 
-    # Just query by type.
-    
-    stmt = select(TagDefinition).where(TagDefinition.type == tag_type)
-    tags = session.exec(stmt).all()
-    
+    # Served from this process's catalog cache, already encoded.
+    catalog = tag_catalog.entry(session, tag_type)
+    fmt = negotiate(request)
+    etag = make_etag("tags", tag_type, fmt.media_type, *catalog.state)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return render_encoded(fmt, catalog.body(fmt), headers=cache_headers(etag))
+
+@app.get("/tags/{tag_type}/suggest")
+def suggest_tag_names(
+    tag_type: str,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    prefix: str = Query(default="", max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+):
+    """
+    Autocomplete: the most used tags of this type that start with prefix,
+    the user's own first, then everyone's. Each item is {name, count, source}.
+    """
+    if tag_type not in ["connection", "interaction"]:
+        raise HTTPException(status_code=400, detail="Invalid tag type")
+    return {"items": suggest_tags(session, current_user.id, tag_type, prefix, limit)}
+
+def _merge_tags(session: Session, user: User, tag_type: str, sources: List[str], target: str, response: Response):
+    if tag_type not in ["connection", "interaction"]:
+        raise HTTPException(status_code=400, detail="Invalid tag type")
+    if not [source for source in sources if source != target]:
+        raise HTTPException(status_code=400, detail="Nothing to merge")
+
+    # Large accounts are rewritten by the worker, in the same batches
+    if tag_merge.affected_rows(session, user.id, tag_type, sources) > tag_merge.TAG_REWRITE_INLINE_LIMIT:
+        task = merge_tags_task.delay(user.id, tag_type, sources, target)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"task_id": task.id}
+    return tag_merge.merge_tags(
+        session, user.id, tag_type, sources, target, on_catalog_change=tag_catalog.invalidate
+    )
+
+@app.post("/tags/{tag_type}/merge")
+def merge_tags(
+    tag_type: str,
+    merge: TagMerge,
+    response: Response,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Replace each of the source tags with target on all of the user's
+    connections (or logs), keeping tag order and dropping duplicates.
+    Returns {updated, retired}, or 202 {task_id} when the rewrite runs in
+    the background.
+    """
+    return _merge_tags(session, current_user, tag_type, merge.sources, merge.target, response)
+
+@app.post("/tags/{tag_type}/rename")
+def rename_tag(
+    tag_type: str,
+    rename: TagRename,
+    response: Response,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Rename one tag on all of the user's connections (or logs); see merge."""
+    return _merge_tags(session, current_user, tag_type, [rename.name], rename.new_name, response)
+
+def _group_tags(tags) -> Dict:
     # Organize by category
     result = {}
     
@@ -560,24 +895,183 @@ def _get_category_config(category: str) -> Dict:
     }
     return configs.get(category, {"label": category.title(), "singleSelect": False})
 
+tag_catalog = tag_catalog_module.TagCatalog(_group_tags, tag_catalog_module.connect())
+
+# ===== CACHE METRICS =====
+
+@app.get("/metrics/cache")
+def get_cache_metrics(current_user: User = Depends(get_current_user)):
+    """Response cache hit/miss counters for this process."""
+    return response_cache.metrics()
+
 # ===== ENRICHMENT ENDPOINTS =====
 
-from worker import enrich_linkedin_task
+from worker import enrich_linkedin_task, merge_tags_task
 from celery.result import AsyncResult
+from enrichment_cache import CACHED_TASK_PREFIX, enrichment_cache, normalize_linkedin_url
+import enrichment_batch
+import task_events
+from fastapi.responses import StreamingResponse
+import json
+from urllib.parse import unquote
+from pydantic import ValidationError
+from profile_parser import extract, parse_metadata, slug_profile
 
 @app.post("/enrich")
-async def enrich_linkedin(
+def enrich_linkedin(
     linkedin_url: str,
+    connection_id: Optional[str] = None,
+    session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    task = enrich_linkedin_task.delay(linkedin_url)
-    return {"task_id": task.id}
+    """
+    Returns {"task_id"} to poll. Profiles enriched recently get an id that
+    resolves from the cache, and a profile that is already queued gets that
+    task's id, so overlapping imports fetch each profile once.
 
-@app.get("/tasks/{task_id}")
-async def get_task_status(
-    task_id: str,
+    With connection_id, the result is also written into that connection's
+    empty fields server-side, so no PUT /connections/{id} is needed.
+    """
+    if connection_id is not None:
+        owned = session.exec(
+            select(Connection.id).where(
+                Connection.id == connection_id, Connection.user_id == current_user.id
+            )
+        ).first()
+        if owned is None:
+            raise HTTPException(status_code=404, detail="Connection not found")
+
+    url = normalize_linkedin_url(linkedin_url)
+    cached = enrichment_cache.get(url)
+    if cached is not None:
+        if connection_id is not None and writes.apply_enrichment(
+            session, current_user.id, connection_id, cached
+        ):
+            bump_data_version(session, current_user)
+            session.commit()
+        return {"task_id": enrichment_cache.cached_task_id(url)}
+
+    task_id = str(uuid.uuid4())
+    pending = enrichment_cache.claim(url, task_id)
+    if connection_id is not None:
+        # The queued task cannot take on another connection; this one fetches
+        # again unless that task has cached the profile by the time it runs
+        enrich_linkedin_task.apply_async(
+            (url,), {"user_id": current_user.id, "connection_id": connection_id}, task_id=task_id
+        )
+        return {"task_id": task_id}
+    if pending is not None:
+        return {"task_id": pending}
+    enrich_linkedin_task.apply_async((url,), task_id=task_id)
+    return {"task_id": task_id}
+
+def _parse_ingested_profile(ingest: ProfileIngest, url: str) -> dict:
+    """The worker's parser over what the extension sent, JSON-LD first."""
+    json_ld = [item if isinstance(item, str) else json.dumps(item) for item in ingest.json_ld]
+    og_title = ingest.og_title
+    if ingest.html:
+        page = extract(ingest.html)
+        json_ld += page.json_ld
+        if og_title is None:
+            og_title = page.og_title
+    try:
+        profile = parse_metadata(json_ld, og_title, url)
+    except Exception:
+        # Same fallback as the worker
+        profile = slug_profile(url)
+    profile["name"] = profile["name"] or slug_profile(url)["name"]
+    return profile
+
+def _linkedin_connection_id(session: Session, user_id, url: str) -> Optional[str]:
+    """The user's oldest connection whose LinkedIn URL normalizes to url."""
+    slug = url.rsplit("/", 1)[-1]
+    statement = (
+        select(Connection.id, Connection.linkedin)
+        .where(
+            Connection.user_id == user_id,
+            or_(*(
+                Connection.linkedin.icontains(spelling, autoescape=True)
+                for spelling in dict.fromkeys([slug, unquote(slug)])
+            )),
+        )
+        .order_by(Connection.created_at)
+    )
+    for connection_id, linkedin in session.exec(statement):
+        if normalize_linkedin_url(linkedin) == url:
+            return connection_id
+    return None
+
+@app.post("/connections/ingest", response_model=ConnectionRead)
+def ingest_connection(
+    request: Request,
+    ingest: ProfileIngest,
+    session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    Create or fill in the connection for a profile the extension read in the
+    user's own LinkedIn tab. The enrichment parser runs here, synchronously:
+    no server-side fetch (and login wall) and no Celery queue. An existing
+    connection with the same profile URL only has its empty fields filled.
+    201 when a connection was created, 200 otherwise.
+    """
+    url = normalize_linkedin_url(ingest.linkedin)
+    profile = _parse_ingested_profile(ingest, url)
+    try:
+        fields = ConnectionCreate(
+            **{field: profile.get(field) for field in writes.ENRICHED_FIELDS}, linkedin=url
+        ).dict()
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=[{"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()],
+        )
+
+    connection_id = _linkedin_connection_id(session, current_user.id, url)
+    if connection_id is None:
+        row = writes.insert_connection(session, current_user.id, fields)
+        status_code, changed = status.HTTP_201_CREATED, True
+    else:
+        changed = writes.apply_enrichment(session, current_user.id, connection_id, fields)
+        row = fetch_connections(session, [Connection.id == connection_id])[0]
+        status_code = status.HTTP_200_OK
+    if changed:
+        bump_data_version(session, current_user)
+        session.commit()
+    fmt = negotiate(request)
+    return render(fmt, connection_to_dict(row, fmt=fmt), status_code=status_code)
+
+@app.post("/enrich/batch", status_code=status.HTTP_202_ACCEPTED)
+def enrich_linkedin_batch(
+    batch: EnrichBatch,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Enrich many profiles at once; returns {batch_id, total, queued}. Poll
+    GET /enrich/batch/{batch_id} for progress instead of one task per URL.
+    """
+    started = enrichment_batch.start_batch(enrichment_cache, current_user.id, batch.urls)
+    if started is None:
+        raise HTTPException(status_code=503, detail="Batch enrichment is unavailable")
+    return started
+
+@app.get("/enrich/batch/{batch_id}")
+def get_enrich_batch_status(
+    batch_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """Completed/failed/pending counts plus the results so far, per URL."""
+    batch_status = enrichment_batch.batch_status(enrichment_cache, current_user.id, batch_id)
+    if batch_status is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch_status
+
+def _task_status(task_id: str) -> dict:
+    if task_id.startswith(CACHED_TASK_PREFIX):
+        data = enrichment_cache.result_for_task(task_id)
+        if data is None:
+            return {"status": "Failure", "error": "Enrichment result expired, please retry"}
+        return {"status": "Success", "data": data}
     task_result = AsyncResult(task_id, app=enrich_linkedin_task.app)
     if task_result.state == 'PENDING':
          return {"status": "Pending"}
@@ -587,3 +1081,25 @@ async def get_task_status(
          return {"status": "Failure", "error": str(task_result.result)}
     else:
          return {"status": task_result.state}
+
+@app.get("/tasks/{task_id}")
+async def get_task_status(
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    return _task_status(task_id)
+
+@app.get("/tasks/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Server-Sent Events instead of polling GET /tasks/{id}: the current
+    status, then every change (same payloads) until Success or Failure.
+    """
+    return StreamingResponse(
+        task_events.stream(task_id, lambda: _task_status(task_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,50 @@
+"""Add next_due and list filter/sort indexes to connection
+
+Revision ID: a1c3e5f7b9d2
+Revises: 7247ba95f07c
+Create Date: 2026-10-18 10:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f7b9d2'
+down_revision = '7247ba95f07c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('connection', sa.Column('next_due', sa.DateTime(), nullable=True))
+    # Same rule as models.compute_next_due: rows without a cadence use 90 days
+    base = 'COALESCE("lastContact", created_at)'
+    days = 'COALESCE(frequency, 90)'
+    if op.get_bind().dialect.name == 'sqlite':
+        # datetime() drops the fractional seconds of SQLAlchemy's storage format
+        next_due = f"datetime({base}, '+' || {days} || ' days') || substr({base}, 20)"
+    else:
+        next_due = f"{base} + {days} * INTERVAL '1 day'"
+    op.execute(f"UPDATE connection SET next_due = {next_due}")
+    op.create_index('ix_connection_user_name', 'connection', ['user_id', 'name'], unique=False)
+    op.create_index('ix_connection_user_company', 'connection', ['user_id', 'company'], unique=False)
+    op.create_index('ix_connection_user_industry', 'connection', ['user_id', 'industry'], unique=False)
+    op.create_index('ix_connection_user_location', 'connection', ['user_id', 'location'], unique=False)
+    op.create_index('ix_connection_user_howmet', 'connection', ['user_id', 'howMet'], unique=False)
+    op.create_index('ix_connection_user_last_contact', 'connection', ['user_id', 'lastContact'], unique=False)
+    op.create_index('ix_connection_user_created_at', 'connection', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_connection_user_next_due', 'connection', ['user_id', 'next_due'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_connection_user_next_due', table_name='connection')
+    op.drop_index('ix_connection_user_created_at', table_name='connection')
+    op.drop_index('ix_connection_user_last_contact', table_name='connection')
+    op.drop_index('ix_connection_user_howmet', table_name='connection')
+    op.drop_index('ix_connection_user_location', table_name='connection')
+    op.drop_index('ix_connection_user_industry', table_name='connection')
+    op.drop_index('ix_connection_user_company', table_name='connection')
+    op.drop_index('ix_connection_user_name', table_name='connection')
+    op.drop_column('connection', 'next_due')
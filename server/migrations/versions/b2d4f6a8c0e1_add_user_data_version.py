@@ -0,0 +1,25 @@
+"""Add data_version to user
+
+Revision ID: b2d4f6a8c0e1
+Revises: a1c3e5f7b9d2
+Create Date: 2026-10-18 11:02:17.264908
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a8c0e1'
+down_revision = 'a1c3e5f7b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('data_version', sa.Integer(), nullable=False, server_default=sa.text('0')))
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'data_version')
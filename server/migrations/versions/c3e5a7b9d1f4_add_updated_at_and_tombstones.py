@@ -0,0 +1,48 @@
+"""Add updated_at to connection/log and tombstone table for delta sync
+
+Revision ID: c3e5a7b9d1f4
+Revises: b2d4f6a8c0e1
+Create Date: 2026-10-18 11:48:05.930215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e5a7b9d1f4'
+down_revision = 'b2d4f6a8c0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 1. Add updated_at, backfilled from created_at
+    for table in ('connection', 'log'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+        op.alter_column(table, 'updated_at', nullable=False)
+    op.create_index('ix_connection_user_updated_at', 'connection', ['user_id', 'updated_at', 'id'], unique=False)
+    op.create_index('ix_log_user_updated_at', 'log', ['user_id', 'updated_at', 'id'], unique=False)
+
+    # 2. Tombstones for hard deletes
+    op.create_table('tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('entity_type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('entity_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstone_user_deleted_at', 'tombstone', ['user_id', 'deleted_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tombstone_user_deleted_at', table_name='tombstone')
+    op.drop_table('tombstone')
+    op.drop_index('ix_log_user_updated_at', table_name='log')
+    op.drop_index('ix_connection_user_updated_at', table_name='connection')
+    op.drop_column('log', 'updated_at')
+    op.drop_column('connection', 'updated_at')
@@ -0,0 +1,25 @@
+"""Add (connection_id, created_at, id) index to log
+
+Revision ID: d4f6b8c0e2a5
+Revises: c3e5a7b9d1f4
+Create Date: 2026-10-18 12:31:40.117552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f6b8c0e2a5'
+down_revision = 'c3e5a7b9d1f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_log_connection_created_at', 'log', ['connection_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_log_connection_created_at', table_name='log')
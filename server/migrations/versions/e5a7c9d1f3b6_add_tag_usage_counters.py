@@ -0,0 +1,65 @@
+"""Add per-user and global tag usage counters for autocomplete
+
+Revision ID: e5a7c9d1f3b6
+Revises: d4f6b8c0e2a5
+Create Date: 2026-10-18 15:20:37.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9d1f3b6'
+down_revision = 'd4f6b8c0e2a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tagusage',
+    sa.Column('type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('name_key', sa.String(collation='C'), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('type', 'name')
+    )
+    op.create_index('ix_tagusage_prefix', 'tagusage', ['type', 'name_key', 'count', 'name'], unique=False)
+    op.create_index('ix_tagusage_top', 'tagusage', ['type', 'count'], unique=False)
+
+    op.create_table('usertagusage',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('type', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('name_key', sa.String(collation='C'), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'type', 'name')
+    )
+    op.create_index('ix_usertagusage_prefix', 'usertagusage', ['user_id', 'type', 'name_key', 'count', 'name'], unique=False)
+    op.create_index('ix_usertagusage_top', 'usertagusage', ['user_id', 'type', 'count'], unique=False)
+
+    # Backfill from the tags currently on connections and logs
+    for table, tag_type in (('connection', 'connection'), ('log', 'interaction')):
+        op.execute(
+            "INSERT INTO usertagusage (user_id, type, name, name_key, count) "
+            # name_key as models.tag_key computes it
+            f"SELECT user_id, '{tag_type}', tag, lower(trim(tag)), count(*) "
+            f"FROM {table}, json_array_elements_text({table}.tags_json::json) AS tag "
+            "WHERE user_id IS NOT NULL "
+            "GROUP BY user_id, tag"
+        )
+    op.execute(
+        "INSERT INTO tagusage (type, name, name_key, count) "
+        "SELECT type, name, min(name_key), sum(count) FROM usertagusage GROUP BY type, name"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_usertagusage_top', table_name='usertagusage')
+    op.drop_index('ix_usertagusage_prefix', table_name='usertagusage')
+    op.drop_table('usertagusage')
+    op.drop_index('ix_tagusage_top', table_name='tagusage')
+    op.drop_index('ix_tagusage_prefix', table_name='tagusage')
+    op.drop_table('tagusage')
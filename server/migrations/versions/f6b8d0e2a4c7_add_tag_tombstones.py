@@ -0,0 +1,25 @@
+"""Allow tombstones without a user, for retired tag catalog entries
+
+Revision ID: f6b8d0e2a4c7
+Revises: e5a7c9d1f3b6
+Create Date: 2026-10-18 16:02:41.274903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b8d0e2a4c7'
+down_revision = 'e5a7c9d1f3b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('tombstone', 'user_id', existing_type=sa.Uuid(), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM tombstone WHERE user_id IS NULL")
+    op.alter_column('tombstone', 'user_id', existing_type=sa.Uuid(), nullable=False)
@@ -1,7 +1,10 @@
-from typing import Optional, List
+from typing import Optional, List, Union
 from sqlmodel import Field, SQLModel
-from pydantic import field_validator
-from datetime import datetime
+from pydantic import field_validator, model_validator
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, Index, String, event, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 import json
 import re
 
@@ -22,6 +25,10 @@ class TagDefinition(SQLModel, table=True):
     type: str          # 'connection' or 'interaction'
     is_custom: bool = Field(default=False)
 
+    # Ids are never reused (Postgres sequences already guarantee this), which
+    # tag_catalog_state relies on
+    __table_args__ = {"sqlite_autoincrement": True}
+
 
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
@@ -40,6 +47,8 @@ class User(SQLModel, table=True):
     is_active: bool = Field(default=True)
     is_onboarded: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped by every write to the user's data; the basis for ETags
+    data_version: int = Field(default=0)
 
 # ... (skip Connection)
 
@@ -68,6 +77,24 @@ class Connection(SQLModel, table=True):
     goals: Optional[str] = None
     tags_json: str = Field(default="[]") # Store tags as JSON string for SQLite simplicity
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Denormalized follow-up date so "next due" can be sorted with an index.
+    # Kept in sync by the before_insert/before_update listeners below.
+    next_due: Optional[datetime] = None
+
+    # Every list filter/sort key gets a (user_id, column) index so the
+    # per-user query never falls back to a sequential scan.
+    __table_args__ = (
+        Index("ix_connection_user_name", "user_id", "name"),
+        Index("ix_connection_user_company", "user_id", "company"),
+        Index("ix_connection_user_industry", "user_id", "industry"),
+        Index("ix_connection_user_location", "user_id", "location"),
+        Index("ix_connection_user_howmet", "user_id", "howMet"),
+        Index("ix_connection_user_last_contact", "user_id", "lastContact"),
+        Index("ix_connection_user_created_at", "user_id", "created_at"),
+        Index("ix_connection_user_next_due", "user_id", "next_due"),
+        Index("ix_connection_user_updated_at", "user_id", "updated_at", "id"),
+    )
 
 
     @property
@@ -79,6 +106,54 @@ class Connection(SQLModel, table=True):
         self.tags_json = json.dumps(value)
 
 
+def compute_next_due(
+    last_contact: Optional[datetime],
+    frequency: Optional[int],
+    created_at: Optional[datetime],
+) -> Optional[datetime]:
+    """Follow-up date: last contact (or creation, if never contacted) plus cadence."""
+    base = last_contact or created_at
+    if base is None:
+        return None
+    return base.replace(tzinfo=None) + timedelta(days=frequency or 90)
+
+
+class add_days(FunctionElement):
+    """SQL `timestamp + days`, for computing next_due inside UPDATE/INSERT statements."""
+    type = DateTime()
+    name = "add_days"
+    inherit_cache = True
+
+
+@compiles(add_days)
+def _add_days(element, compiler, **kw):
+    base, days = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"({base} + {days} * INTERVAL '1 day')"
+
+
+@compiles(add_days, "sqlite")
+def _add_days_sqlite(element, compiler, **kw):
+    base, days = (compiler.process(clause, **kw) for clause in element.clauses)
+    # datetime() drops the fractional seconds of SQLAlchemy's storage format
+    return f"(datetime({base}, '+' || {days} || ' days') || substr({base}, 20))"
+
+
+def next_due_expression(last_contact, frequency, created_at):
+    """compute_next_due() as a SQL expression; arguments may be columns or values."""
+    return add_days(func.coalesce(last_contact, created_at), func.coalesce(frequency, 90))
+
+
+@event.listens_for(Connection, "before_insert")
+@event.listens_for(Connection, "before_update")
+def _sync_next_due(mapper, connection, target: Connection):
+    target.next_due = compute_next_due(target.lastContact, target.frequency, target.created_at)
+
+
+@event.listens_for(Connection, "before_update")
+def _touch_connection(mapper, connection, target: Connection):
+    target.updated_at = datetime.utcnow()
+
+
 # ===== Shared validators =====
 
 def _validate_name(v: str) -> str:
@@ -136,6 +211,13 @@ def _validate_frequency(v: int) -> int:
         raise ValueError("Frequency must be 3650 days (10 years) or fewer")
     return v
 
+def _validate_tag(v: str) -> str:
+    cleaned = _validate_tags([v])
+    if not cleaned:
+        raise ValueError("Tag cannot be empty")
+    return cleaned[0]
+
+
 def _validate_tags(v: List[str]) -> List[str]:
     if len(v) > MAX_TAGS:
         raise ValueError(f"Maximum {MAX_TAGS} tags allowed")
@@ -263,6 +345,110 @@ class ConnectionUpdate(SQLModel):
         return _validate_tags(v)
 
 
+# Upper bound on an explicit id list in one bulk request
+MAX_BULK_IDS = 5000
+
+
+class ConnectionFilter(SQLModel):
+    """The GET /connections filters, for selecting connections in a bulk write."""
+    company: Optional[str] = None
+    industry: Optional[str] = None
+    location: Optional[str] = None
+    howMet: Optional[str] = None
+    not_contacted_days: Optional[int] = Field(default=None, ge=0, le=3650)
+    tag: Optional[str] = None
+
+
+class ConnectionBulkUpdate(SQLModel):
+    """Apply one ConnectionUpdate to either an explicit id list or a filter."""
+    ids: Optional[List[str]] = Field(default=None, max_length=MAX_BULK_IDS)
+    filter: Optional[ConnectionFilter] = None
+    update: ConnectionUpdate
+
+    @model_validator(mode="after")
+    def validate_target(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of ids or filter")
+        return self
+
+
+class BulkUpdateResult(SQLModel):
+    updated: int
+
+
+class TagMerge(SQLModel):
+    """Fold the source tags into target, across all of the user's rows."""
+    sources: List[str]
+    target: str
+
+    @field_validator('sources')
+    @classmethod
+    def validate_sources(cls, v):
+        v = _validate_tags(v)
+        if not v:
+            raise ValueError("At least one source tag is required")
+        return v
+
+    @field_validator('target')
+    @classmethod
+    def validate_target(cls, v):
+        return _validate_tag(v)
+
+
+# Upper bound on the profile URLs in one batch enrichment
+MAX_ENRICH_BATCH_URLS = 1000
+
+
+class EnrichBatch(SQLModel):
+    urls: List[str] = Field(min_length=1, max_length=MAX_ENRICH_BATCH_URLS)
+
+
+# Upper bounds on what the extension sends for one profile
+MAX_INGEST_JSON_LD = 20
+MAX_INGEST_HTML = 256 * 1024
+
+
+class ProfileIngest(SQLModel):
+    """
+    A profile as read by the extension in the user's LinkedIn tab: the
+    page's JSON-LD blocks (script text or parsed objects) and og:title,
+    and/or a trimmed HTML fragment holding them.
+    """
+    linkedin: str
+    json_ld: List[Union[str, dict]] = Field(default=[], max_length=MAX_INGEST_JSON_LD)
+    og_title: Optional[str] = None
+    html: Optional[str] = Field(default=None, max_length=MAX_INGEST_HTML)
+
+    @field_validator('linkedin')
+    @classmethod
+    def validate_linkedin(cls, v):
+        v = _validate_url(v)
+        if v is None:
+            raise ValueError("LinkedIn URL is required")
+        return v
+
+    @field_validator('og_title')
+    @classmethod
+    def validate_og_title(cls, v):
+        return _validate_short_field(v)
+
+    @model_validator(mode="after")
+    def validate_sources(self):
+        if not (self.json_ld or self.og_title or self.html):
+            raise ValueError("Provide json_ld, og_title or html")
+        return self
+
+
+class TagRename(SQLModel):
+    name: str
+    new_name: str
+
+    @field_validator('name', 'new_name')
+    @classmethod
+    def validate_names(cls, v):
+        return _validate_tag(v)
+
+
 class UserCreate(SQLModel):
     email: Optional[str] = None
     phone_number: Optional[str] = None
@@ -317,6 +503,13 @@ class Log(SQLModel, table=True):
     notes: str
     tags_json: str = Field(default="[]")
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_log_user_updated_at", "user_id", "updated_at", "id"),
+        # Newest-first timeline for one connection (detail page)
+        Index("ix_log_connection_created_at", "connection_id", "created_at", "id"),
+    )
 
     @property
     def tags(self) -> List[str]:
@@ -330,6 +523,64 @@ class Log(SQLModel, table=True):
 
 
 
+@event.listens_for(Log, "before_update")
+def _touch_log(mapper, connection, target: Log):
+    target.updated_at = datetime.utcnow()
+
+
+# Records hard deletes so /sync can tell clients what to drop
+class Tombstone(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # None for 'tag': the tag catalog is shared by every user
+    user_id: Optional[uuid.UUID] = Field(default=None, foreign_key="user.id")
+    entity_type: str   # 'connection', 'log' or 'tag'
+    entity_id: str
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_tombstone_user_deleted_at", "user_id", "deleted_at", "id"),
+    )
+
+
+# Prefix lookups compare name_key by code point (byte order), which is what
+# SQLite does by default and what the "C" collation gives Postgres, so a
+# btree range scan over the index finds every key with a given prefix.
+_TAG_KEY_TYPE = String().with_variant(String(collation="C"), "postgresql")
+
+
+def tag_key(name: str) -> str:
+    """Case-insensitive lookup key for tag autocomplete."""
+    return name.strip().lower()
+
+
+# How many times each tag has been applied, for autocomplete ranking.
+# Removing a tag from a row does not uncount it; a merge or rename moves a
+# user's counts from the source tags to the target (writes.move_tag_usage).
+class TagUsage(SQLModel, table=True):
+    type: str = Field(primary_key=True)  # 'connection' or 'interaction'
+    name: str = Field(primary_key=True)
+    name_key: str = Field(sa_type=_TAG_KEY_TYPE)
+    count: int = Field(default=0)
+
+    __table_args__ = (
+        Index("ix_tagusage_prefix", "type", "name_key", "count", "name"),
+        Index("ix_tagusage_top", "type", "count"),
+    )
+
+
+class UserTagUsage(SQLModel, table=True):
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    type: str = Field(primary_key=True)
+    name: str = Field(primary_key=True)
+    name_key: str = Field(sa_type=_TAG_KEY_TYPE)
+    count: int = Field(default=0)
+
+    __table_args__ = (
+        Index("ix_usertagusage_prefix", "user_id", "type", "name_key", "count", "name"),
+        Index("ix_usertagusage_top", "user_id", "type", "count"),
+    )
+
+
 class LogCreate(SQLModel):
     connection_id: Optional[str] = None
     type: str = "interaction"
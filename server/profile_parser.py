@@ -0,0 +1,163 @@
+"""
+Targeted LinkedIn profile extraction.
+
+The enrichment chain (JSON-LD Person, then og:title, then the URL slug)
+only reads <script type="application/ld+json"> blocks and the og:title
+meta tag. ProfileExtractor runs the same standard-library tokenizer, with
+the same settings, that BeautifulSoup's html.parser backend uses, so tags,
+attribute unescaping and script boundaries come out exactly as they did
+with a full soup, but it keeps only those two things instead of building
+a tree of the whole page.
+"""
+import json
+from html.parser import HTMLParser
+from typing import List, Optional
+
+JSON_LD_TYPE = "application/ld+json"
+
+
+class ProfileExtractor(HTMLParser):
+    """
+    Collects, in document order, the text of every JSON-LD script and the
+    content of the first og:title meta tag.
+    """
+
+    def __init__(self):
+        # As BeautifulSoup does; entities in text are of no interest here
+        super().__init__(convert_charrefs=False)
+        self.json_ld: List[str] = []
+        self.og_title: Optional[str] = None
+        self._script: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            if self.og_title is None:
+                # Later duplicates win and bare attributes read as "", like a soup
+                values = {name: value or "" for name, value in attrs}
+                if values.get("property") == "og:title":
+                    self.og_title = values.get("content", "")
+        elif tag == "script":
+            values = {name: value or "" for name, value in attrs}
+            self._script = [] if values.get("type") == JSON_LD_TYPE else None
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._script is not None:
+            # An empty script has no .string in a soup and was skipped there too
+            if self._script:
+                self.json_ld.append("".join(self._script))
+            self._script = None
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+
+
+def extract(html: str) -> ProfileExtractor:
+    extractor = ProfileExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor
+
+
+def parse_profile(html: str, url: str) -> dict:
+    """
+    {name, role, company, location, industry} from a profile page. Raises on
+    unexpected JSON-LD shapes or an empty og:title headline; the caller
+    falls back to the URL slug.
+    """
+    page = extract(html)
+    return parse_metadata(page.json_ld, page.og_title, url)
+
+
+def parse_metadata(json_ld: List[str], og_title: Optional[str], url: str) -> dict:
+    """
+    parse_profile on what was already extracted from the page: the JSON-LD
+    script texts in document order and the og:title content, if any.
+    """
+    name = "Unknown"
+    role = ""
+    company = ""
+    location = ""
+
+    # Try to parse JSON-LD structured data (schema.org)
+    for script in json_ld:
+        try:
+            data = json.loads(script)
+            graph = data.get("@graph", [data])
+
+            for item in graph:
+                if item.get("@type") == "Person":
+                    # Name
+                    name = item.get("name", name)
+
+                    # Location from address
+                    address = item.get("address", {})
+                    if isinstance(address, dict):
+                        location = address.get("addressLocality", "")
+
+                    # Current job from worksFor (first entry is usually current)
+                    works_for = item.get("worksFor", [])
+                    if works_for and len(works_for) > 0:
+                        current_job = works_for[0]
+                        company = current_job.get("name", "")
+                        job_location = current_job.get("location", "")
+                        if job_location and not location:
+                            location = job_location
+
+                    # Job titles (first is usually current)
+                    job_titles = item.get("jobTitle", [])
+                    if job_titles and len(job_titles) > 0:
+                        # Filter out obfuscated titles (contain ***)
+                        for title in job_titles:
+                            if "***" not in title:
+                                role = title
+                                break
+
+                    break  # Found Person, done
+        except (json.JSONDecodeError, TypeError):
+            continue
+
+    # Fallback to og:title if JSON-LD parsing failed
+    if name == "Unknown":
+        if og_title is not None:
+            content = og_title
+            main_part = content.split("|")[0].strip()
+            parts = main_part.split(" - ", 1)
+            name = parts[0].strip()
+
+            if len(parts) > 1:
+                headline = parts[1].strip()
+                if " at " in headline:
+                    role_company = headline.split(" at ", 1)
+                    role = role_company[0].strip()
+                    company = role_company[1].strip()
+                elif headline[0].isupper() and len(headline.split()) <= 4:
+                    company = headline
+                else:
+                    role = headline
+
+    # Final fallback to URL parsing
+    if name == "Unknown" or "Join LinkedIn" in name:
+        slug = url.split('/')[-1] or url.split('/')[-2]
+        name = slug.replace('-', ' ').title()
+
+    return {
+        "name": name,
+        "role": role,
+        "company": company,
+        "location": location,
+        "industry": ""
+    }
+
+
+def slug_profile(url: str) -> dict:
+    """The profile guessed from the URL alone, when the page cannot be used."""
+    slug = url.split('/')[-1] or url.split('/')[-2]
+    name = slug.replace('-', ' ').title()
+    return {
+        "name": name,
+        "role": "",
+        "company": "",
+        "location": "",
+        "industry": ""
+    }
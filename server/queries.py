@@ -0,0 +1,278 @@
+"""
+Lightweight read path for list endpoints.
+
+Selects only the columns a response needs with SQLAlchemy Core and maps the
+rows into compact __slots__ DTOs. Nothing is hydrated into ORM objects or
+tracked in the Session identity map, so a page of results is cheap to build
+and is thrown away as soon as it has been serialized.
+"""
+import base64
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import orjson
+from sqlalchemy import Boolean, func, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel import Session
+
+from models import Connection, Log, TagDefinition, TagUsage, UserTagUsage, tag_key
+from serializers import CONNECTION_FIELDS, CONNECTION_READ_FIELDS, LOG_FIELDS
+
+
+class _Row:
+    """Base for tuple-backed read DTOs; subclasses only declare __slots__."""
+    __slots__ = ()
+
+    def __init__(self, values, names=None):
+        # names narrows the populated slots for projected (sparse) selects
+        for name, value in zip(names or self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__slots__ if hasattr(self, name)
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class ConnectionRow(_Row):
+    __slots__ = CONNECTION_FIELDS + ("tags_json", "id", "created_at", "updated_at")
+
+
+class LogRow(_Row):
+    __slots__ = LOG_FIELDS + ("tags_json", "created_at", "updated_at")
+
+
+class TagRow(_Row):
+    __slots__ = ("type", "category", "name")
+
+
+def _columns(model, names):
+    table = model.__table__
+    return [table.c[name] for name in names]
+
+
+class json_array_contains(FunctionElement):
+    """
+    SQL test that a JSON array stored as text has an element exactly equal
+    to a string: case-sensitive and whole-element on every dialect, the same
+    comparison writes.rewrite_tags makes, whether the array was written with
+    ASCII escapes (Python) or raw UTF-8 (the database's JSON functions).
+    """
+    type = Boolean()
+    name = "json_array_contains"
+    inherit_cache = True
+
+
+@compiles(json_array_contains)
+def _json_array_contains(element, compiler, **kw):
+    column, value = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"(CAST({column} AS jsonb) @> jsonb_build_array(CAST({value} AS text)))"
+
+
+@compiles(json_array_contains, "sqlite")
+def _json_array_contains_sqlite(element, compiler, **kw):
+    column, value = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"EXISTS (SELECT 1 FROM json_each({column}) WHERE json_each.value = {value})"
+
+
+def tags_json_contains(column, tag: str):
+    """The stored JSON tag list contains tag (exactly, so "investor" != "Investor")."""
+    return json_array_contains(column, tag)
+
+
+def fetch_connections(
+    session: Session, filters, order_by=(), limit=None, offset=0,
+    fields: Tuple[str, ...] = CONNECTION_READ_FIELDS,
+) -> List[ConnectionRow]:
+    """fields are output (ConnectionRead) names; only their columns are selected."""
+    names = tuple("tags_json" if field == "tags" else field for field in fields)
+    statement = (
+        select(*_columns(Connection, names))
+        .where(*filters)
+        .order_by(*order_by)
+        .offset(offset)
+        .limit(limit)
+    )
+    return [ConnectionRow(row, names) for row in session.connection().execute(statement)]
+
+
+def fetch_logs(session: Session, filters, limit=None, offset=0, order_by=None) -> List[LogRow]:
+    """Newest first unless order_by is given."""
+    if order_by is None:
+        order_by = [Log.created_at.desc()]
+    statement = (
+        select(*_columns(Log, LogRow.__slots__))
+        .where(*filters)
+        .order_by(*order_by)
+        .offset(offset)
+        .limit(limit)
+    )
+    return [LogRow(row) for row in session.connection().execute(statement)]
+
+
+def encode_log_cursor(log: LogRow) -> str:
+    position = orjson.dumps([log.created_at.isoformat(), log.id])
+    return base64.urlsafe_b64encode(position).decode().rstrip("=")
+
+
+def decode_log_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for cursors this server did not issue."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, log_id = orjson.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(log_id)
+    except (ValueError, TypeError, orjson.JSONDecodeError) as e:
+        raise ValueError("Invalid log cursor") from e
+
+
+def fetch_log_page(
+    session: Session, filters, limit: int, before: Optional[str] = None
+) -> Tuple[List[LogRow], Optional[str]]:
+    """
+    Keyset page of logs, newest first, strictly older than the `before`
+    cursor. Returns the rows and the cursor for the next page (None when
+    there is nothing older). No COUNT is needed.
+    """
+    if before is not None:
+        filters = [*filters, tuple_(Log.created_at, Log.id) < tuple_(*decode_log_cursor(before))]
+    rows = fetch_logs(
+        session, filters, limit=limit + 1,
+        order_by=[Log.created_at.desc(), Log.id.desc()],
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_log_cursor(rows[-1])
+    return rows, None
+
+
+def fetch_tags(session: Session, tag_type: Optional[str] = None) -> List[TagRow]:
+    """Tags of one type, or of every type when tag_type is None."""
+    statement = (
+        select(TagDefinition.type, TagDefinition.category, TagDefinition.name)
+        .order_by(TagDefinition.id)
+    )
+    if tag_type is not None:
+        statement = statement.where(TagDefinition.type == tag_type)
+    return [TagRow(row) for row in session.connection().execute(statement)]
+
+
+def tag_catalog_state(session: Session, tag_type: Optional[str] = None) -> Tuple[int, Optional[int]]:
+    """
+    (count, max id) of the tag catalog. Tag ids are never reused and tags are
+    only inserted or deleted (never renamed in place), so this pair changes
+    exactly when the catalog does.
+    """
+    statement = select(func.count(), func.max(TagDefinition.id))
+    if tag_type is not None:
+        statement = statement.where(TagDefinition.type == tag_type)
+    return tuple(session.connection().execute(statement).one())
+
+
+def _prefix_range(column, prefix: str):
+    """column starts with prefix, as a range an index can seek (code point order)."""
+    if not prefix:
+        return []
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return [column >= prefix, column < upper]
+
+
+def _top_tags(session: Session, model, filters, prefix_key: str, limit: int) -> List[Tuple[str, int]]:
+    statement = (
+        select(model.name, model.count)
+        .where(*filters, *_prefix_range(model.name_key, prefix_key))
+        .order_by(model.count.desc(), model.name)
+        .limit(limit)
+    )
+    return [tuple(row) for row in session.connection().execute(statement)]
+
+
+def suggest_tags(session: Session, user_id, tag_type: str, prefix: str = "", limit: int = 10) -> List[dict]:
+    """
+    Up to `limit` tags starting with prefix (case-insensitive): the user's
+    own most used first, then the most used across all users.
+    """
+    prefix_key = tag_key(prefix)
+    mine = _top_tags(
+        session, UserTagUsage,
+        [UserTagUsage.user_id == user_id, UserTagUsage.type == tag_type], prefix_key, limit,
+    )
+    suggestions = [{"name": name, "count": count, "source": "user"} for name, count in mine]
+    if len(suggestions) < limit:
+        seen = {name for name, _ in mine}
+        # Over-fetch by what the user's own tags might displace
+        for name, count in _top_tags(
+            session, TagUsage, [TagUsage.type == tag_type], prefix_key, limit + len(mine)
+        ):
+            if name not in seen and len(suggestions) < limit:
+                suggestions.append({"name": name, "count": count, "source": "global"})
+    return suggestions
+
+
+# Matches the client's "due soon" window in utils/reminders.js
+DUE_SOON_DAYS = 14
+
+
+def dashboard_changes_at(session: Session, user_id, now: datetime) -> Optional[datetime]:
+    """
+    When dashboard_stats' overdue/due-soon counts next change without a
+    write: the earliest next_due still ahead (it turns overdue), or the
+    earliest moment a next_due comes within DUE_SOON_DAYS. None if neither
+    will happen. Part of the ETag, so clients revalidate exactly then.
+    """
+    contacted = [Connection.user_id == user_id, Connection.lastContact.is_not(None)]
+    due_soon = timedelta(days=DUE_SOON_DAYS)
+
+    def earliest(since):
+        return select(func.min(Connection.next_due)).where(
+            *contacted, Connection.next_due >= since
+        ).scalar_subquery()
+
+    overdue_at, soon_at = session.connection().execute(
+        select(earliest(now), earliest(now + due_soon))
+    ).one()
+    changes = [at for at in (overdue_at, soon_at and soon_at - due_soon) if at is not None]
+    return min(changes, default=None)
+
+
+def not_contacted_changes_at(session: Session, user_id, days: int, now: datetime) -> Optional[datetime]:
+    """
+    When the not_contacted_days=days filter next matches another of the
+    user's connections without a write: the earliest lastContact not yet
+    past the cutoff, plus days. None if no connection will cross it.
+    """
+    first = session.connection().execute(
+        select(func.min(Connection.lastContact)).where(
+            Connection.user_id == user_id,
+            Connection.lastContact >= now - timedelta(days=days),
+        )
+    ).scalar()
+    return first + timedelta(days=days) if first is not None else None
+
+
+def dashboard_stats(session: Session, user_id, now: Optional[datetime] = None) -> dict:
+    """Headline counts for the dashboard, in one round trip."""
+    now = now or datetime.utcnow()
+    # Never-contacted connections count as healthy, as on the client
+    contacted = [Connection.user_id == user_id, Connection.lastContact.is_not(None)]
+
+    def count(model, *filters):
+        return select(func.count()).select_from(model).where(*filters).scalar_subquery()
+
+    row = session.connection().execute(select(
+        count(Connection, Connection.user_id == user_id),
+        count(Log, Log.user_id == user_id),
+        count(Connection, *contacted, Connection.next_due < now),
+        count(
+            Connection, *contacted,
+            Connection.next_due >= now,
+            Connection.next_due < now + timedelta(days=DUE_SOON_DAYS),
+        ),
+    )).one()
+    return {
+        "total_connections": row[0],
+        "total_logs": row[1],
+        "overdue": row[2],
+        "due_soon": row[3],
+    }
@@ -0,0 +1,121 @@
+"""
+Re-run the profile parser over stored page snapshots (snapshot_store.py),
+in parallel on a process pool and with no network access, to see what a
+parser change does to profiles that were already fetched.
+
+Run from server/:
+    python reparse.py --out before.jsonl                 # current parser
+    ... change profile_parser.py ...
+    python reparse.py --baseline before.jsonl --out after.jsonl
+
+Output lines are {"url", "fetched_at", "sha256", "result"}. With
+--baseline, every snapshot whose result differs is reported field by field.
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from profile_parser import parse_profile
+from snapshot_store import ENRICH_SNAPSHOT_DIR, Snapshot, SnapshotStore
+
+# Snapshots handed to a pool process at a time; parsing one takes ~1 ms
+REPARSE_CHUNK_SIZE = 32
+
+
+def _parse_snapshot(root: str, snapshot: Snapshot, parser: Callable[[str, str], dict]) -> dict:
+    try:
+        return parser(SnapshotStore(root).load(snapshot.sha256), snapshot.url)
+    except Exception as e:
+        # Reported like any other result, so one bad page does not end the run
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def reparse(
+    store: SnapshotStore,
+    parser: Callable[[str, str], dict] = parse_profile,
+    workers: Optional[int] = None,
+    latest_only: bool = True,
+) -> Iterator[Tuple[Snapshot, dict]]:
+    """
+    (snapshot, result) for each stored snapshot, ordered by URL. parser must
+    be a module-level function so it can be sent to the pool processes.
+    """
+    snapshots = list(store.snapshots(latest_only))
+    if not snapshots:
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            _parse_snapshot, repeat(store.root), snapshots, repeat(parser),
+            chunksize=REPARSE_CHUNK_SIZE,
+        )
+        yield from zip(snapshots, results)
+
+
+def record(snapshot: Snapshot, result: dict) -> dict:
+    return {**snapshot._asdict(), "result": result}
+
+
+def changes(baseline: List[dict], records: List[dict]) -> List[dict]:
+    """
+    Records whose result differs from the baseline's for the same page
+    (same URL and content); pages missing from the baseline are skipped.
+    Each change is {"url", "sha256", "fields": {field: [old, new]}}.
+    """
+    before = {(entry["url"], entry["sha256"]): entry["result"] for entry in baseline}
+    found = []
+    for entry in records:
+        old = before.get((entry["url"], entry["sha256"]))
+        if old is None or old == entry["result"]:
+            continue
+        new = entry["result"]
+        fields = {
+            field: [old.get(field), new.get(field)]
+            for field in sorted(set(old) | set(new))
+            if old.get(field) != new.get(field)
+        }
+        found.append({"url": entry["url"], "sha256": entry["sha256"], "fields": fields})
+    return found
+
+
+def _read_jsonl(path: str) -> List[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dir", default=ENRICH_SNAPSHOT_DIR, help="snapshot directory (ENRICH_SNAPSHOT_DIR)")
+    parser.add_argument("--all", action="store_true", help="every snapshot, not just each URL's latest")
+    parser.add_argument("--workers", type=int, default=None, help="pool processes (default: CPU count)")
+    parser.add_argument("--out", help="write results as JSON lines")
+    parser.add_argument("--baseline", help="results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+    if not args.dir:
+        parser.error("no snapshot directory: pass --dir or set ENRICH_SNAPSHOT_DIR")
+
+    store = SnapshotStore(args.dir)
+    records = [
+        record(snapshot, result)
+        for snapshot, result in reparse(store, workers=args.workers, latest_only=not args.all)
+    ]
+    if args.out:
+        with open(args.out, "w") as f:
+            for entry in records:
+                f.write(json.dumps(entry) + "\n")
+    print(f"{len(records)} snapshots parsed")
+
+    if args.baseline:
+        found = changes(_read_jsonl(args.baseline), records)
+        for change in found:
+            print(change["url"])
+            for field, (old, new) in change["fields"].items():
+                print(f"  {field}: {old!r} -> {new!r}")
+        print(f"{len(found)} changed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Per-user response cache: an in-process LRU (L1) in front of Redis (L2).
+
+Entries are encoded response bodies keyed by the response's ETag, which
+already covers the user, their data_version, the route, the normalized
+query string and the media type. Every mutating endpoint bumps
+data_version in the same transaction as the write, so a write moves the
+user onto fresh keys and nothing stale is ever read back; old entries age
+out of the LRU and expire from both tiers on their TTL.
+
+Misses are single-flight: concurrent identical requests in a process share
+one build, and with Redis, processes coordinate through a short per-key
+lock so only one of them queries the database while the others wait for
+the body to appear in Redis. This also covers the stampede when a popular
+entry expires; TTLs are jittered so entries written together (e.g. the
+first loads after login) do not all expire together.
+
+Redis is optional (RESPONSE_CACHE_URL, falling back to REDIS_URL). The
+cache never fails a request: Redis errors are counted and Redis is skipped
+for a short while before it is tried again.
+"""
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import redis
+from fastapi.responses import Response
+
+from etags import cache_headers
+from serializers import WireFormat, render_encoded
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL") or os.getenv("REDIS_URL")
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "600"))
+RESPONSE_CACHE_L1_SIZE = int(os.getenv("RESPONSE_CACHE_L1_SIZE", "512"))
+# Bodies larger than this are not worth holding in memory or shipping to Redis
+RESPONSE_CACHE_MAX_BODY = int(os.getenv("RESPONSE_CACHE_MAX_BODY", str(1024 * 1024)))
+
+KEY_PREFIX = "resp:"
+LOCK_PREFIX = "resp-lock:"
+# A cross-process build lock is held at most this long (ms), in case its owner dies
+BUILD_LOCK_TTL_MS = 5000
+# How long, and how often, to check Redis for a body another process is building
+BUILD_WAIT_SECONDS = 3.0
+BUILD_POLL_SECONDS = 0.02
+# After a Redis error, serve from L1 and the database only for this long
+REDIS_RETRY_SECONDS = 5.0
+
+
+class LRUCache:
+    """
+    Thread-safe bounded mapping; the least recently used entry is evicted
+    first. With a ttl (seconds), entries also expire that long after being set.
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        client=None,
+        l1_size: int = RESPONSE_CACHE_L1_SIZE,
+        ttl: int = RESPONSE_CACHE_TTL,
+        max_body: int = RESPONSE_CACHE_MAX_BODY,
+    ):
+        self.redis = client
+        # Same lifetime as the Redis tier, so L1 is never the staler copy
+        self.l1 = LRUCache(l1_size, ttl)
+        self.ttl = ttl
+        self.max_body = max_body
+        self._redis_down_until = 0.0
+        self._flights = SingleFlight()
+        self._stats = {
+            "l1_hits": 0, "l2_hits": 0, "misses": 0, "redis_errors": 0,
+            "builds": 0, "coalesced": 0, "remote_waits": 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, error: Exception):
+        self._count("redis_errors")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning("Response cache: Redis unavailable (%s)", error)
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self.l1.get(key)
+        if body is not None:
+            self._count("l1_hits")
+            return body
+        if self._redis_available():
+            try:
+                body = self.redis.get(KEY_PREFIX + key)
+            except redis.RedisError as e:
+                self._redis_failed(e)
+            if body is not None:
+                self._count("l2_hits")
+                self.l1.set(key, body)
+                return body
+        self._count("misses")
+        return None
+
+    def set(self, key: str, body: bytes):
+        if len(body) > self.max_body:
+            return
+        self.l1.set(key, body)
+        if self._redis_available():
+            try:
+                self.redis.set(KEY_PREFIX + key, body, ex=self._jittered_ttl())
+            except redis.RedisError as e:
+                self._redis_failed(e)
+
+    def _jittered_ttl(self) -> int:
+        return max(1, round(self.ttl * random.uniform(0.9, 1.1)))
+
+    def get_or_build(self, key: str, build: Callable[[], bytes]) -> bytes:
+        """Cached body for key, or build() it once however many callers are waiting."""
+        body = self.get(key)
+        if body is not None:
+            return body
+        body, shared = self._flights.do(key, lambda: self._build_once(key, build))
+        if shared:
+            self._count("coalesced")
+        return body
+
+    def _build_once(self, key: str, build: Callable[[], bytes]) -> bytes:
+        # A flight that finished just before this one started may have filled L1
+        body = self.l1.get(key)
+        if body is not None:
+            return body
+
+        token = self._acquire_build_lock(key)
+        if token is None:
+            # Another process is building this key
+            self._count("remote_waits")
+            body = self._wait_for_remote(key)
+            if body is not None:
+                return body
+        try:
+            self._count("builds")
+            body = build()
+            self.set(key, body)
+            return body
+        finally:
+            if token:
+                self._release_build_lock(key, token)
+
+    def _acquire_build_lock(self, key: str) -> Optional[str]:
+        """
+        A token if this process should build key, None if another process
+        holds the lock. Without Redis every process builds for itself.
+        """
+        if not self._redis_available():
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            if self.redis.set(LOCK_PREFIX + key, token, nx=True, px=BUILD_LOCK_TTL_MS):
+                return token
+            return None
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return ""
+
+    def _release_build_lock(self, key: str, token: str):
+        # Not atomic: if the lock expired in between we may drop another
+        # process's lock, which at worst costs one duplicate build
+        try:
+            if self.redis.get(LOCK_PREFIX + key) == token.encode():
+                self.redis.delete(LOCK_PREFIX + key)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def _wait_for_remote(self, key: str) -> Optional[bytes]:
+        deadline = time.monotonic() + BUILD_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(BUILD_POLL_SECONDS)
+            try:
+                body = self.redis.get(KEY_PREFIX + key)
+                if body is not None:
+                    self.l1.set(key, body)
+                    return body
+                if not self.redis.exists(LOCK_PREFIX + key):
+                    # The builder gave up (error, or a body too large to share)
+                    return None
+            except redis.RedisError as e:
+                self._redis_failed(e)
+                return None
+        return None
+
+    def clear(self):
+        """Drop the L1 entries and reset the counters (Redis entries are left to expire)."""
+        self.l1.clear()
+        with self._stats_lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["l1_hits"] + stats["l2_hits"]) / lookups if lookups else 0.0
+        stats["l1_entries"] = len(self.l1)
+        stats["redis"] = self.redis is not None
+        return stats
+
+
+def _connect(url: Optional[str]):
+    if not url:
+        return None
+    # Short timeouts: a slow cache must not be slower than the database
+    return redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+
+
+response_cache = ResponseCache(_connect(RESPONSE_CACHE_URL))
+
+
+def cached_render(fmt: WireFormat, etag: str, build: Callable[[], Any]) -> Response:
+    """
+    render() through the response cache. build() produces the content and
+    runs once per miss, however many identical requests arrive together;
+    the encoded body is stored under the ETag.
+    """
+    body = response_cache.get_or_build(etag, lambda: fmt.dumps(build()))
+    return render_encoded(fmt, body, headers=cache_headers(etag))
@@ -0,0 +1,137 @@
+"""
+Fast-path encoding for list endpoints.
+
+Rows read back from the database were already validated on write, so the
+list endpoints skip the ConnectionRead/LogRead models and encode plain
+dicts straight to bytes with orjson. The stored tags_json text is embedded
+as-is instead of being decoded and re-encoded for every row.
+
+Clients that send `Accept: application/msgpack` get the same structure as
+MessagePack, with datetimes as integer milliseconds since the Unix epoch.
+"""
+from datetime import datetime, timedelta, timezone
+import uuid
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+import msgpack
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+# Field order mirrors ConnectionRead / LogRead so the JSON is unchanged
+CONNECTION_FIELDS = (
+    "name", "role", "company", "location", "industry", "howMet",
+    "frequency", "lastContact", "notes", "linkedin", "email", "goals",
+)
+CONNECTION_READ_FIELDS = CONNECTION_FIELDS + ("tags", "id", "created_at")
+LOG_FIELDS = ("id", "connection_id", "type", "notes")
+
+
+def connection_fieldset(requested: str) -> tuple:
+    """
+    Parse a comma-separated ?fields= value into output fields, in
+    ConnectionRead order. "id" is always included. Raises ValueError
+    for unknown names.
+    """
+    names = {name.strip() for name in requested.split(",") if name.strip()}
+    unknown = names - set(CONNECTION_READ_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    names.add("id")
+    return tuple(field for field in CONNECTION_READ_FIELDS if field in names)
+
+
+# ===== Wire formats =====
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def _json_dumps(content) -> bytes:
+    # OPT_UTC_Z matches pydantic's "Z" suffix for UTC datetimes
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, datetime):
+        # Stored datetimes are naive UTC
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return (obj - _EPOCH) // _MILLISECOND
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Cannot serialize {type(obj).__name__} to MessagePack")
+
+
+def _msgpack_dumps(content) -> bytes:
+    return msgpack.packb(content, default=_msgpack_default, datetime=False)
+
+
+class WireFormat(NamedTuple):
+    media_type: str
+    embed_json: Callable[[str], Any]  # how stored JSON text (tags_json) is embedded
+    dumps: Callable[[Any], bytes]
+
+
+JSON = WireFormat("application/json", orjson.Fragment, _json_dumps)
+MSGPACK = WireFormat("application/msgpack", orjson.loads, _msgpack_dumps)
+
+_MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def negotiate(request: Request) -> WireFormat:
+    """MessagePack only when the client explicitly asks for it; JSON otherwise."""
+    accept = request.headers.get("accept", "")
+    for media_range in accept.split(","):
+        media_type, _, params = media_range.partition(";")
+        if media_type.strip().lower() in _MSGPACK_TYPES and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            return MSGPACK
+    return JSON
+
+
+def render(fmt: WireFormat, content, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    """Encode a negotiated response; Vary: Accept keeps caches from mixing formats."""
+    return render_encoded(fmt, fmt.dumps(content), status_code, headers)
+
+
+def render_encoded(fmt: WireFormat, body: bytes, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    """render() for a body that is already encoded in fmt (e.g. from a cache)."""
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers={**(headers or {}), "Vary": "Accept"},
+        media_type=fmt.media_type,
+    )
+
+
+# ===== Row encoders =====
+
+def connection_to_dict(connection, fields: tuple = CONNECTION_READ_FIELDS, fmt: WireFormat = JSON) -> dict:
+    data = {}
+    for field in fields:
+        if field == "tags":
+            data["tags"] = fmt.embed_json(connection.tags_json)
+        else:
+            data[field] = getattr(connection, field)
+    return data
+
+
+def log_to_dict(log, fmt: WireFormat = JSON) -> dict:
+    data = {field: getattr(log, field) for field in LOG_FIELDS}
+    data["tags"] = fmt.embed_json(log.tags_json)
+    data["created_at"] = log.created_at
+    return data
+
+
+def paginated(items: List[dict], total: int, limit: int, offset: int) -> dict:
+    return {"items": items, "total": total, "limit": limit, "offset": offset}
+
+
+def encode_connections(
+    connections: Iterable, fields: tuple = CONNECTION_READ_FIELDS, fmt: WireFormat = JSON
+) -> List[dict]:
+    return [connection_to_dict(c, fields, fmt) for c in connections]
+
+
+def encode_logs(logs: Iterable, fmt: WireFormat = JSON) -> List[dict]:
+    return [log_to_dict(log, fmt) for log in logs]
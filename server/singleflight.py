@@ -0,0 +1,55 @@
+"""
+In-process single-flight: concurrent calls with the same key share one
+execution. The first caller (the leader) runs the function; callers that
+arrive while it is running wait for its result, or its exception, instead
+of repeating the work.
+"""
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, wait_timeout: float = 10.0):
+        # Followers stop waiting after this long and run the function themselves
+        self.wait_timeout = wait_timeout
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared); shared is True when another caller computed it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(self.wait_timeout):
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result, True
+            return fn(), False
+
+        try:
+            flight.result = fn()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
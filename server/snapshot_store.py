@@ -0,0 +1,128 @@
+"""
+Raw HTML snapshots of fetched profile pages, so a new parser version can be
+run over past fetches (reparse.py) without going back to LinkedIn.
+
+Pages are stored gzip-compressed and content-addressed: one blob per
+distinct page body under blobs/<sha256[:2]>/<sha256>.html.gz, so a profile
+that has not changed between fetches costs one index line, not another
+copy. Each fetch appends {"url", "fetched_at", "sha256"} to the URL's index
+file, index/<url_key>.jsonl, where url is the normalized profile URL.
+
+Off unless ENRICH_SNAPSHOT_DIR is set. Writes are atomic (temp file and
+rename for blobs, one O_APPEND write per index line), so prefork worker
+processes can share a directory. Failing to store a snapshot is logged
+and never fails the enrichment.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from typing import Iterator, NamedTuple, Optional
+
+from enrichment_cache import url_key
+
+logger = logging.getLogger(__name__)
+
+ENRICH_SNAPSHOT_DIR = os.getenv("ENRICH_SNAPSHOT_DIR", "")
+# Snapshots are written once and read rarely; favor ratio over speed
+SNAPSHOT_GZIP_LEVEL = 9
+BLOB_SUFFIX = ".html.gz"
+
+
+class Snapshot(NamedTuple):
+    url: str
+    fetched_at: str
+    sha256: str
+
+
+class SnapshotStore:
+    def __init__(self, root: Optional[str]):
+        self.root = root or None
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest + BLOB_SUFFIX)
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.root, "index", url_key(url) + ".jsonl")
+
+    def save(self, url: str, html: str, fetched_at: Optional[datetime] = None) -> Optional[str]:
+        """Store html fetched from url; returns its sha256, or None when off or on error."""
+        if self.root is None:
+            return None
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        entry = {
+            "url": url,
+            "fetched_at": (fetched_at or datetime.utcnow()).isoformat(),
+            "sha256": digest,
+        }
+        try:
+            path = self._blob_path(digest)
+            if not os.path.exists(path):
+                self._write_blob(path, gzip.compress(body, compresslevel=SNAPSHOT_GZIP_LEVEL))
+            index = self._index_path(url)
+            os.makedirs(os.path.dirname(index), exist_ok=True)
+            line = (json.dumps(entry) + "\n").encode()
+            fd = os.open(index, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning("Snapshot store: could not save %s (%s)", url, e)
+            return None
+        return digest
+
+    @staticmethod
+    def _write_blob(path: str, data: bytes):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, digest: str) -> str:
+        """The page stored under digest; raises OSError if it is missing."""
+        with open(self._blob_path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def history(self, url: str) -> list:
+        """Every snapshot of url, oldest first."""
+        try:
+            with open(self._index_path(url)) as f:
+                return [Snapshot(**json.loads(line)) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def snapshots(self, latest_only: bool = True) -> Iterator[Snapshot]:
+        """All stored snapshots (or each URL's latest), ordered by URL."""
+        if self.root is None:
+            return
+        index_dir = os.path.join(self.root, "index")
+        if not os.path.isdir(index_dir):
+            return
+        histories = []
+        for name in os.listdir(index_dir):
+            if not name.endswith(".jsonl"):
+                continue
+            with open(os.path.join(index_dir, name)) as f:
+                history = [Snapshot(**json.loads(line)) for line in f if line.strip()]
+            if history:
+                histories.append(history)
+        histories.sort(key=lambda history: history[0].url)
+        for history in histories:
+            if latest_only:
+                yield max(history, key=lambda snapshot: snapshot.fetched_at)
+            else:
+                yield from history
+
+
+snapshot_store = SnapshotStore(ENRICH_SNAPSHOT_DIR)
@@ -0,0 +1,218 @@
+"""
+Delta sync: everything that changed for a user since an opaque cursor.
+
+The cursor records a keyset position per stream -- (updated_at, id) for
+connections and logs, (deleted_at, id) for tombstones, and the last seen id
+for the shared tag catalog and for its tombstones (retired tags). Each page reads at most `limit` rows per
+stream using the (user_id, updated_at, id) indexes, so a warm refresh costs
+work proportional to what changed rather than to the size of the account.
+
+Timestamps come from the application clock when a statement runs, not when
+its transaction commits, so a row can become visible after a client has
+synced past its timestamp. Once a stream is caught up, the next request
+re-reads SYNC_OVERLAP_SECONDS behind the position; rows already delivered
+inside that window are remembered in the cursor and not sent again.
+"""
+import base64
+import os
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Tuple
+
+import orjson
+from sqlalchemy import func, select, tuple_
+from sqlmodel import Session
+
+from models import Connection, Log, TagDefinition, Tombstone
+from queries import fetch_connections, fetch_logs
+from serializers import CONNECTION_READ_FIELDS, JSON, WireFormat, encode_connections, encode_logs
+
+STREAMS = ("connections", "logs", "deleted", "tags", "deleted_tags")
+TIMESTAMPED_STREAMS = ("connections", "logs", "deleted")
+
+# Longer than any write transaction is expected to stay open
+SYNC_OVERLAP = timedelta(seconds=float(os.getenv("SYNC_OVERLAP_SECONDS", "5")))
+# Delivered rows remembered per stream; past this the oldest may be sent twice
+SYNC_SEEN_MAX = 200
+
+
+class Position(NamedTuple):
+    """Where a timestamped stream stands: its last row, and whether it was drained."""
+    at: datetime
+    id: object
+    caught_up: bool = False
+    # (id, timestamp) of rows delivered within SYNC_OVERLAP of `at`
+    seen: Tuple[Tuple[object, datetime], ...] = ()
+
+
+def encode_cursor(position: dict) -> str:
+    encoded = {
+        key: [
+            value.at.isoformat(), value.id, value.caught_up,
+            [[row_id, at.isoformat()] for row_id, at in value.seen],
+        ] if isinstance(value, Position) else value
+        for key, value in position.items()
+    }
+    return base64.urlsafe_b64encode(orjson.dumps(encoded)).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> dict:
+    """Raises ValueError for cursors this server did not issue."""
+    if not cursor:
+        return {}
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = orjson.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(position, dict) or set(position) - set(STREAMS):
+            raise ValueError("Invalid sync cursor")
+        for key in TIMESTAMPED_STREAMS:
+            if key in position:
+                # Cursors issued before the overlap window hold just [timestamp, id]
+                timestamp, row_id, caught_up, seen = (position[key] + [False, []])[:4]
+                position[key] = Position(
+                    datetime.fromisoformat(timestamp), row_id, bool(caught_up),
+                    tuple((seen_id, datetime.fromisoformat(at)) for seen_id, at in seen),
+                )
+        for key in ("tags", "deleted_tags"):
+            if key in position:
+                position[key] = int(position[key])
+        return position
+    except (ValueError, TypeError, orjson.JSONDecodeError) as e:
+        raise ValueError("Invalid sync cursor") from e
+
+
+def _after(position: Optional[Position], timestamp_column, id_column):
+    if position is None:
+        return []
+    if position.caught_up:
+        return [timestamp_column >= position.at - SYNC_OVERLAP]
+    return [tuple_(timestamp_column, id_column) > tuple_(position.at, position.id)]
+
+
+def _fetch_limit(position: Optional[Position], limit: int) -> int:
+    # Room for the look-ahead row and for re-read rows that get filtered out
+    if position is not None and position.caught_up:
+        return limit + 1 + len(position.seen)
+    return limit + 1
+
+
+def _page(rows, limit):
+    """Trim the look-ahead row; report whether the stream has more."""
+    return rows[:limit], len(rows) > limit
+
+
+def _timestamped_page(
+    rows, position: Optional[Position], limit: int, timestamp_of
+) -> Tuple[list, bool, Optional[Position]]:
+    """
+    Page of a timestamped stream read with _after(): drops re-read rows the
+    client already has, and returns the stream's next position.
+    """
+    if position is not None and position.caught_up:
+        seen = dict(position.seen)
+        rows = [
+            row for row in rows
+            if (timestamp_of(row), row.id) > (position.at, position.id)
+            or seen.get(row.id) != timestamp_of(row)
+        ]
+    rows, more = _page(rows, limit)
+    if position is None and not rows:
+        return rows, more, None
+
+    at, last_id = (position.at, position.id) if position is not None else (None, None)
+    seen = dict(position.seen) if position is not None else {}
+    for row in rows:
+        if at is None or (timestamp_of(row), row.id) > (at, last_id):
+            at, last_id = timestamp_of(row), row.id
+        seen[row.id] = timestamp_of(row)
+    window = sorted(
+        ((row_id, seen_at) for row_id, seen_at in seen.items() if seen_at >= at - SYNC_OVERLAP),
+        key=lambda item: (item[1], str(item[0])),
+    )[-SYNC_SEEN_MAX:]
+    return rows, more, Position(at, last_id, not more, tuple(window))
+
+
+def sync_page(
+    session: Session, user_id, cursor: Optional[str], limit: int, fmt: WireFormat = JSON
+) -> dict:
+    position = decode_cursor(cursor)
+    has_more = False
+
+    def advance(key, rows, timestamp_of):
+        nonlocal has_more
+        rows, more, next_position = _timestamped_page(rows, position.get(key), limit, timestamp_of)
+        has_more |= more
+        if next_position is not None:
+            position[key] = next_position
+        return rows
+
+    since = position.get("connections")
+    connections = advance("connections", fetch_connections(
+        session,
+        [Connection.user_id == user_id, *_after(since, Connection.updated_at, Connection.id)],
+        order_by=[Connection.updated_at, Connection.id],
+        limit=_fetch_limit(since, limit),
+        fields=CONNECTION_READ_FIELDS + ("updated_at",),
+    ), lambda row: row.updated_at)
+
+    since = position.get("logs")
+    logs = advance("logs", fetch_logs(
+        session,
+        [Log.user_id == user_id, *_after(since, Log.updated_at, Log.id)],
+        limit=_fetch_limit(since, limit),
+        order_by=[Log.updated_at, Log.id],
+    ), lambda row: row.updated_at)
+
+    since = position.get("deleted")
+    tombstones = advance("deleted", session.connection().execute(
+        select(Tombstone.id, Tombstone.entity_type, Tombstone.entity_id, Tombstone.deleted_at)
+        .where(
+            Tombstone.user_id == user_id,
+            *_after(since, Tombstone.deleted_at, Tombstone.id),
+        )
+        .order_by(Tombstone.deleted_at, Tombstone.id)
+        .limit(_fetch_limit(since, limit))
+    ).all(), lambda row: row.deleted_at)
+
+    tags, more = _page(session.connection().execute(
+        select(TagDefinition.id, TagDefinition.type, TagDefinition.category, TagDefinition.name)
+        .where(TagDefinition.id > position.get("tags", 0))
+        .order_by(TagDefinition.id)
+        .limit(limit + 1)
+    ).all(), limit)
+    has_more |= more
+    if tags:
+        position["tags"] = tags[-1].id
+
+    tag_tombstones = [Tombstone.user_id.is_(None), Tombstone.entity_type == "tag"]
+    if "deleted_tags" in position:
+        retired_tags, more = _page(session.connection().execute(
+            select(Tombstone.id, Tombstone.entity_id)
+            .where(*tag_tombstones, Tombstone.id > position["deleted_tags"])
+            .order_by(Tombstone.id)
+            .limit(limit + 1)
+        ).all(), limit)
+        has_more |= more
+    else:
+        # A client without the position never had the tags retired so far
+        retired_tags = []
+        position["deleted_tags"] = session.connection().execute(
+            select(func.coalesce(func.max(Tombstone.id), 0)).where(*tag_tombstones)
+        ).scalar()
+    if retired_tags:
+        position["deleted_tags"] = retired_tags[-1].id
+
+    deleted = {"connections": [], "logs": [], "tags": [int(t.entity_id) for t in retired_tags]}
+    for tombstone in tombstones:
+        deleted[f"{tombstone.entity_type}s"].append(tombstone.entity_id)
+
+    return {
+        "connections": encode_connections(connections, fmt=fmt),
+        "logs": encode_logs(logs, fmt),
+        "tags": [
+            {"id": t.id, "type": t.type, "category": t.category, "name": t.name}
+            for t in tags
+        ],
+        "deleted": deleted,
+        "cursor": encode_cursor(position),
+        "has_more": has_more,
+    }
@@ -0,0 +1,144 @@
+"""
+In-process tag catalog cache.
+
+The tag catalog is small, shared by every user and almost never changes,
+so each process builds the grouped catalog for a tag type once and keeps
+it, with its JSON (and, on demand, MessagePack) encoding, until it is
+invalidated:
+
+- locally, when ensure_custom_tags inserts a tag;
+- in every other process, through a Redis pub/sub message on
+  TAG_CATALOG_CHANNEL;
+- after TAG_CATALOG_MAX_AGE seconds regardless, as a backstop for missed
+  messages or deployments without Redis.
+
+Entries carry the (count, max id) catalog state they were built from,
+which is what ETags are derived from, so every process hands out the same
+ETag for the same catalog.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import redis
+from sqlmodel import Session
+
+from queries import fetch_tags, tag_catalog_state
+from serializers import WireFormat
+
+logger = logging.getLogger(__name__)
+
+TAG_CATALOG_URL = os.getenv("RESPONSE_CACHE_URL") or os.getenv("REDIS_URL")
+TAG_CATALOG_MAX_AGE = float(os.getenv("TAG_CATALOG_MAX_AGE", "60"))
+TAG_CATALOG_CHANNEL = "tag-catalog:invalidate"
+
+
+class CatalogEntry:
+    __slots__ = ("state", "content", "built_at", "_bodies")
+
+    def __init__(self, state: Tuple[int, Optional[int]], content: Dict):
+        self.state = state
+        self.content = content
+        self.built_at = time.monotonic()
+        self._bodies: Dict[str, bytes] = {}
+
+    def body(self, fmt: WireFormat) -> bytes:
+        """content encoded in fmt, encoded at most once per format."""
+        body = self._bodies.get(fmt.media_type)
+        if body is None:
+            body = self._bodies[fmt.media_type] = fmt.dumps(self.content)
+        return body
+
+
+class TagCatalog:
+    def __init__(
+        self,
+        group: Callable[[list], Dict],
+        client=None,
+        max_age: float = TAG_CATALOG_MAX_AGE,
+    ):
+        """group turns a list of TagRows into the GET /tags/{type} structure."""
+        self.group = group
+        self.redis = client
+        self.max_age = max_age
+        self._entries: Dict[str, CatalogEntry] = {}
+        # Bumped by every invalidation; a build that started before one is discarded
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._listener = None
+        # Lets the listener skip this process's own broadcasts
+        self._origin = uuid.uuid4().hex
+
+    def entry(self, session: Session, tag_type: str) -> CatalogEntry:
+        entry = self._entries.get(tag_type)
+        if entry is not None and time.monotonic() - entry.built_at < self.max_age:
+            return entry
+
+        generation = self._generation
+        state = tag_catalog_state(session, tag_type)
+        tags = fetch_tags(session, tag_type)
+        entry = CatalogEntry(state, self.group(tags))
+        with self._lock:
+            if generation == self._generation:
+                self._entries[tag_type] = entry
+        return entry
+
+    def invalidate(self, tag_type: Optional[str] = None, broadcast: bool = True):
+        """Drop one tag type (or all) here and, with broadcast, in every other process."""
+        with self._lock:
+            self._generation += 1
+            if tag_type is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(tag_type, None)
+        if broadcast:
+            publish_invalidation(self.redis, tag_type, self._origin)
+
+    def _on_message(self, message: Dict[str, Any]):
+        data = message["data"]
+        origin, _, tag_type = (data.decode() if isinstance(data, bytes) else data).partition(":")
+        if origin != self._origin:
+            self.invalidate(tag_type or None, broadcast=False)
+
+    def _on_listener_error(self, error, pubsub, thread):
+        # Messages may have been missed while disconnected
+        logger.warning("Tag catalog: invalidation listener error (%s)", error)
+        self.invalidate(broadcast=False)
+        time.sleep(1)
+
+    def start_listener(self):
+        """Subscribe to invalidations from other processes (no-op without Redis)."""
+        if self.redis is None or self._listener is not None:
+            return
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(**{TAG_CATALOG_CHANNEL: self._on_message})
+        except redis.RedisError as e:
+            # Entries still expire after max_age
+            logger.warning("Tag catalog: not listening for invalidations (%s)", e)
+            return
+        self._listener = pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True, exception_handler=self._on_listener_error
+        )
+
+    def stop_listener(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+def publish_invalidation(client, tag_type: Optional[str] = None, origin: str = ""):
+    """Tell every API process to drop its catalog for tag_type (or all types)."""
+    if client is None:
+        return
+    try:
+        client.publish(TAG_CATALOG_CHANNEL, f"{origin}:{tag_type or ''}")
+    except redis.RedisError as e:
+        logger.warning("Tag catalog: could not broadcast invalidation (%s)", e)
+
+
+def connect(url: Optional[str] = TAG_CATALOG_URL):
+    return redis.Redis.from_url(url) if url else None
@@ -0,0 +1,80 @@
+"""
+Set-based tag rename and merge.
+
+Rewrites every connection (or log) of one user that carries any of the
+source tags so it carries the target instead, in keyset batches of
+BULK_BATCH_SIZE rows, each one UPDATE committed on its own. The catalog
+changes (adding the target, retiring custom sources nobody uses any more)
+and the usage-count move happen together in one final transaction.
+
+Used inline by the API for small accounts and by the Celery worker for
+large ones, so it only depends on the database layer.
+"""
+import os
+from typing import Callable, List, Optional
+
+from sqlalchemy import func, or_, select
+from sqlmodel import Session
+
+from models import Connection, Log
+from queries import tags_json_contains
+import writes
+
+# Accounts with more affected rows than this are rewritten in the background
+TAG_REWRITE_INLINE_LIMIT = int(os.getenv("TAG_REWRITE_INLINE_LIMIT", "1000"))
+
+TAG_TABLES = {"connection": Connection, "interaction": Log}
+
+
+def _affected_filters(model, user_id, sources: List[str]):
+    return [
+        model.user_id == user_id,
+        or_(*(tags_json_contains(model.tags_json, source) for source in sources)),
+    ]
+
+
+def affected_rows(session: Session, user_id, tag_type: str, sources: List[str]) -> int:
+    model = TAG_TABLES[tag_type]
+    return session.connection().execute(
+        select(func.count()).select_from(model).where(*_affected_filters(model, user_id, sources))
+    ).scalar()
+
+
+def merge_tags(
+    session: Session,
+    user_id,
+    tag_type: str,
+    sources: List[str],
+    target: str,
+    on_catalog_change: Optional[Callable[[str], None]] = None,
+    batch_size: Optional[int] = None,
+) -> dict:
+    """
+    Returns {"updated": rows rewritten, "retired": source tags removed from
+    the catalog}. on_catalog_change(tag_type) runs after the catalog commit
+    if it changed.
+    """
+    model = TAG_TABLES[tag_type]
+    sources = [source for source in dict.fromkeys(sources) if source != target]
+    if not sources:
+        return {"updated": 0, "retired": []}
+    filters = _affected_filters(model, user_id, sources)
+
+    updated = duplicates = 0
+    for ids in writes.id_batches(session, model, filters, batch_size or writes.BULK_BATCH_SIZE):
+        duplicates += writes.merged_duplicates(session, model, ids, [*sources, target])
+        updated += writes.rewrite_tags(session, model, ids, sources, target)
+        writes.bump_data_version(session, user_id)
+        session.commit()
+
+    # A merge that matched no row does not add its target to the catalog
+    added = updated > 0 and writes.ensure_tag_definition(session, tag_type, target)
+    retired = writes.retire_unused_tags(session, model, tag_type, sources)
+    writes.move_tag_usage(session, user_id, tag_type, sources, target, duplicates)
+    if added or retired:
+        writes.bump_data_version(session, user_id)
+    session.commit()
+
+    if (added or retired) and on_catalog_change is not None:
+        on_catalog_change(tag_type)
+    return {"updated": updated, "retired": retired}
@@ -0,0 +1,124 @@
+"""
+Task status pushed over Redis pub/sub, for GET /tasks/{id}/events.
+
+The worker publishes on TASK_EVENTS_PREFIX + task_id whenever a task
+starts, succeeds or fails (Celery signals, so every task is covered:
+single and batch enrichment, tag merges), and enrich_profiles_task
+publishes each URL's result under that URL's task id as it stores it.
+Payloads are the GET /tasks/{id} bodies, so clients handle both alike.
+
+The API subscribes once per open stream instead of clients polling the
+result backend every second. Without Redis, or once the subscription's
+connection drops, the stream falls back to checking the task's status
+server-side every TASK_EVENTS_POLL_SECONDS.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator, Callable, Optional
+
+import redis
+import redis.asyncio
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+TASK_EVENTS_PREFIX = "task-events:"
+# Streams end after this long; EventSource-style clients reconnect
+TASK_EVENTS_MAX_AGE = float(os.getenv("TASK_EVENTS_MAX_AGE", "300"))
+# A comment line this often keeps idle connections through proxies
+HEARTBEAT_SECONDS = 15.0
+TASK_EVENTS_POLL_SECONDS = 1.0
+
+TERMINAL_STATUSES = ("Success", "Failure")
+
+
+def _connect(url: Optional[str]):
+    return redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5) if url else None
+
+
+def _connect_async(url: Optional[str]):
+    return redis.asyncio.Redis.from_url(url) if url else None
+
+
+# Worker side (sync) and API side (asyncio) clients
+publisher = _connect(REDIS_URL)
+subscriber = _connect_async(REDIS_URL)
+
+
+def publish(task_id: str, event: dict):
+    """Announce a status change; never fails the task."""
+    if publisher is None or not task_id:
+        return
+    try:
+        publisher.publish(TASK_EVENTS_PREFIX + task_id, json.dumps(event, default=str))
+    except redis.RedisError as e:
+        logger.warning("Task events: could not publish (%s)", e)
+
+
+def sse(event: dict) -> bytes:
+    return f"event: status\ndata: {json.dumps(event, default=str)}\n\n".encode()
+
+
+def is_terminal(event: dict) -> bool:
+    return event.get("status") in TERMINAL_STATUSES
+
+
+async def _close(pubsub):
+    try:
+        await pubsub.aclose()
+    except redis.RedisError as e:
+        logger.warning("Task events: could not close subscription (%s)", e)
+
+
+async def stream(
+    task_id: str,
+    current: Callable[[], dict],
+    max_age: float = TASK_EVENTS_MAX_AGE,
+) -> AsyncIterator[bytes]:
+    """
+    SSE body: the task's current status, then each change until a terminal
+    one. current() is the blocking GET /tasks/{id} lookup; it runs after
+    subscribing, so a change that happens in between is not lost.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+    pubsub = None
+    if subscriber is not None:
+        try:
+            pubsub = subscriber.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(TASK_EVENTS_PREFIX + task_id)
+        except redis.RedisError as e:
+            logger.warning("Task events: subscribing failed, polling instead (%s)", e)
+            pubsub = None
+
+    try:
+        event = await run_in_threadpool(current)
+        yield sse(event)
+        while not is_terminal(event) and loop.time() < deadline:
+            if pubsub is None:
+                await asyncio.sleep(TASK_EVENTS_POLL_SECONDS)
+                latest = await run_in_threadpool(current)
+                if latest != event:
+                    event = latest
+                    yield sse(event)
+                continue
+            timeout = min(HEARTBEAT_SECONDS, max(0.0, deadline - loop.time()))
+            try:
+                message = await pubsub.get_message(timeout=timeout)
+            except redis.RedisError as e:
+                # The next poll catches up on any change missed meanwhile
+                logger.warning("Task events: subscription lost, polling instead (%s)", e)
+                await _close(pubsub)
+                pubsub = None
+                continue
+            if message is None:
+                yield b": keep-alive\n\n"
+                continue
+            event = json.loads(message["data"])
+            yield sse(event)
+    finally:
+        if pubsub is not None:
+            await _close(pubsub)
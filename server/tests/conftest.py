@@ -3,8 +3,12 @@ from fastapi.testclient import TestClient
 from sqlmodel import SQLModel, Session, create_engine
 from sqlmodel.pool import StaticPool
 
-from main import app
+from main import app, tag_catalog
 from database import get_session
+from response_cache import response_cache
+from enrichment_cache import enrichment_cache
+import task_events
+from snapshot_store import snapshot_store
 from models import User, Connection, Log
 from models import User, Connection, Log
 import uuid
@@ -51,11 +55,39 @@ def client_fixture(session):
         app.state.limiter.enabled = True
 
 
+@pytest.fixture(autouse=True)
+def isolated_response_cache(monkeypatch):
+    """Each test gets an empty, in-process-only response cache."""
+    monkeypatch.setattr(response_cache, "redis", None)
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_tag_catalog(monkeypatch):
+    """The tag catalog cache is per process; rebuild it from each test's database."""
+    monkeypatch.setattr(tag_catalog, "redis", None)
+    tag_catalog.invalidate()
+    yield
+    tag_catalog.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def isolated_enrichment_cache(monkeypatch):
+    """No Redis: every /enrich queues a task unless a test installs a client."""
+    monkeypatch.setattr(enrichment_cache, "redis", None)
+    monkeypatch.setattr(task_events, "publisher", None)
+    monkeypatch.setattr(task_events, "subscriber", None)
+    monkeypatch.setattr(snapshot_store, "root", None)
+
+
 @pytest.fixture(name="test_user")
 def test_user_fixture(session):
     """Create a test user in the database."""
     user = User(
-        id="test_user_id",
+        id=uuid.uuid4(),
+        firebase_uid="test_user_id",
         email="test@example.com",
         name="Test User",
         is_active=True,
@@ -71,7 +103,8 @@ def test_user_fixture(session):
 def second_user_fixture(session):
     """Create a second test user for isolation tests."""
     user = User(
-        id=str(uuid.uuid4()),
+        id=uuid.uuid4(),
+        firebase_uid=str(uuid.uuid4()),
         email="other@example.com",
         name="Other User",
         is_active=True,
@@ -117,7 +150,7 @@ def second_auth_headers_fixture(second_user, monkeypatch):
         if token == "valid_token": # Default mock
              return {"uid": "test_user_id", "email": "test@example.com"}
         if token == "second_token":
-             return {"uid": second_user.id, "email": second_user.email}
+             return {"uid": second_user.firebase_uid, "email": second_user.email}
         return None
         
     monkeypatch.setattr("main.verify_firebase_token", mock_verify_dynamic)
@@ -0,0 +1,119 @@
+"""Tests for the async fetch mode of the enrichment worker."""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+import async_fetch
+import enrichment_batch
+import worker
+from enrichment_cache import enrichment_cache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+PAGE = '<html><head><meta property="og:title" content="{name} - Engineer at Acme | LinkedIn"></head></html>'
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(enrichment_cache, "redis", client)
+    return client
+
+
+@pytest.fixture
+def mock_transport(monkeypatch):
+    """Serve profile pages from an async handler; records the peak number in flight."""
+    state = {"in_flight": 0, "peak": 0, "requests": []}
+
+    async def handler(request):
+        state["requests"].append(request)
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        slug = request.url.path.rsplit("/", 1)[-1]
+        if slug == "blocked":
+            return httpx.Response(999)
+        if slug == "broken":
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200, text=PAGE.format(name=slug.title()))
+
+    monkeypatch.setattr(async_fetch, "_transport", lambda: httpx.MockTransport(handler))
+    return state
+
+
+class TestFetchProfiles:
+    def test_results_in_order_with_capped_concurrency(self, mock_transport):
+        urls = [f"https://www.linkedin.com/in/p{i}" for i in range(12)]
+        results = async_fetch.enrich_many(urls, concurrency=3)
+        assert [result["name"] for result in results] == [f"P{i}" for i in range(12)]
+        assert results[0]["company"] == "Acme"
+        assert mock_transport["peak"] == 3
+        assert mock_transport["requests"][0].headers["User-Agent"]
+
+    def test_errors_match_sync_mode(self, mock_transport):
+        blocked, broken = async_fetch.enrich_many(
+            ["https://www.linkedin.com/in/blocked", "https://www.linkedin.com/in/broken"]
+        )
+        assert blocked == {"error": "Failed to fetch profile: 999"}
+        assert broken["name"] == "Broken" and broken["company"] == ""
+
+    def test_only_parsed_pages_cached(self, mock_transport, fake_redis):
+        async_fetch.enrich_many(
+            ["https://www.linkedin.com/in/ok", "https://www.linkedin.com/in/blocked",
+             "https://www.linkedin.com/in/broken"]
+        )
+        assert enrichment_cache.get("https://www.linkedin.com/in/ok")["name"] == "Ok"
+        assert len(fake_redis.keys("enrich:result:*")) == 1
+
+    def test_on_result_per_url(self, mock_transport):
+        seen = []
+        async_fetch.enrich_many(
+            ["https://www.linkedin.com/in/a", "https://www.linkedin.com/in/b"],
+            on_result=lambda index, result: seen.append((index, result["name"])),
+        )
+        assert sorted(seen) == [(0, "A"), (1, "B")]
+
+    def test_on_result_runs_off_the_event_loop(self, mock_transport):
+        threads = []
+        async_fetch.enrich_many(
+            ["https://www.linkedin.com/in/a"],
+            on_result=lambda index, result: threads.append(threading.get_ident()),
+        )
+        assert threads and threads[0] != threading.get_ident()
+
+
+class TestEnrichProfilesTask:
+    def test_stores_each_result_under_its_task_id(self, mock_transport, fake_redis, monkeypatch):
+        store = MagicMock()
+        monkeypatch.setattr(worker, "_store_result", store)
+        enrichment_cache.set("https://www.linkedin.com/in/cached", {"name": "Cached"})
+        enrichment_cache.claim("https://www.linkedin.com/in/new", "t-new")
+
+        worker.enrich_profiles_task([
+            ["https://www.linkedin.com/in/cached", "t-cached"],
+            ["https://www.linkedin.com/in/new", "t-new"],
+        ])
+        stored = {call.args[0]: call.args[1] for call in store.call_args_list}
+        assert stored["t-cached"] == {"name": "Cached"}
+        assert stored["t-new"]["name"] == "New"
+        assert len(mock_transport["requests"]) == 1
+        # The in-flight claim is released
+        assert enrichment_cache.claim("https://www.linkedin.com/in/new", "t-again") is None
+
+
+class TestAsyncBatchCanvas:
+    def test_one_task_per_lane(self):
+        items = [(f"https://www.linkedin.com/in/p{i}", f"t{i}") for i in range(5)]
+        canvas = enrichment_batch.build_canvas(items, concurrency=2, mode="async")
+        assert [sig.task for sig in canvas.tasks] == [worker.enrich_profiles_task.name] * 2
+        assert canvas.tasks[0].args == ([items[0], items[2], items[4]],)
+
+    def test_sync_mode_default(self):
+        items = [("https://www.linkedin.com/in/a", "t1"), ("https://www.linkedin.com/in/b", "t2")]
+        canvas = enrichment_batch.build_canvas(items, concurrency=1)
+        assert [sig.task for sig in canvas.tasks] == [worker.enrich_linkedin_task.name]
@@ -19,7 +19,8 @@ class TestLoginEndpoint:
         data = response.json()
         assert data["message"] == "Login successful"
         assert data["user"]["email"] == test_user.email
-        assert data["user"]["id"] == "test_user_id" # Matches mocked UID
+        assert data["user"]["id"] == str(test_user.id)
+        assert data["user"]["firebase_uid"] == "test_user_id"  # Matches mocked UID
 
     def test_login_creates_new_user(self, client, session, mock_firebase_auth):
         """Login with valid token for NEW user creates the user."""
@@ -32,7 +33,7 @@ class TestLoginEndpoint:
         
         # We can't easily change the mock fixture behavior inside a test without monkeypatching again.
         # But we can just DELETE the user from the DB first.
-        existing = session.get(User, "test_user_id")
+        existing = session.exec(select(User).where(User.firebase_uid == "test_user_id")).first()
         if existing:
             session.delete(existing)
             session.commit()
@@ -47,8 +48,9 @@ class TestLoginEndpoint:
         assert data["user"]["is_onboarded"] is False
         
         # Verify in DB
-        db_user = session.get(User, "test_user_id")
+        db_user = session.exec(select(User).where(User.firebase_uid == "test_user_id")).first()
         assert db_user is not None
+        assert data["user"]["id"] == str(db_user.id)
         assert db_user.email == "test@example.com"
 
     def test_login_invalid_token(self, client):
@@ -119,7 +121,7 @@ class TestUpdateMeEndpoint:
         assert response.status_code == 200
         data = response.json()
         assert data["email"] == test_user.email
-        assert data["id"] == test_user.id
+        assert data["id"] == str(test_user.id)
 
     def test_update_empty_body_changes_nothing(self, client, auth_headers, test_user):
         response = client.put(
@@ -0,0 +1,115 @@
+"""Integration tests for the bootstrap and dashboard endpoints."""
+
+import datetime
+import types
+import uuid
+
+import msgpack
+import pytest
+
+import main
+from models import Connection, TagDefinition
+
+
+@pytest.fixture(name="tags")
+def tags_fixture(session):
+    session.add(TagDefinition(category="howMet", name="Conference", type="connection"))
+    session.add(TagDefinition(category="interactionType", name="Call", type="interaction"))
+    session.commit()
+
+
+class TestDashboard:
+    def test_counts(self, client, auth_headers, session, test_user, test_log):
+        now = datetime.datetime.utcnow()
+        for name, last_contact in [
+            ("Soon", now - datetime.timedelta(days=80)),     # due in 10 days
+            ("Healthy", now - datetime.timedelta(days=10)),
+            ("Never", None),
+        ]:
+            session.add(Connection(
+                id=str(uuid.uuid4()), user_id=test_user.id, name=name,
+                frequency=90, lastContact=last_contact,
+            ))
+        session.commit()
+        response = client.get("/dashboard", headers=auth_headers)
+        assert response.status_code == 200
+        # test_connection (via test_log) was last contacted in Jan 2024, cadence 30
+        assert response.json() == {
+            "total_connections": 4,
+            "total_logs": 1,
+            "overdue": 1,
+            "due_soon": 1,
+        }
+
+
+class TestBootstrap:
+    def test_bundle_contents(self, client, auth_headers, test_user, test_connection, test_log, tags):
+        response = client.get("/bootstrap", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["user"]["email"] == test_user.email
+        assert data["user"]["id"] == str(test_user.id)
+        assert data["tags"]["connection"]["howMet"]["options"] == ["Conference"]
+        assert data["tags"]["interaction"]["interactionType"]["options"] == ["Call"]
+        assert data["connections"]["total"] == 1
+        assert data["connections"]["items"][0]["id"] == test_connection.id
+        assert data["logs"]["items"][0]["id"] == test_log.id
+        assert data["logs"]["limit"] == 20
+        assert data["dashboard"]["total_connections"] == 1
+
+    def test_matches_individual_endpoints(self, client, auth_headers, test_connection, test_log, tags):
+        data = client.get("/bootstrap?logs_limit=100", headers=auth_headers).json()
+        assert data["connections"] == client.get("/connections", headers=auth_headers).json()
+        assert data["logs"] == client.get("/logs", headers=auth_headers).json()
+        assert data["tags"]["connection"] == client.get("/tags/connection", headers=auth_headers).json()
+        assert data["user"] == client.get("/users/me", headers=auth_headers).json()
+
+    def test_single_etag_returns_304(self, client, auth_headers, test_connection):
+        etag = client.get("/bootstrap", headers=auth_headers).headers["etag"]
+        response = client.get("/bootstrap", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_etag_changes_on_write(self, client, auth_headers, test_connection):
+        etag = client.get("/bootstrap", headers=auth_headers).headers["etag"]
+        client.post(
+            "/logs", json={"connection_id": test_connection.id, "notes": "Call"},
+            headers=auth_headers,
+        )
+        response = client.get("/bootstrap", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["dashboard"]["total_logs"] == 1
+
+    def test_etag_changes_on_new_tag(self, client, auth_headers, second_auth_headers):
+        etag = client.get("/bootstrap", headers=auth_headers).headers["etag"]
+        # Another user's custom tag still changes the shared catalog
+        client.post("/connections", json={"name": "A", "tags": ["fresh"]}, headers=second_auth_headers)
+        response = client.get("/bootstrap", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+    def test_etag_changes_when_a_connection_turns_overdue(self, client, auth_headers, session, test_user, monkeypatch):
+        # Due in an hour
+        contacted = datetime.datetime.utcnow() - datetime.timedelta(days=30, hours=-1)
+        session.add(Connection(
+            id=str(uuid.uuid4()), user_id=test_user.id, name="Ada", frequency=30, lastContact=contacted,
+        ))
+        session.commit()
+        etag = client.get("/bootstrap", headers=auth_headers).headers["etag"]
+
+        class Later(datetime.datetime):
+            @classmethod
+            def utcnow(cls):
+                return datetime.datetime.utcnow() + datetime.timedelta(hours=2)
+
+        monkeypatch.setattr(main, "datetime", types.SimpleNamespace(**{**vars(datetime), "datetime": Later}))
+        response = client.get("/bootstrap", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["dashboard"]["overdue"] == 1
+
+    def test_msgpack(self, client, auth_headers, test_user, test_connection):
+        response = client.get(
+            "/bootstrap", headers={**auth_headers, "Accept": "application/msgpack"}
+        )
+        data = msgpack.unpackb(response.content)
+        assert data["user"]["id"] == str(test_user.id)
+        assert isinstance(data["user"]["created_at"], int)
+        assert data["connections"]["items"][0]["tags"] == ["work", "python"]
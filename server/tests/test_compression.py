@@ -0,0 +1,100 @@
+"""Tests for compression.py - response compression middleware."""
+
+import gzip
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from compression import CompressionMiddleware, choose_encoding
+
+BIG = "x" * 2000
+
+
+def _client(minimum_size=1024):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BIG)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BIG, BIG]), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def _raw(client, path, accept_encoding):
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestChooseEncoding:
+    def test_prefers_brotli(self):
+        assert choose_encoding("gzip, deflate, br") == "br"
+
+    def test_gzip_only(self):
+        assert choose_encoding("gzip") == "gzip"
+
+    def test_rejected_with_q_zero(self):
+        assert choose_encoding("br;q=0, gzip") == "gzip"
+
+    def test_identity(self):
+        assert choose_encoding("") is None
+        assert choose_encoding("identity") is None
+
+
+class TestCompressionMiddleware:
+    def test_brotli_above_threshold(self):
+        response, body = _raw(_client(), "/big", "br, gzip")
+        assert response.headers["content-encoding"] == "br"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert brotli.decompress(body).decode() == BIG
+
+    def test_gzip_above_threshold(self):
+        response, body = _raw(_client(), "/big", "gzip")
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) == len(body)
+        assert gzip.decompress(body).decode() == BIG
+
+    def test_below_threshold_uncompressed(self):
+        response, body = _raw(_client(), "/small", "br, gzip")
+        assert "content-encoding" not in response.headers
+        assert body == b"tiny"
+
+    def test_threshold_is_configurable(self):
+        response, _ = _raw(_client(minimum_size=10_000), "/big", "gzip")
+        assert "content-encoding" not in response.headers
+
+    def test_no_accept_encoding(self):
+        response, body = _raw(_client(), "/big", "identity")
+        assert "content-encoding" not in response.headers
+        assert body.decode() == BIG
+
+    def test_streaming_passes_through(self):
+        response, body = _raw(_client(), "/stream", "gzip")
+        assert "content-encoding" not in response.headers
+        assert body.decode() == BIG + BIG
+
+
+class TestListEndpointCompression:
+    def test_connections_list_compressed(self, client, auth_headers):
+        for i in range(20):
+            client.post(
+                "/connections",
+                json={"name": f"Person {i}", "notes": "Long notes. " * 50},
+                headers=auth_headers,
+            )
+        response = client.get(
+            "/connections", headers={**auth_headers, "Accept-Encoding": "br"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "br"
+        assert len(response.json()["items"]) == 20
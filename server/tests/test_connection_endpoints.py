@@ -196,6 +196,22 @@ class TestUpdateConnection:
         )
         assert response.status_code == 404
 
+    def test_update_other_users_connection_adds_no_tags(
+        self, client, auth_headers, second_auth_headers, session, test_connection
+    ):
+        from sqlmodel import select
+        from models import TagDefinition
+
+        response = client.put(
+            f"/connections/{test_connection.id}",
+            json={"tags": ["Sneaky Tag"]},
+            headers=second_auth_headers,
+        )
+        assert response.status_code == 404
+        response = client.put("/connections/missing", json={"tags": ["Sneaky Tag"]}, headers=auth_headers)
+        assert response.status_code == 404
+        assert session.exec(select(TagDefinition).where(TagDefinition.name == "Sneaky Tag")).first() is None
+
     def test_update_last_contact(self, client, auth_headers, test_connection):
         response = client.put(
             f"/connections/{test_connection.id}",
@@ -238,3 +254,341 @@ class TestDeleteConnection:
         client.delete(f"/connections/{test_connection.id}", headers=auth_headers)
         response = client.get("/connections", headers=auth_headers)
         assert len(response.json()["items"]) == 0
+
+
+class TestConnectionFiltersAndSorting:
+    def _create(self, client, auth_headers, **fields):
+        response = client.post("/connections", json=fields, headers=auth_headers)
+        assert response.status_code == 201
+        return response.json()
+
+    def test_filter_by_company(self, client, auth_headers):
+        self._create(client, auth_headers, name="Alice", company="Acme")
+        self._create(client, auth_headers, name="Bob", company="Globex")
+        response = client.get("/connections?company=Acme", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert [c["name"] for c in data["items"]] == ["Alice"]
+
+    def test_filter_by_how_met_and_industry(self, client, auth_headers):
+        self._create(client, auth_headers, name="Alice", howMet="Conference", industry="Tech")
+        self._create(client, auth_headers, name="Bob", howMet="Conference", industry="Finance")
+        response = client.get(
+            "/connections?howMet=Conference&industry=Tech", headers=auth_headers
+        )
+        assert [c["name"] for c in response.json()["items"]] == ["Alice"]
+
+    def test_filter_not_contacted_days(self, client, auth_headers):
+        self._create(client, auth_headers, name="Recent", lastContact="2099-01-01T00:00:00")
+        self._create(client, auth_headers, name="Stale", lastContact="2020-01-01T00:00:00")
+        self._create(client, auth_headers, name="Never")
+        response = client.get("/connections?not_contacted_days=90&sort=name", headers=auth_headers)
+        assert [c["name"] for c in response.json()["items"]] == ["Never", "Stale"]
+
+    def test_sort_by_name_descending(self, client, auth_headers):
+        for name in ["Bob", "Alice", "Carol"]:
+            self._create(client, auth_headers, name=name)
+        response = client.get("/connections?sort=-name", headers=auth_headers)
+        assert [c["name"] for c in response.json()["items"]] == ["Carol", "Bob", "Alice"]
+
+    def test_sort_by_next_due(self, client, auth_headers):
+        self._create(client, auth_headers, name="Weekly", frequency=7, lastContact="2024-01-01T00:00:00")
+        self._create(client, auth_headers, name="Yearly", frequency=365, lastContact="2024-01-01T00:00:00")
+        self._create(client, auth_headers, name="Monthly", frequency=30, lastContact="2024-01-01T00:00:00")
+        response = client.get("/connections?sort=next_due", headers=auth_headers)
+        assert [c["name"] for c in response.json()["items"]] == ["Weekly", "Monthly", "Yearly"]
+
+    def test_next_due_follows_updates(self, client, auth_headers):
+        a = self._create(client, auth_headers, name="A", frequency=30, lastContact="2024-01-01T00:00:00")
+        self._create(client, auth_headers, name="B", frequency=60, lastContact="2024-01-01T00:00:00")
+        client.put(f"/connections/{a['id']}", json={"frequency": 365}, headers=auth_headers)
+        response = client.get("/connections?sort=next_due", headers=auth_headers)
+        assert [c["name"] for c in response.json()["items"]] == ["B", "A"]
+
+    def test_sort_works_with_pagination(self, client, auth_headers):
+        for name in ["D", "B", "A", "C"]:
+            self._create(client, auth_headers, name=name)
+        response = client.get("/connections?sort=name&limit=2&offset=2", headers=auth_headers)
+        data = response.json()
+        assert data["total"] == 4
+        assert [c["name"] for c in data["items"]] == ["C", "D"]
+
+    def test_invalid_sort_key(self, client, auth_headers):
+        response = client.get("/connections?sort=notes", headers=auth_headers)
+        assert response.status_code == 400
+
+
+class TestConnectionListQueryPlans:
+    FILTERS = [
+        {},
+        {"company": "Acme"},
+        {"industry": "Tech"},
+        {"location": "NYC"},
+        {"howMet": "Conference"},
+        {"not_contacted_days": 90},
+    ]
+    SORTS = [None, "name", "-name", "lastContact", "created_at", "next_due", "-next_due"]
+
+    def test_filter_sort_combinations_use_indexes(self, session, test_user):
+        """Every supported filter/sort combination must be served by an index."""
+        from sqlmodel import select
+        from models import Connection
+        from main import _connection_filters, _connection_order_by
+
+        for filters in self.FILTERS:
+            for sort in self.SORTS:
+                statement = (
+                    select(Connection)
+                    .where(*_connection_filters(test_user.id, **filters))
+                    .order_by(*_connection_order_by(sort))
+                    .limit(100)
+                )
+                compiled = statement.compile(
+                    dialect=session.bind.dialect,
+                    compile_kwargs={"literal_binds": True},
+                )
+                plan = session.connection().exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {compiled}"
+                ).all()
+                details = [row[-1] for row in plan]
+                assert not any(
+                    d.startswith("SCAN connection") for d in details
+                ), (filters, sort, details)
+
+
+class TestConnectionFieldsets:
+    def test_fields_projects_columns(self, client, auth_headers, test_connection):
+        response = client.get(
+            "/connections?fields=name,company,lastContact", headers=auth_headers
+        )
+        assert response.status_code == 200
+        item = response.json()["items"][0]
+        assert item == {
+            "name": "Jane Doe",
+            "company": "Acme Corp",
+            "lastContact": "2024-01-15T00:00:00",
+            "id": test_connection.id,
+        }
+
+    def test_fields_with_tags(self, client, auth_headers, test_connection):
+        response = client.get("/connections?fields=tags", headers=auth_headers)
+        item = response.json()["items"][0]
+        assert item == {"tags": ["work", "python"], "id": test_connection.id}
+
+    def test_unknown_field_rejected(self, client, auth_headers):
+        response = client.get("/connections?fields=name,tags_json", headers=auth_headers)
+        assert response.status_code == 400
+        assert "tags_json" in response.json()["detail"]
+
+    def test_fields_with_sort_and_filter(self, client, auth_headers):
+        for name in ["Bob", "Alice"]:
+            client.post("/connections", json={"name": name, "company": "Acme"}, headers=auth_headers)
+        response = client.get(
+            "/connections?fields=name&company=Acme&sort=name", headers=auth_headers
+        )
+        assert [c["name"] for c in response.json()["items"]] == ["Alice", "Bob"]
+
+
+class TestConnectionDetailWithLogs:
+    def _log(self, client, auth_headers, connection_id, notes, created_at):
+        response = client.post(
+            "/logs",
+            json={"connection_id": connection_id, "notes": notes, "created_at": created_at},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    def test_embeds_recent_logs(self, client, auth_headers, test_connection):
+        for day in range(1, 6):
+            self._log(client, auth_headers, test_connection.id, f"day {day}", f"2024-03-0{day}T00:00:00")
+        response = client.get(
+            f"/connections/{test_connection.id}?include=logs&logs_limit=3",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["name"] == test_connection.name
+        assert data["tags"] == ["work", "python"]
+        assert [l["notes"] for l in data["logs"]["items"]] == ["day 5", "day 4", "day 3"]
+        assert data["logs"]["next_cursor"]
+
+    def test_cursor_continues_on_logs_endpoint(self, client, auth_headers, test_connection):
+        for day in range(1, 6):
+            self._log(client, auth_headers, test_connection.id, f"day {day}", f"2024-03-0{day}T00:00:00")
+        cursor = client.get(
+            f"/connections/{test_connection.id}?include=logs&logs_limit=3",
+            headers=auth_headers,
+        ).json()["logs"]["next_cursor"]
+        response = client.get(
+            "/logs",
+            params={"connection_id": test_connection.id, "before": cursor, "limit": 3},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [l["notes"] for l in data["items"]] == ["day 2", "day 1"]
+        assert data["next_cursor"] is None
+        assert "total" not in data
+
+    def test_no_more_logs(self, client, auth_headers, test_connection, test_log):
+        data = client.get(
+            f"/connections/{test_connection.id}?include=logs", headers=auth_headers
+        ).json()
+        assert [l["id"] for l in data["logs"]["items"]] == [test_log.id]
+        assert data["logs"]["next_cursor"] is None
+
+    def test_without_include_is_unchanged(self, client, auth_headers, test_connection, test_log):
+        data = client.get(f"/connections/{test_connection.id}", headers=auth_headers).json()
+        assert "logs" not in data
+
+    def test_user_isolation(self, client, second_auth_headers, test_connection):
+        response = client.get(
+            f"/connections/{test_connection.id}?include=logs", headers=second_auth_headers
+        )
+        assert response.status_code == 404
+
+    def test_invalid_include(self, client, auth_headers, test_connection):
+        response = client.get(
+            f"/connections/{test_connection.id}?include=notes", headers=auth_headers
+        )
+        assert response.status_code == 400
+
+    def test_invalid_log_cursor(self, client, auth_headers):
+        response = client.get("/logs?before=garbage", headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_uses_connection_timeline_index(self, session, test_user):
+        from sqlmodel import select
+        from models import Log
+
+        statement = (
+            select(Log)
+            .where(Log.connection_id == "c1", Log.user_id == test_user.id)
+            .order_by(Log.created_at.desc(), Log.id.desc())
+            .limit(20)
+        )
+        compiled = statement.compile(
+            dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+        details = " ".join(row[-1] for row in plan)
+        assert "ix_log_connection_created_at" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestBulkUpdateConnections:
+    def _create(self, client, auth_headers, **fields):
+        response = client.post("/connections", json={"name": "Person", **fields}, headers=auth_headers)
+        assert response.status_code == 201
+        return response.json()
+
+    def _frequencies(self, client, auth_headers):
+        items = client.get("/connections?sort=name", headers=auth_headers).json()["items"]
+        return {c["name"]: c["frequency"] for c in items}
+
+    def test_update_by_filter_on_tag(self, client, auth_headers):
+        self._create(client, auth_headers, name="A", tags=["Investor"])
+        self._create(client, auth_headers, name="B", tags=["Investors", "Friend"])
+        self._create(client, auth_headers, name="C", tags=["Friend", "Investor"])
+        response = client.patch(
+            "/connections",
+            json={"filter": {"tag": "Investor"}, "update": {"frequency": 30}},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.json() == {"updated": 2}
+        assert self._frequencies(client, auth_headers) == {"A": 30, "B": 90, "C": 30}
+
+    def test_filter_on_tag_is_case_sensitive(self, client, auth_headers):
+        self._create(client, auth_headers, name="A", tags=["Investor"])
+        self._create(client, auth_headers, name="B", tags=["investor"])
+        listed = client.get("/connections?tag=investor", headers=auth_headers).json()["items"]
+        assert [c["name"] for c in listed] == ["B"]
+        response = client.patch(
+            "/connections",
+            json={"filter": {"tag": "investor"}, "update": {"frequency": 30}},
+            headers=auth_headers,
+        )
+        assert response.json() == {"updated": 1}
+        assert self._frequencies(client, auth_headers) == {"A": 90, "B": 30}
+
+    def test_update_by_ids(self, client, auth_headers):
+        a = self._create(client, auth_headers, name="A")
+        b = self._create(client, auth_headers, name="B")
+        self._create(client, auth_headers, name="C")
+        response = client.patch(
+            "/connections",
+            json={"ids": [a["id"], b["id"], "missing"], "update": {"tags": ["Seed Scout"]}},
+            headers=auth_headers,
+        )
+        assert response.json() == {"updated": 2}
+        tags = {c["name"]: c["tags"] for c in client.get("/connections", headers=auth_headers).json()["items"]}
+        assert tags == {"A": ["Seed Scout"], "B": ["Seed Scout"], "C": []}
+        custom = client.get("/tags/connection", headers=auth_headers).json()
+        assert custom["custom"]["options"] == ["Seed Scout"]
+
+    def test_batches_cover_every_row(self, client, auth_headers, monkeypatch):
+        import writes
+        monkeypatch.setattr(writes, "BULK_BATCH_SIZE", 2)
+        for name in "ABCDE":
+            self._create(client, auth_headers, name=name, company="Acme")
+        response = client.patch(
+            "/connections",
+            json={"filter": {"company": "Acme"}, "update": {"frequency": 14}},
+            headers=auth_headers,
+        )
+        assert response.json() == {"updated": 5}
+        assert set(self._frequencies(client, auth_headers).values()) == {14}
+
+    def test_keeps_next_due_in_sync(self, client, auth_headers):
+        self._create(client, auth_headers, name="A", frequency=30, lastContact="2024-01-01T00:00:00")
+        self._create(client, auth_headers, name="B", frequency=60, lastContact="2024-01-01T00:00:00")
+        client.patch(
+            "/connections",
+            json={"filter": {}, "update": {"lastContact": "2024-06-01T00:00:00"}},
+            headers=auth_headers,
+        )
+        response = client.get("/connections?sort=next_due&not_contacted_days=3650", headers=auth_headers)
+        assert [c["name"] for c in response.json()["items"]] == []
+        response = client.get("/connections?sort=next_due", headers=auth_headers)
+        assert [c["name"] for c in response.json()["items"]] == ["A", "B"]
+
+    def test_other_users_rows_untouched(self, client, auth_headers, second_auth_headers, test_connection):
+        response = client.patch(
+            "/connections",
+            json={"ids": [test_connection.id], "update": {"frequency": 7}},
+            headers=second_auth_headers,
+        )
+        assert response.json() == {"updated": 0}
+        response = client.patch(
+            "/connections", json={"filter": {}, "update": {"frequency": 7}}, headers=second_auth_headers
+        )
+        assert response.json() == {"updated": 0}
+        assert client.get(f"/connections/{test_connection.id}", headers=auth_headers).json()["frequency"] == 30
+
+    def test_changes_etag(self, client, auth_headers):
+        self._create(client, auth_headers, name="A")
+        etag = client.get("/connections", headers=auth_headers).headers["etag"]
+        client.patch("/connections", json={"filter": {}, "update": {"frequency": 7}}, headers=auth_headers)
+        response = client.get("/connections", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+    def test_requires_exactly_one_target(self, client, auth_headers):
+        update = {"frequency": 7}
+        assert client.patch("/connections", json={"update": update}, headers=auth_headers).status_code == 422
+        response = client.patch(
+            "/connections", json={"ids": [], "filter": {}, "update": update}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
+    def test_empty_update(self, client, auth_headers):
+        response = client.patch("/connections", json={"filter": {}, "update": {}}, headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_validates_update(self, client, auth_headers):
+        response = client.patch(
+            "/connections", json={"filter": {}, "update": {"frequency": 0}}, headers=auth_headers
+        )
+        assert response.status_code == 422
@@ -0,0 +1,150 @@
+"""Tests for POST /enrich/batch and its status endpoint."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import enrichment_batch
+import worker
+from enrichment_cache import enrichment_cache, url_key
+
+fakeredis = pytest.importorskip("fakeredis")
+
+PROFILE = {"name": "John Doe", "role": "Engineer", "company": "Acme", "location": "SF", "industry": ""}
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(enrichment_cache, "redis", client)
+    return client
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(enrichment_batch, "_queue", calls.append)
+    return calls
+
+
+def task_states(states):
+    """Patch AsyncResult so task_id -> (state, result)."""
+    def make(task_id, app=None):
+        result = MagicMock()
+        result.state, result.result = states.get(task_id, ("PENDING", None))
+        return result
+    return patch("enrichment_batch.AsyncResult", side_effect=make)
+
+
+class TestStartBatch:
+    def test_dedups_and_reuses_cache_and_pending(self, client, auth_headers, fake_redis, queued):
+        enrichment_cache.set("https://www.linkedin.com/in/cached", PROFILE)
+        enrichment_cache.claim("https://www.linkedin.com/in/pending", "existing-task")
+        response = client.post("/enrich/batch", json={"urls": [
+            "https://linkedin.com/in/cached/",
+            "https://de.linkedin.com/in/Pending",
+            "https://linkedin.com/in/new-one",
+            "https://www.linkedin.com/in/new-one?trk=x",
+        ]}, headers=auth_headers)
+        assert response.status_code == 202
+        assert response.json()["total"] == 3
+        assert response.json()["queued"] == 1
+        assert [url for url, _ in queued[0]] == ["https://www.linkedin.com/in/new-one"]
+
+    def test_nothing_to_queue(self, client, auth_headers, fake_redis, queued):
+        enrichment_cache.set("https://www.linkedin.com/in/cached", PROFILE)
+        response = client.post("/enrich/batch", json={"urls": ["linkedin.com/in/cached"]}, headers=auth_headers)
+        assert response.json()["queued"] == 0
+        assert queued == []
+
+    def test_claims_outlast_the_lane(self, client, auth_headers, fake_redis, queued, monkeypatch):
+        monkeypatch.setattr(enrichment_batch.async_fetch, "ENRICH_FETCH_MODE", "sync")
+        urls = [f"https://www.linkedin.com/in/p{i}" for i in range(3 * enrichment_batch.ENRICH_BATCH_CONCURRENCY)]
+        client.post("/enrich/batch", json={"urls": urls}, headers=auth_headers)
+        ttl = fake_redis.ttl("enrich:task:" + url_key(urls[-1]))
+        # Three URLs to a lane, each allowed the full in-flight TTL
+        assert 2 * enrichment_cache.inflight_ttl < ttl <= 3 * enrichment_cache.inflight_ttl
+
+    def test_validation(self, client, auth_headers, fake_redis, queued):
+        assert client.post("/enrich/batch", json={"urls": []}, headers=auth_headers).status_code == 422
+        too_many = [f"https://linkedin.com/in/p{i}" for i in range(1001)]
+        assert client.post("/enrich/batch", json={"urls": too_many}, headers=auth_headers).status_code == 422
+
+    def test_requires_redis(self, client, auth_headers, queued):
+        response = client.post("/enrich/batch", json={"urls": ["https://linkedin.com/in/a"]}, headers=auth_headers)
+        assert response.status_code == 503
+
+
+class TestBatchStatus:
+    def test_counts_and_partial_results(self, client, auth_headers, fake_redis, queued):
+        urls = [f"https://www.linkedin.com/in/p{i}" for i in range(4)]
+        batch_id = client.post("/enrich/batch", json={"urls": urls}, headers=auth_headers).json()["batch_id"]
+        task_ids = dict(queued[0])
+        # p0 finished and was cached; p1 got a 999; p2 crashed; p3 still queued
+        enrichment_cache.set(urls[0], PROFILE)
+        states = {
+            task_ids[urls[1]]: ("SUCCESS", {"error": "Failed to fetch profile: 999"}),
+            task_ids[urls[2]]: ("FAILURE", RuntimeError("boom")),
+        }
+        with task_states(states):
+            body = client.get(f"/enrich/batch/{batch_id}", headers=auth_headers).json()
+        assert (body["total"], body["completed"], body["failed"], body["pending"]) == (4, 1, 2, 1)
+        by_url = {item["url"]: item for item in body["results"]}
+        assert by_url[urls[0]]["data"] == PROFILE
+        assert "999" in by_url[urls[1]]["error"]
+        assert by_url[urls[2]]["error"] == "boom"
+        assert by_url[urls[3]]["status"] == "Pending"
+
+    def test_other_users_batch_is_not_found(self, client, auth_headers, second_auth_headers, fake_redis, queued):
+        batch_id = client.post(
+            "/enrich/batch", json={"urls": ["https://linkedin.com/in/a"]}, headers=auth_headers
+        ).json()["batch_id"]
+        assert client.get(f"/enrich/batch/{batch_id}", headers=second_auth_headers).status_code == 404
+        assert client.get("/enrich/batch/unknown", headers=auth_headers).status_code == 404
+
+
+class TestClaimTTL:
+    def test_scales_with_lane_depth(self):
+        cache = enrichment_batch.EnrichmentCache(inflight_ttl=300)
+        assert enrichment_batch.claim_ttl(cache, 1, concurrency=4, mode="sync") == 300
+        assert enrichment_batch.claim_ttl(cache, 1000, concurrency=4, mode="sync") == 300 * 250
+
+    def test_async_lanes_fetch_concurrently(self, monkeypatch):
+        monkeypatch.setattr(enrichment_batch.async_fetch, "ENRICH_ASYNC_CONCURRENCY", 20)
+        cache = enrichment_batch.EnrichmentCache(inflight_ttl=300)
+        assert enrichment_batch.claim_ttl(cache, 1000, concurrency=4, mode="async") == 300 * 13
+
+
+class TestCanvas:
+    def test_lanes_cap_concurrency(self):
+        items = [(f"u{i}", f"t{i}") for i in range(10)]
+        result = enrichment_batch.lanes(items, 4)
+        assert len(result) == 4
+        assert sorted(item for lane in result for item in lane) == sorted(items)
+        assert enrichment_batch.lanes(items[:2], 4) == [[items[0]], [items[1]]]
+
+    def test_group_of_lane_heads_with_task_ids(self):
+        items = [(f"https://www.linkedin.com/in/p{i}", f"t{i}") for i in range(5)]
+        canvas = enrichment_batch.build_canvas(items, concurrency=2)
+        assert [sig.options["task_id"] for sig in canvas.tasks] == ["t0", "t1"]
+        head = canvas.tasks[0]
+        assert head.args == ("https://www.linkedin.com/in/p0",)
+        # Success or failure, the rest of the lane is queued next
+        then = [worker.continue_lane_task.si([items[2], items[4]])]
+        assert head.options["link"] == then
+        assert head.options["link_error"] == then
+        # Immutable: neither the result nor the error is passed on
+        assert head.immutable and all(sig.immutable for sig in then)
+
+    def test_last_item_ends_the_lane(self):
+        head = enrichment_batch.lane_head([("https://www.linkedin.com/in/p0", "t0")])
+        assert "link" not in head.options and "link_error" not in head.options
+
+    def test_continue_lane_queues_the_next_item(self, monkeypatch):
+        items = [["https://www.linkedin.com/in/p1", "t1"], ["https://www.linkedin.com/in/p2", "t2"]]
+        sent = []
+        monkeypatch.setattr(
+            enrichment_batch, "lane_head", lambda lane: MagicMock(apply_async=lambda: sent.append(lane))
+        )
+        worker.continue_lane_task.run(items)
+        assert sent == [[("https://www.linkedin.com/in/p1", "t1"), ("https://www.linkedin.com/in/p2", "t2")]]
@@ -0,0 +1,113 @@
+"""Tests for the enrichment result cache and in-flight dedup."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import redis
+
+from enrichment_cache import EnrichmentCache, enrichment_cache, normalize_linkedin_url
+from worker import enrich_linkedin_task
+
+fakeredis = pytest.importorskip("fakeredis")
+
+PROFILE = {"name": "John Doe", "role": "Engineer", "company": "Acme", "location": "SF", "industry": ""}
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(enrichment_cache, "redis", client)
+    return client
+
+
+class TestNormalize:
+    @pytest.mark.parametrize("url", [
+        "https://www.linkedin.com/in/johndoe",
+        "https://linkedin.com/in/johndoe/",
+        "http://de.linkedin.com/in/JohnDoe?trk=public_profile#about",
+        "www.linkedin.com/in/johndoe",
+        "  https://m.linkedin.com/in/johndoe//  ",
+    ])
+    def test_spellings_of_one_profile(self, url):
+        assert normalize_linkedin_url(url) == "https://www.linkedin.com/in/johndoe"
+
+    def test_percent_encoding(self):
+        assert normalize_linkedin_url("https://linkedin.com/in/jos%C3%A9") == normalize_linkedin_url(
+            "https://linkedin.com/in/JOSÉ"
+        )
+
+    def test_other_hosts_kept(self):
+        assert normalize_linkedin_url("https://Example.com/Me/") == "https://example.com/me"
+
+
+class TestEnrichmentCache:
+    def test_claim_and_release(self, fake_redis):
+        cache = EnrichmentCache(fake_redis)
+        url = "https://www.linkedin.com/in/a"
+        assert cache.claim(url, "t1") is None
+        assert cache.claim(url, "t2") == "t1"
+        cache.release(url, "t2")
+        assert cache.claim(url, "t3") == "t1"
+        cache.release(url, "t1")
+        assert cache.claim(url, "t3") is None
+
+    def test_result_ttl(self, fake_redis):
+        cache = EnrichmentCache(fake_redis, ttl=60)
+        cache.set("https://www.linkedin.com/in/a", PROFILE)
+        assert cache.get("https://www.linkedin.com/in/a") == PROFILE
+        assert 0 < fake_redis.ttl(next(iter(fake_redis.keys("enrich:result:*")))) <= 60
+
+    def test_redis_errors_fall_back(self):
+        client = MagicMock()
+        client.get.side_effect = client.set.side_effect = redis.ConnectionError("down")
+        cache = EnrichmentCache(client)
+        assert cache.get("u") is None
+        assert cache.claim("u", "t1") is None
+        cache.set("u", PROFILE)
+
+
+class TestEnrichDedup:
+    @patch("main.enrich_linkedin_task")
+    def test_pending_task_is_reused(self, mock_task, client, auth_headers, fake_redis):
+        first = client.post("/enrich?linkedin_url=https://linkedin.com/in/johndoe", headers=auth_headers)
+        second = client.post("/enrich?linkedin_url=https://de.linkedin.com/in/JohnDoe/", headers=auth_headers)
+        assert first.json()["task_id"] == second.json()["task_id"]
+        assert mock_task.apply_async.call_count == 1
+
+    @patch("main.enrich_linkedin_task")
+    def test_cached_result_skips_queue(self, mock_task, client, auth_headers, fake_redis):
+        enrichment_cache.set("https://www.linkedin.com/in/johndoe", PROFILE)
+        response = client.post("/enrich?linkedin_url=https://linkedin.com/in/johndoe?trk=x", headers=auth_headers)
+        task_id = response.json()["task_id"]
+        mock_task.apply_async.assert_not_called()
+        status = client.get(f"/tasks/{task_id}", headers=auth_headers).json()
+        assert status == {"status": "Success", "data": PROFILE}
+
+    def test_expired_cached_task(self, client, auth_headers, fake_redis):
+        response = client.get("/tasks/cached-0123456789abcdef", headers=auth_headers)
+        assert response.json()["status"] == "Failure"
+
+
+class TestWorkerCaching:
+    HTML = '<html><head><meta property="og:title" content="John Doe - Engineer at Acme | LinkedIn"></head></html>'
+
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
+    def test_fetches_once(self, mock_ua, mock_get, fake_redis):
+        mock_ua.return_value = "TestAgent/1.0"
+        mock_get.return_value = MagicMock(status_code=200, text=self.HTML)
+        url = "https://www.linkedin.com/in/johndoe"
+        first = enrich_linkedin_task(url)
+        second = enrich_linkedin_task(url)
+        assert first == second and first["company"] == "Acme"
+        assert mock_get.call_count == 1
+
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
+    def test_failures_not_cached(self, mock_ua, mock_get, fake_redis):
+        mock_ua.return_value = "TestAgent/1.0"
+        mock_get.return_value = MagicMock(status_code=999, text="")
+        enrich_linkedin_task("https://www.linkedin.com/in/johndoe")
+        mock_get.side_effect = Exception("timeout")
+        enrich_linkedin_task("https://www.linkedin.com/in/johndoe")
+        assert fake_redis.keys("enrich:result:*") == []
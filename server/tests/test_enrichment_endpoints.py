@@ -1,40 +1,87 @@
 """Integration tests for LinkedIn enrichment / Celery task endpoints."""
 
+import uuid
+
 import pytest
 from unittest.mock import patch, MagicMock
 
+from enrichment_cache import enrichment_cache
+from models import Connection
+
 
 class TestEnrichEndpoint:
     @patch("main.enrich_linkedin_task")
     def test_enrich_starts_task(self, mock_task, client, auth_headers):
-        mock_result = MagicMock()
-        mock_result.id = "task-abc-123"
-        mock_task.delay.return_value = mock_result
-
         response = client.post(
             "/enrich?linkedin_url=https://linkedin.com/in/johndoe",
             headers=auth_headers,
         )
         assert response.status_code == 200
         data = response.json()
-        assert data["task_id"] == "task-abc-123"
-        mock_task.delay.assert_called_once_with(
-            "https://linkedin.com/in/johndoe"
+        mock_task.apply_async.assert_called_once_with(
+            ("https://www.linkedin.com/in/johndoe",), task_id=data["task_id"]
         )
 
     @patch("main.enrich_linkedin_task")
     def test_enrich_with_encoded_url(self, mock_task, client, auth_headers):
-        mock_result = MagicMock()
-        mock_result.id = "task-456"
-        mock_task.delay.return_value = mock_result
-
         response = client.post(
             "/enrich?linkedin_url=https%3A%2F%2Flinkedin.com%2Fin%2Fjane-doe",
             headers=auth_headers,
         )
         assert response.status_code == 200
-        assert response.json()["task_id"] == "task-456"
+        mock_task.apply_async.assert_called_once_with(
+            ("https://www.linkedin.com/in/jane-doe",), task_id=response.json()["task_id"]
+        )
+
+
+class TestEnrichIntoConnection:
+    @patch("main.enrich_linkedin_task")
+    def test_task_carries_connection(self, mock_task, client, auth_headers, test_user, test_connection):
+        response = client.post(
+            f"/enrich?linkedin_url=https://linkedin.com/in/janedoe&connection_id={test_connection.id}",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        mock_task.apply_async.assert_called_once_with(
+            ("https://www.linkedin.com/in/janedoe",),
+            {"user_id": test_user.id, "connection_id": test_connection.id},
+            task_id=response.json()["task_id"],
+        )
+
+    @patch("main.enrich_linkedin_task")
+    def test_other_users_connection(self, mock_task, client, auth_headers, session, second_user):
+        other = Connection(id=str(uuid.uuid4()), user_id=second_user.id, name="Other")
+        session.add(other)
+        session.commit()
+        response = client.post(
+            f"/enrich?linkedin_url=https://linkedin.com/in/x&connection_id={other.id}",
+            headers=auth_headers,
+        )
+        assert response.status_code == 404
+        mock_task.apply_async.assert_not_called()
 
+    @patch("main.enrich_linkedin_task")
+    def test_cached_result_applied_inline(self, mock_task, client, auth_headers, session, test_user, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        monkeypatch.setattr(enrichment_cache, "redis", fakeredis.FakeRedis())
+        enrichment_cache.set(
+            "https://www.linkedin.com/in/ada",
+            {"name": "Ada L", "role": "CTO", "company": "Initech", "location": "", "industry": ""},
+        )
+        connection = Connection(id=str(uuid.uuid4()), user_id=test_user.id, name="Ada", role="Founder")
+        session.add(connection)
+        session.commit()
+
+        response = client.post(
+            f"/enrich?linkedin_url=https://linkedin.com/in/ada&connection_id={connection.id}",
+            headers=auth_headers,
+        )
+        assert response.json()["task_id"].startswith("cached-")
+        mock_task.apply_async.assert_not_called()
+        session.refresh(connection)
+        assert (connection.name, connection.role, connection.company) == ("Ada", "Founder", "Initech")
+        session.refresh(test_user)
+        assert test_user.data_version == 1
 
 class TestTaskStatusEndpoint:
     @patch("main.AsyncResult")
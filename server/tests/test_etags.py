@@ -0,0 +1,154 @@
+"""Integration tests for ETag / conditional GET support."""
+
+import datetime
+import types
+import uuid
+
+import pytest
+
+import main
+from etags import make_etag
+from models import Connection
+
+
+def _revalidate(client, url, headers, etag):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+def later(monkeypatch, **delta):
+    """Move main's clock forward by delta (timedelta arguments)."""
+    class Later(datetime.datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.datetime.utcnow() + datetime.timedelta(**delta)
+
+    monkeypatch.setattr(main, "datetime", types.SimpleNamespace(**{**vars(datetime), "datetime": Later}))
+
+
+class TestMakeEtag:
+    def test_weak_and_stable(self):
+        etag = make_etag("a", 1)
+        assert etag.startswith('W/"')
+        assert etag == make_etag("a", 1)
+        assert etag != make_etag("a", 2)
+
+
+@pytest.mark.parametrize("url", ["/connections", "/logs", "/users/me", "/tags/connection"])
+class TestConditionalGet:
+    def test_sets_etag_and_cache_control(self, client, auth_headers, url):
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('W/"')
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_matching_if_none_match_returns_304(self, client, auth_headers, url):
+        etag = client.get(url, headers=auth_headers).headers["etag"]
+        response = _revalidate(client, url, auth_headers, etag)
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_strong_form_matches_weakly(self, client, auth_headers, url):
+        etag = client.get(url, headers=auth_headers).headers["etag"]
+        response = _revalidate(client, url, auth_headers, f'"other", {etag[2:]}')
+        assert response.status_code == 304
+
+    def test_stale_etag_returns_200(self, client, auth_headers, url):
+        response = _revalidate(client, url, auth_headers, 'W/"stale"')
+        assert response.status_code == 200
+
+
+class TestEtagInvalidation:
+    def test_create_connection_changes_connections_etag(self, client, auth_headers):
+        etag = client.get("/connections", headers=auth_headers).headers["etag"]
+        client.post("/connections", json={"name": "New"}, headers=auth_headers)
+        response = _revalidate(client, "/connections", auth_headers, etag)
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+
+    def test_update_connection_changes_etag(self, client, auth_headers, test_connection):
+        etag = client.get("/connections", headers=auth_headers).headers["etag"]
+        client.put(f"/connections/{test_connection.id}", json={"name": "X"}, headers=auth_headers)
+        assert _revalidate(client, "/connections", auth_headers, etag).status_code == 200
+
+    def test_delete_connection_changes_etag(self, client, auth_headers, test_connection):
+        etag = client.get("/connections", headers=auth_headers).headers["etag"]
+        client.delete(f"/connections/{test_connection.id}", headers=auth_headers)
+        assert _revalidate(client, "/connections", auth_headers, etag).status_code == 200
+
+    def test_log_writes_change_logs_etag(self, client, auth_headers, test_connection):
+        etag = client.get("/logs", headers=auth_headers).headers["etag"]
+        log = client.post(
+            "/logs", json={"connection_id": test_connection.id, "notes": "Call"},
+            headers=auth_headers,
+        ).json()
+        response = _revalidate(client, "/logs", auth_headers, etag)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        client.delete(f"/logs/{log['id']}", headers=auth_headers)
+        assert _revalidate(client, "/logs", auth_headers, etag).status_code == 200
+
+    def test_profile_update_changes_me_etag(self, client, auth_headers):
+        etag = client.get("/users/me", headers=auth_headers).headers["etag"]
+        client.put("/users/me", json={"name": "Renamed"}, headers=auth_headers)
+        response = _revalidate(client, "/users/me", auth_headers, etag)
+        assert response.status_code == 200
+        assert response.json()["name"] == "Renamed"
+
+    def test_new_custom_tag_changes_tags_etag(self, client, auth_headers):
+        etag = client.get("/tags/connection", headers=auth_headers).headers["etag"]
+        client.post("/connections", json={"name": "A", "tags": ["brand-new"]}, headers=auth_headers)
+        response = _revalidate(client, "/tags/connection", auth_headers, etag)
+        assert response.status_code == 200
+        assert "brand-new" in response.json()["custom"]["options"]
+
+    def test_query_string_is_part_of_etag(self, client, auth_headers):
+        etag = client.get("/connections?limit=10", headers=auth_headers).headers["etag"]
+        response = _revalidate(client, "/connections?limit=20", auth_headers, etag)
+        assert response.status_code == 200
+
+    def test_etag_is_per_user(self, client, auth_headers, second_auth_headers):
+        etag = client.get("/connections", headers=auth_headers).headers["etag"]
+        response = _revalidate(client, "/connections", second_auth_headers, etag)
+        assert response.status_code == 200
+
+    def test_not_contacted_days_etag_changes_when_the_cutoff_passes_a_row(
+        self, client, auth_headers, session, test_user, monkeypatch
+    ):
+        url = "/connections?not_contacted_days=30"
+        # Still inside the 30 days for another hour
+        contacted = datetime.datetime.utcnow() - datetime.timedelta(days=30, hours=-1)
+        session.add(Connection(id=str(uuid.uuid4()), user_id=test_user.id, name="Ada", lastContact=contacted))
+        session.commit()
+        first = client.get(url, headers=auth_headers)
+        assert first.json()["items"] == []
+        assert _revalidate(client, url, auth_headers, first.headers["etag"]).status_code == 304
+
+        later(monkeypatch, hours=2)
+        response = _revalidate(client, url, auth_headers, first.headers["etag"])
+        assert response.status_code == 200
+        assert [c["name"] for c in response.json()["items"]] == ["Ada"]
+
+    def test_not_contacted_days_etag_is_kept_until_something_crosses(self, client, auth_headers, monkeypatch):
+        url = "/connections?not_contacted_days=30"
+        etag = client.get(url, headers=auth_headers).headers["etag"]
+        later(monkeypatch, days=2)
+        assert _revalidate(client, url, auth_headers, etag).status_code == 304
+
+    def test_dashboard_etag_changes_when_a_connection_turns_overdue(
+        self, client, auth_headers, session, test_user, monkeypatch
+    ):
+        # Due in an hour, so already due soon
+        contacted = datetime.datetime.utcnow() - datetime.timedelta(days=30, hours=-1)
+        session.add(Connection(
+            id=str(uuid.uuid4()), user_id=test_user.id, name="Ada", frequency=30, lastContact=contacted,
+        ))
+        session.commit()
+        first = client.get("/dashboard", headers=auth_headers)
+        assert (first.json()["overdue"], first.json()["due_soon"]) == (0, 1)
+        assert _revalidate(client, "/dashboard", auth_headers, first.headers["etag"]).status_code == 304
+
+        later(monkeypatch, hours=2)
+        response = _revalidate(client, "/dashboard", auth_headers, first.headers["etag"])
+        assert response.status_code == 200
+        assert (response.json()["overdue"], response.json()["due_soon"]) == (1, 0)
@@ -0,0 +1,36 @@
+"""Tests for the enrichment worker's per-process HTTP session and user-agent pool."""
+
+from unittest.mock import patch
+
+import http_client
+import worker
+
+
+class TestUserAgentPool:
+    def test_rotates_sampled_agents(self):
+        pool = http_client.UserAgentPool(size=5)
+        assert 1 <= len(pool.agents) <= 5
+        seen = [pool.next() for _ in range(len(pool.agents) * 2)]
+        assert seen[:len(pool.agents)] == pool.agents == seen[len(pool.agents):]
+
+    @patch("fake_useragent.UserAgent", side_effect=RuntimeError("no data"))
+    def test_falls_back_without_dataset(self, _):
+        pool = http_client.UserAgentPool()
+        assert pool.agents == list(http_client.FALLBACK_USER_AGENTS)
+
+
+class TestSession:
+    def test_pooled_adapter_with_retries(self):
+        session = http_client.build_session(retries=3, pool_size=4)
+        adapter = session.get_adapter("https://www.linkedin.com/in/x")
+        assert adapter.max_retries.total == 3
+        assert 429 in adapter.max_retries.status_forcelist
+        assert adapter._pool_maxsize == 4
+
+    def test_built_once_per_process(self):
+        assert http_client.get_session() is http_client.get_session()
+
+    def test_worker_process_init_rebuilds(self):
+        before = http_client.get_session()
+        worker.init_worker_process()
+        assert http_client.get_session() is not before
@@ -150,11 +150,23 @@ class TestDeleteLog:
         self, client, second_auth_headers, test_log
     ):
         """Second user should not delete first user's log
-        (log is linked to first user's connection)."""
+        (someone else's log looks like a missing one)."""
         response = client.delete(
             f"/logs/{test_log.id}", headers=second_auth_headers
         )
-        assert response.status_code == 403
+        assert response.status_code == 404
+
+    def test_delete_unlinked_log_user_isolation(
+        self, client, auth_headers, second_auth_headers
+    ):
+        """A log without a connection is still only its owner's to delete."""
+        log = client.post("/logs", json={"notes": "solo"}, headers=auth_headers).json()
+        response = client.delete(f"/logs/{log['id']}", headers=second_auth_headers)
+        assert response.status_code == 404
+        assert client.get("/sync", headers=second_auth_headers).json()["deleted"]["logs"] == []
+
+        assert client.delete(f"/logs/{log['id']}", headers=auth_headers).status_code == 204
+        assert client.get("/sync", headers=auth_headers).json()["deleted"]["logs"] == [log["id"]]
 
     def test_delete_log_unauthenticated(self, client, test_log):
         response = client.delete(f"/logs/{test_log.id}")
@@ -235,6 +247,29 @@ class TestLastContactSync:
         session.refresh(conn)
         assert conn.lastContact == recent_date
 
+    def test_failed_log_insert_leaves_last_contact(
+        self, client, auth_headers, session, test_connection, monkeypatch
+    ):
+        """The lastContact update commits with the log, or not at all."""
+        from sqlmodel import select
+        from models import TagDefinition
+        import writes
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("insert failed")
+
+        monkeypatch.setattr(writes, "insert_log", fail)
+        with pytest.raises(RuntimeError):
+            client.post(
+                "/logs",
+                json={"connection_id": test_connection.id, "notes": "n", "tags": ["Brand New Tag"]},
+                headers=auth_headers,
+            )
+        session.rollback()
+        session.refresh(test_connection)
+        assert test_connection.lastContact.year == 2024
+        assert session.exec(select(TagDefinition).where(TagDefinition.name == "Brand New Tag")).first() is None
+
     def test_delete_log_recalculates_last_contact(
         self, client, auth_headers, session, test_user
     ):
@@ -2,6 +2,7 @@
 
 import pytest
 import json
+import uuid
 from datetime import datetime
 
 from models import (
@@ -190,15 +191,18 @@ class TestUserSchemas:
         assert schema.name == "Alice"
 
     def test_user_read(self):
+        user_id = uuid.uuid4()
         schema = UserRead(
-            id="u1",
+            id=str(user_id),
+            firebase_uid="u1",
             email="a@b.com",
             name="Alice",
             is_active=True,
             is_onboarded=False,
             created_at=datetime(2024, 1, 1),
         )
-        assert schema.id == "u1"
+        assert schema.id == user_id
+        assert schema.firebase_uid == "u1"
         assert schema.is_active is True
         assert schema.is_onboarded is False
 
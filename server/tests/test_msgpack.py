@@ -0,0 +1,71 @@
+"""Tests for MessagePack content negotiation on list and sync endpoints."""
+
+import datetime
+
+import msgpack
+
+MSGPACK_HEADERS = {"Accept": "application/msgpack"}
+
+
+def _unpack(response):
+    assert response.headers["content-type"] == "application/msgpack"
+    return msgpack.unpackb(response.content)
+
+
+class TestMsgpackConnections:
+    def test_same_structure_as_json(self, client, auth_headers, test_connection):
+        as_json = client.get("/connections", headers=auth_headers).json()
+        as_msgpack = _unpack(client.get("/connections", headers={**auth_headers, **MSGPACK_HEADERS}))
+        assert as_msgpack["total"] == as_json["total"]
+        item = as_msgpack["items"][0]
+        assert set(item) == set(as_json["items"][0])
+        assert item["name"] == "Jane Doe"
+        assert item["tags"] == ["work", "python"]
+
+    def test_datetimes_are_epoch_milliseconds(self, client, auth_headers, test_connection):
+        data = _unpack(client.get("/connections", headers={**auth_headers, **MSGPACK_HEADERS}))
+        last_contact = data["items"][0]["lastContact"]
+        assert isinstance(last_contact, int)
+        expected = datetime.datetime(2024, 1, 15, tzinfo=datetime.timezone.utc)
+        assert last_contact == int(expected.timestamp() * 1000)
+
+    def test_fields_projection(self, client, auth_headers, test_connection):
+        data = _unpack(client.get(
+            "/connections?fields=name", headers={**auth_headers, **MSGPACK_HEADERS}
+        ))
+        assert data["items"][0] == {"name": "Jane Doe", "id": test_connection.id}
+
+    def test_x_msgpack_alias(self, client, auth_headers):
+        response = client.get("/connections", headers={**auth_headers, "Accept": "application/x-msgpack"})
+        assert response.headers["content-type"] == "application/msgpack"
+
+    def test_json_is_default(self, client, auth_headers, test_connection):
+        response = client.get("/connections", headers={**auth_headers, "Accept": "*/*"})
+        assert response.headers["content-type"] == "application/json"
+        assert "Accept" in response.headers["vary"]
+
+    def test_etag_differs_per_format(self, client, auth_headers):
+        json_etag = client.get("/connections", headers=auth_headers).headers["etag"]
+        response = client.get(
+            "/connections",
+            headers={**auth_headers, **MSGPACK_HEADERS, "If-None-Match": json_etag},
+        )
+        assert response.status_code == 200
+
+
+class TestMsgpackLogsAndSync:
+    def test_logs(self, client, auth_headers, test_log):
+        data = _unpack(client.get("/logs", headers={**auth_headers, **MSGPACK_HEADERS}))
+        assert data["items"][0]["id"] == test_log.id
+        assert data["items"][0]["tags"] == ["catchup"]
+        assert isinstance(data["items"][0]["created_at"], int)
+
+    def test_sync(self, client, auth_headers, test_connection, test_log):
+        data = _unpack(client.get("/sync", headers={**auth_headers, **MSGPACK_HEADERS}))
+        assert [c["id"] for c in data["connections"]] == [test_connection.id]
+        assert [l["id"] for l in data["logs"]] == [test_log.id]
+        # The cursor round-trips regardless of wire format
+        response = client.get(
+            "/sync", params={"since": data["cursor"]}, headers=auth_headers
+        )
+        assert response.json()["connections"] == []
@@ -0,0 +1,135 @@
+"""Integration tests for POST /connections/ingest (extension-supplied profile data)."""
+
+import json
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import select
+
+from models import Connection
+
+PERSON = {
+    "@graph": [{
+        "@type": "Person",
+        "name": "Ada Lovelace",
+        "address": {"addressLocality": "London"},
+        "worksFor": [{"name": "Analytical Engines"}],
+        "jobTitle": ["*** ****", "Mathematician"],
+    }]
+}
+
+
+@pytest.fixture(autouse=True)
+def no_fetch():
+    """Ingestion never queues an enrichment task or fetches a page."""
+    with patch("main.enrich_linkedin_task") as task, patch("requests.Session.get") as get:
+        yield
+        task.apply_async.assert_not_called()
+        get.assert_not_called()
+
+
+def ingest(client, auth_headers, **body):
+    return client.post("/connections/ingest", json=body, headers=auth_headers)
+
+
+class TestIngestCreates:
+    def test_json_ld_text(self, client, auth_headers, session, test_user):
+        response = ingest(
+            client, auth_headers,
+            linkedin="https://linkedin.com/in/ada-lovelace/", json_ld=[json.dumps(PERSON)],
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert (data["name"], data["role"], data["company"], data["location"]) == (
+            "Ada Lovelace", "Mathematician", "Analytical Engines", "London",
+        )
+        assert data["linkedin"] == "https://www.linkedin.com/in/ada-lovelace"
+        session.refresh(test_user)
+        assert test_user.data_version == 1
+
+    def test_json_ld_objects(self, client, auth_headers):
+        response = ingest(client, auth_headers, linkedin="https://linkedin.com/in/ada", json_ld=[PERSON])
+        assert response.json()["company"] == "Analytical Engines"
+
+    def test_og_title(self, client, auth_headers):
+        response = ingest(
+            client, auth_headers,
+            linkedin="https://linkedin.com/in/jane", og_title="Jane Smith - CTO at TechCo | LinkedIn",
+        )
+        data = response.json()
+        assert (data["name"], data["role"], data["company"]) == ("Jane Smith", "CTO", "TechCo")
+
+    def test_html_fragment(self, client, auth_headers):
+        html = f'<script type="application/ld+json">{json.dumps(PERSON)}</script>'
+        response = ingest(client, auth_headers, linkedin="https://linkedin.com/in/ada", html=html)
+        assert response.json()["role"] == "Mathematician"
+
+    def test_unparseable_falls_back_to_slug(self, client, auth_headers):
+        response = ingest(
+            client, auth_headers, linkedin="https://linkedin.com/in/john-doe", json_ld=["not json"],
+        )
+        assert response.status_code == 201
+        assert response.json()["name"] == "John Doe"
+
+
+class TestIngestUpdates:
+    def test_fills_existing_connection(self, client, auth_headers, session, test_user):
+        existing = Connection(
+            id=str(uuid.uuid4()), user_id=test_user.id, name="Ada", role="Countess",
+            linkedin="https://www.LinkedIn.com/in/Ada-Lovelace?trk=x",
+        )
+        session.add(existing)
+        session.commit()
+
+        response = ingest(
+            client, auth_headers, linkedin="https://linkedin.com/in/ada-lovelace", json_ld=[PERSON],
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == existing.id
+        assert (data["name"], data["role"], data["company"]) == ("Ada", "Countess", "Analytical Engines")
+        rows = session.exec(select(Connection).where(Connection.user_id == test_user.id)).all()
+        assert len(rows) == 1
+
+    def test_nothing_to_fill(self, client, auth_headers, session, test_user, test_connection):
+        test_connection.linkedin = "https://www.linkedin.com/in/jane-doe"
+        session.add(test_connection)
+        session.commit()
+        response = ingest(
+            client, auth_headers,
+            linkedin="https://linkedin.com/in/jane-doe", og_title="Jane Doe - CEO at Other | LinkedIn",
+        )
+        assert response.status_code == 200
+        assert response.json()["company"] == "Acme Corp"
+        session.refresh(test_user)
+        assert test_user.data_version == 0
+
+    def test_other_users_connection_ignored(self, client, auth_headers, session, second_user):
+        session.add(Connection(
+            id=str(uuid.uuid4()), user_id=second_user.id, name="Theirs",
+            linkedin="https://www.linkedin.com/in/ada",
+        ))
+        session.commit()
+        response = ingest(client, auth_headers, linkedin="https://linkedin.com/in/ada", json_ld=[PERSON])
+        assert response.status_code == 201
+        assert response.json()["name"] == "Ada Lovelace"
+
+
+class TestIngestValidation:
+    def test_requires_profile_data(self, client, auth_headers):
+        assert ingest(client, auth_headers, linkedin="https://linkedin.com/in/ada").status_code == 422
+
+    def test_requires_url(self, client, auth_headers):
+        assert ingest(client, auth_headers, linkedin="", og_title="Ada").status_code == 422
+
+    def test_oversized_fields(self, client, auth_headers):
+        response = ingest(
+            client, auth_headers,
+            linkedin="https://linkedin.com/in/ada", json_ld=[{"@type": "Person", "name": "A" * 1000}],
+        )
+        assert response.status_code == 422
+
+    def test_requires_auth(self, client):
+        response = client.post("/connections/ingest", json={"linkedin": "https://linkedin.com/in/a", "og_title": "A"})
+        assert response.status_code in (401, 403)
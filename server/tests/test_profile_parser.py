@@ -0,0 +1,51 @@
+"""Tests for the targeted profile parser against saved profile pages."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from profile_parser import extract, parse_profile
+
+FIXTURES = Path(__file__).parent / "fixtures" / "profiles"
+# What the full BeautifulSoup chain returned for each page (or the exception it raised)
+EXPECTED = json.loads((FIXTURES / "expected.json").read_text(encoding="utf-8"))
+URL = "https://www.linkedin.com/in/test-user"
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_matches_full_parse(name):
+    html = (FIXTURES / name).read_text(encoding="utf-8")
+    expected = EXPECTED[name]
+    if "raises" in expected:
+        with pytest.raises(Exception) as raised:
+            parse_profile(html, URL)
+        assert type(raised.value).__name__ == expected["raises"]
+    else:
+        assert parse_profile(html, URL) == expected
+
+
+def test_every_fixture_has_an_expectation():
+    assert sorted(path.name for path in FIXTURES.glob("*.html")) == sorted(EXPECTED)
+
+
+class TestExtract:
+    def test_skips_comments_scripts_and_styles(self):
+        page = extract(
+            '<!-- <meta property="og:title" content="comment"> -->'
+            '<script>x = \'<meta property="og:title" content="script">\'</script>'
+            '<meta property="og:title" content="real">'
+        )
+        assert page.og_title == "real"
+
+    def test_json_ld_in_document_order(self):
+        page = extract(
+            '<script type="application/ld+json">{"a": 1}</script>'
+            '<script type="text/javascript">{"b": 2}</script>'
+            '<script type="application/ld+json"></script>'
+            '<body><script type="application/ld+json">{"c": "</div>"}</script></body>'
+        )
+        assert page.json_ld == ['{"a": 1}', '{"c": "</div>"}']
+
+    def test_attribute_entities_unescaped(self):
+        assert extract('<meta property="og:title" content="A &amp; B">').og_title == "A & B"
@@ -0,0 +1,59 @@
+"""Unit tests for queries.py - Core read path for list endpoints."""
+
+import uuid
+import datetime
+
+from models import Connection, Log, TagDefinition
+from queries import ConnectionRow, fetch_connections, fetch_logs, fetch_tags
+
+
+class TestFetchConnections:
+    def test_returns_slot_dtos(self, session, test_user, test_connection):
+        rows = fetch_connections(session, [Connection.user_id == test_user.id])
+        assert len(rows) == 1
+        row = rows[0]
+        assert isinstance(row, ConnectionRow)
+        assert not hasattr(row, "__dict__")
+        assert row.id == test_connection.id
+        assert row.name == "Jane Doe"
+        assert row.company == "Acme Corp"
+        assert row.tags_json == '["work", "python"]'
+        assert row.lastContact == datetime.datetime(2024, 1, 15)
+
+    def test_does_not_populate_identity_map(self, session, test_user, test_connection):
+        user_id = test_user.id
+        session.expunge_all()
+        fetch_connections(session, [Connection.user_id == user_id])
+        assert len(session.identity_map) == 0
+
+    def test_limit_offset_and_order(self, session, test_user):
+        for name in ["C", "A", "B"]:
+            session.add(Connection(id=str(uuid.uuid4()), user_id=test_user.id, name=name))
+        session.commit()
+        rows = fetch_connections(
+            session, [Connection.user_id == test_user.id],
+            order_by=[Connection.name], limit=2, offset=1,
+        )
+        assert [r.name for r in rows] == ["B", "C"]
+
+
+class TestFetchLogs:
+    def test_newest_first(self, session, test_user):
+        for day in [1, 3, 2]:
+            session.add(Log(
+                id=str(uuid.uuid4()), user_id=test_user.id, notes=f"day {day}",
+                created_at=datetime.datetime(2024, 1, day),
+            ))
+        session.commit()
+        rows = fetch_logs(session, [Log.user_id == test_user.id])
+        assert [r.notes for r in rows] == ["day 3", "day 2", "day 1"]
+        assert rows[0].tags_json == "[]"
+
+
+class TestFetchTags:
+    def test_filters_by_type(self, session):
+        session.add(TagDefinition(category="howMet", name="Conference", type="connection"))
+        session.add(TagDefinition(category="interactionType", name="Call", type="interaction"))
+        session.commit()
+        rows = fetch_tags(session, "connection")
+        assert [(r.category, r.name) for r in rows] == [("howMet", "Conference")]
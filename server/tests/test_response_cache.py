@@ -0,0 +1,122 @@
+"""Tests for response_cache.py - L1 LRU + Redis response cache."""
+
+import pytest
+import redis
+
+from response_cache import KEY_PREFIX, LRUCache, ResponseCache, response_cache
+
+
+class BrokenRedis:
+    def get(self, key):
+        raise redis.ConnectionError("down")
+
+    def set(self, key, value, ex=None):
+        raise redis.ConnectionError("down")
+
+
+@pytest.fixture
+def fake_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis()
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        assert cache.get("a") == b"1"
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("response_cache.time.monotonic", lambda: now[0])
+        cache = LRUCache(2, ttl=10)
+        cache.set("a", b"1")
+        now[0] += 9
+        assert cache.get("a") == b"1"
+        now[0] += 1
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestResponseCache:
+    def test_l1_uses_redis_ttl(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("response_cache.time.monotonic", lambda: now[0])
+        cache = ResponseCache(ttl=60)
+        cache.set("k", b"body")
+        now[0] += 60
+        assert cache.get("k") is None
+
+    def test_l1_only(self):
+        cache = ResponseCache()
+        assert cache.get("k") is None
+        cache.set("k", b"body")
+        assert cache.get("k") == b"body"
+        metrics = cache.metrics()
+        assert (metrics["l1_hits"], metrics["misses"]) == (1, 1)
+        assert metrics["hit_ratio"] == 0.5
+
+    def test_l2_hit_fills_l1(self, fake_redis):
+        writer = ResponseCache(fake_redis)
+        writer.set("k", b"body")
+        assert fake_redis.ttl(KEY_PREFIX + "k") > 0
+
+        # Another process: empty L1, same Redis
+        reader = ResponseCache(fake_redis)
+        assert reader.get("k") == b"body"
+        assert reader.get("k") == b"body"
+        metrics = reader.metrics()
+        assert (metrics["l2_hits"], metrics["l1_hits"], metrics["misses"]) == (1, 1, 0)
+
+    def test_redis_errors_fall_back(self):
+        cache = ResponseCache(BrokenRedis())
+        cache.set("k", b"body")
+        assert cache.get("k") == b"body"
+        assert cache.get("other") is None
+        # One failure, then Redis is skipped until the retry window passes
+        assert cache.metrics()["redis_errors"] == 1
+
+    def test_skips_large_bodies(self):
+        cache = ResponseCache(max_body=4)
+        cache.set("k", b"too large")
+        assert cache.get("k") is None
+
+
+class TestCachedEndpoints:
+    def test_repeat_read_is_served_from_cache(self, client, auth_headers, test_connection):
+        first = client.get("/connections?limit=10&sort=name", headers=auth_headers)
+        second = client.get("/connections?sort=name&limit=10", headers=auth_headers)
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        metrics = response_cache.metrics()
+        assert (metrics["misses"], metrics["l1_hits"]) == (1, 1)
+
+    def test_write_invalidates(self, client, auth_headers, test_connection):
+        client.get("/connections", headers=auth_headers)
+        client.put(f"/connections/{test_connection.id}", json={"company": "Initech"}, headers=auth_headers)
+        items = client.get("/connections", headers=auth_headers).json()["items"]
+        assert items[0]["company"] == "Initech"
+
+    def test_log_write_invalidates_dashboard(self, client, auth_headers, test_connection):
+        assert client.get("/dashboard", headers=auth_headers).json()["total_logs"] == 0
+        client.post("/logs", json={"connection_id": test_connection.id, "notes": "Hi"}, headers=auth_headers)
+        assert client.get("/dashboard", headers=auth_headers).json()["total_logs"] == 1
+        assert response_cache.metrics()["l1_hits"] == 0
+
+    def test_users_do_not_share_entries(self, client, auth_headers, second_auth_headers, test_connection):
+        client.get("/logs", headers=auth_headers)
+        response = client.get("/connections", headers=second_auth_headers)
+        assert response.json()["items"] == []
+        assert response_cache.metrics()["l1_hits"] == 0
+
+    def test_metrics_endpoint(self, client, auth_headers):
+        client.get("/logs", headers=auth_headers)
+        client.get("/logs", headers=auth_headers)
+        metrics = client.get("/metrics/cache", headers=auth_headers).json()
+        assert metrics["l1_hits"] == 1
+        assert metrics["misses"] == 1
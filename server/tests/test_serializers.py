@@ -0,0 +1,71 @@
+"""Unit tests for serializers.py - fast-path list encoding."""
+
+import json
+import uuid
+import datetime
+
+from models import Connection, ConnectionRead, Log, LogRead, PaginatedConnections
+from serializers import (
+    connection_to_dict, log_to_dict, encode_connections, JSON, paginated, render,
+)
+
+
+def _connection(**overrides):
+    fields = dict(
+        id=str(uuid.uuid4()),
+        name="Jane Doe",
+        role="Engineer",
+        company="Acme Corp",
+        frequency=30,
+        lastContact=datetime.datetime(2024, 1, 15, 9, 30, 0, 123456),
+        notes="Met at PyCon",
+        tags_json='["work", "python"]',
+        created_at=datetime.datetime(2024, 1, 1),
+    )
+    fields.update(overrides)
+    return Connection(**fields)
+
+
+class TestConnectionEncoding:
+    def test_matches_pydantic_serialization(self):
+        conn = _connection()
+        expected = ConnectionRead.model_validate(conn).model_dump(mode="json")
+        body = render(JSON, connection_to_dict(conn)).body
+        assert json.loads(body) == expected
+
+    def test_key_order_matches_connection_read(self):
+        conn = _connection()
+        body = render(JSON, connection_to_dict(conn)).body
+        assert list(json.loads(body)) == list(ConnectionRead.model_fields)
+
+    def test_tags_embedded_without_decoding(self):
+        conn = _connection(tags_json='["a", "b \\"quoted\\""]')
+        body = render(JSON, connection_to_dict(conn)).body
+        assert json.loads(body)["tags"] == ["a", 'b "quoted"']
+
+    def test_null_last_contact(self):
+        body = render(JSON, connection_to_dict(_connection(lastContact=None))).body
+        assert json.loads(body)["lastContact"] is None
+
+    def test_paginated_matches_model(self):
+        conns = [_connection(name=f"P{i}") for i in range(3)]
+        expected = PaginatedConnections(
+            items=conns, total=10, limit=3, offset=0
+        ).model_dump(mode="json")
+        body = render(JSON, paginated(encode_connections(conns), 10, 3, 0)).body
+        assert json.loads(body) == expected
+
+
+class TestLogEncoding:
+    def test_matches_pydantic_serialization(self):
+        log = Log(
+            id=str(uuid.uuid4()),
+            connection_id=None,
+            type="meeting",
+            notes="Coffee",
+            tags_json='["catchup"]',
+            created_at=datetime.datetime(2024, 2, 3, 4, 5, 6),
+        )
+        expected = LogRead.model_validate(log).model_dump(mode="json")
+        body = render(JSON, log_to_dict(log)).body
+        assert json.loads(body) == expected
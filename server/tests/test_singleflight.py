@@ -0,0 +1,161 @@
+"""Tests for singleflight.py and the coalesced build path in response_cache.py."""
+
+import threading
+import time
+
+import pytest
+
+import response_cache as response_cache_module
+from response_cache import KEY_PREFIX, LOCK_PREFIX, ResponseCache
+from singleflight import SingleFlight
+
+
+def run_concurrently(count, fn):
+    results, errors = [None] * count, []
+    start = threading.Barrier(count)
+
+    def worker(index):
+        start.wait()
+        try:
+            results[index] = fn()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class SlowBuild:
+    def __init__(self, body=b"body", delay=0.1, error=None):
+        self.body, self.delay, self.error = body, delay, error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.body
+
+
+class GatedBuild:
+    """A build that signals when it starts and blocks until released."""
+
+    def __init__(self, body=b"body"):
+        self.body = body
+        self.calls = 0
+        self.started, self.release = threading.Event(), threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        return self.body
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight()
+        build = SlowBuild()
+        results, errors = run_concurrently(8, lambda: flights.do("k", build))
+        assert not errors
+        assert build.calls == 1
+        assert {result for result, _ in results} == {b"body"}
+        assert sum(shared for _, shared in results) == 7
+        assert flights.in_flight() == 0
+
+    def test_followers_get_the_leaders_error(self):
+        flights = SingleFlight()
+        build = SlowBuild(error=ValueError("boom"))
+        _, errors = run_concurrently(4, lambda: flights.do("k", build))
+        assert build.calls == 1
+        assert len(errors) == 4
+
+    def test_distinct_keys_do_not_share(self):
+        flights = SingleFlight()
+        build = SlowBuild(delay=0)
+        flights.do("a", build)
+        flights.do("b", build)
+        assert build.calls == 2
+
+    def test_followers_give_up_after_timeout(self):
+        flights = SingleFlight(wait_timeout=0.01)
+        build = SlowBuild(delay=0.2)
+        run_concurrently(2, lambda: flights.do("k", build))
+        assert build.calls == 2
+
+
+class TestCoalescedBuilds:
+    def test_in_process(self):
+        cache = ResponseCache()
+        build = SlowBuild()
+        results, errors = run_concurrently(6, lambda: cache.get_or_build("k", build))
+        assert not errors and results == [b"body"] * 6
+        assert build.calls == 1
+        metrics = cache.metrics()
+        assert metrics["builds"] == 1
+        assert metrics["coalesced"] == 5
+        # Later requests are plain cache hits
+        assert cache.get_or_build("k", build) == b"body"
+        assert build.calls == 1
+
+    def test_across_processes(self, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        monkeypatch.setattr(response_cache_module, "BUILD_POLL_SECONDS", 0.005)
+        shared = fakeredis.FakeRedis()
+        first, second = ResponseCache(shared), ResponseCache(shared)
+        build_first, build_second = GatedBuild(), SlowBuild(b"duplicate")
+
+        # The first build holds the Redis lock until the second process is waiting on it
+        waiting = threading.Event()
+        wait_for_remote = second._wait_for_remote
+
+        def waiting_for_remote(key):
+            waiting.set()
+            return wait_for_remote(key)
+
+        monkeypatch.setattr(second, "_wait_for_remote", waiting_for_remote)
+        results = {}
+        first_thread = threading.Thread(target=first.get_or_build, args=("k", build_first))
+        first_thread.start()
+        assert build_first.started.wait(5)
+        second_thread = threading.Thread(
+            target=lambda: results.update(second=second.get_or_build("k", build_second))
+        )
+        second_thread.start()
+        assert waiting.wait(5)
+        build_first.release.set()
+        first_thread.join()
+        second_thread.join()
+
+        assert results["second"] == b"body"
+
+        assert (build_first.calls, build_second.calls) == (1, 0)
+        assert second.metrics()["remote_waits"] == 1
+        assert not shared.exists(LOCK_PREFIX + "k")
+
+    def test_remote_builder_failure_falls_back(self, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        monkeypatch.setattr(response_cache_module, "BUILD_WAIT_SECONDS", 0.05)
+        shared = fakeredis.FakeRedis()
+        # A lock left by a process that will never write the body
+        shared.set(LOCK_PREFIX + "k", "other", px=10000)
+        cache = ResponseCache(shared)
+        build = SlowBuild(delay=0)
+        assert cache.get_or_build("k", build) == b"body"
+        assert build.calls == 1
+        assert shared.get(KEY_PREFIX + "k") == b"body"
+
+    def test_ttl_is_jittered(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        shared = fakeredis.FakeRedis()
+        cache = ResponseCache(shared, ttl=1000)
+        for index in range(20):
+            cache.set(f"k{index}", b"body")
+        ttls = {shared.ttl(f"{KEY_PREFIX}k{index}") for index in range(20)}
+        assert len(ttls) > 1
+        assert all(900 <= ttl <= 1100 for ttl in ttls)
@@ -0,0 +1,121 @@
+"""Tests for the raw HTML snapshot store and the re-parse job."""
+
+import gzip
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import reparse
+from snapshot_store import SnapshotStore, snapshot_store
+from worker import enrich_linkedin_task
+
+PAGE = '<html><head><meta property="og:title" content="{name} - Engineer at Acme | LinkedIn"></head></html>'
+URL = "https://www.linkedin.com/in/ada"
+
+
+def shouting_parser(html, url):
+    """A 'new parser version' for the pool: the name in capitals."""
+    result = reparse.parse_profile(html, url)
+    return {**result, "name": result["name"].upper()}
+
+
+def failing_parser(html, url):
+    raise ValueError("bad page")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path))
+
+
+class TestSnapshotStore:
+    def test_save_and_load(self, store, tmp_path):
+        digest = store.save(URL, PAGE.format(name="Ada"), datetime(2024, 5, 1))
+        assert store.load(digest) == PAGE.format(name="Ada")
+        (blob,) = (tmp_path / "blobs").rglob("*.html.gz")
+        assert blob.name == digest + ".html.gz"
+        assert gzip.decompress(blob.read_bytes()).decode() == PAGE.format(name="Ada")
+        assert store.history(URL) == [(URL, "2024-05-01T00:00:00", digest)]
+
+    def test_unchanged_page_stored_once(self, store, tmp_path):
+        first = store.save(URL, PAGE.format(name="Ada"), datetime(2024, 5, 1))
+        second = store.save(URL, PAGE.format(name="Ada"), datetime(2024, 6, 1))
+        assert first == second
+        assert len(list((tmp_path / "blobs").rglob("*.html.gz"))) == 1
+        assert len(store.history(URL)) == 2
+
+    def test_latest_per_url(self, store):
+        store.save(URL, PAGE.format(name="Old"), datetime(2024, 5, 1))
+        newest = store.save(URL, PAGE.format(name="New"), datetime(2024, 6, 1))
+        store.save("https://www.linkedin.com/in/bo", PAGE.format(name="Bo"))
+        latest = list(store.snapshots())
+        assert [snapshot.url for snapshot in latest] == [URL, "https://www.linkedin.com/in/bo"]
+        assert latest[0].sha256 == newest
+        assert len(list(store.snapshots(latest_only=False))) == 3
+
+    def test_off_without_directory(self):
+        off = SnapshotStore("")
+        assert off.save(URL, PAGE) is None
+        assert list(off.snapshots()) == []
+
+    def test_write_errors_do_not_raise(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        assert SnapshotStore(str(blocker)).save(URL, PAGE) is None
+
+
+class TestWorkerSnapshots:
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
+    def test_fetched_pages_saved(self, mock_ua, mock_get, tmp_path, monkeypatch):
+        monkeypatch.setattr(snapshot_store, "root", str(tmp_path))
+        mock_ua.return_value = "TestAgent/1.0"
+        mock_get.return_value = MagicMock(status_code=200, text=PAGE.format(name="Ada"))
+        enrich_linkedin_task(URL)
+        (snapshot,) = snapshot_store.history(URL)
+        assert snapshot_store.load(snapshot.sha256) == PAGE.format(name="Ada")
+
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
+    def test_error_responses_not_saved(self, mock_ua, mock_get, tmp_path, monkeypatch):
+        monkeypatch.setattr(snapshot_store, "root", str(tmp_path))
+        mock_ua.return_value = "TestAgent/1.0"
+        mock_get.return_value = MagicMock(status_code=999, text="denied")
+        enrich_linkedin_task(URL)
+        assert snapshot_store.history(URL) == []
+
+
+class TestReparse:
+    def test_runs_parser_over_snapshots(self, store):
+        store.save(URL, PAGE.format(name="Ada"))
+        store.save("https://www.linkedin.com/in/bo", PAGE.format(name="Bo"))
+        results = list(reparse.reparse(store, shouting_parser, workers=2))
+        assert [(snapshot.url, result["name"]) for snapshot, result in results] == [
+            (URL, "ADA"), ("https://www.linkedin.com/in/bo", "BO"),
+        ]
+        assert results[0][1]["company"] == "Acme"
+
+    def test_parser_errors_reported(self, store):
+        store.save(URL, PAGE.format(name="Ada"))
+        ((_, result),) = reparse.reparse(store, failing_parser, workers=1)
+        assert result == {"error": "ValueError: bad page"}
+
+    def test_changes(self, store):
+        store.save(URL, PAGE.format(name="Ada"))
+        before = [reparse.record(*item) for item in reparse.reparse(store, workers=1)]
+        after = [reparse.record(*item) for item in reparse.reparse(store, shouting_parser, workers=1)]
+        assert reparse.changes(before, before) == []
+        assert reparse.changes(before, after) == [
+            {"url": URL, "sha256": before[0]["sha256"], "fields": {"name": ["Ada", "ADA"]}},
+        ]
+
+    def test_cli(self, store, tmp_path, capsys):
+        store.save(URL, PAGE.format(name="Ada"))
+        out = tmp_path / "results.jsonl"
+        assert reparse.main(["--dir", store.root, "--workers", "1", "--out", str(out)]) == 0
+        (line,) = out.read_text().splitlines()
+        assert json.loads(line)["result"]["name"] == "Ada"
+        assert reparse.main(["--dir", store.root, "--workers", "1", "--baseline", str(out)]) == 0
+        assert "0 changed" in capsys.readouterr().out
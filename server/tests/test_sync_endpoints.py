@@ -0,0 +1,160 @@
+"""Integration tests for the delta sync endpoint."""
+
+import base64
+import uuid
+from datetime import timedelta
+
+import orjson
+
+import sync
+from models import Connection
+
+
+def _sync(client, headers, since=None, limit=None):
+    params = {}
+    if since:
+        params["since"] = since
+    if limit:
+        params["limit"] = limit
+    response = client.get("/sync", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def _drain(client, headers, since=None, limit=None):
+    """Follow has_more until the stream is exhausted."""
+    pages = [_sync(client, headers, since, limit)]
+    while pages[-1]["has_more"]:
+        pages.append(_sync(client, headers, pages[-1]["cursor"], limit))
+    return pages
+
+
+class TestFullSync:
+    def test_initial_sync_returns_everything(self, client, auth_headers, test_connection, test_log):
+        data = _sync(client, auth_headers)
+        assert [c["id"] for c in data["connections"]] == [test_connection.id]
+        assert data["connections"][0]["tags"] == ["work", "python"]
+        assert [l["id"] for l in data["logs"]] == [test_log.id]
+        assert data["deleted"] == {"connections": [], "logs": [], "tags": []}
+        assert data["has_more"] is False
+        assert data["cursor"]
+
+    def test_includes_tag_catalog(self, client, auth_headers):
+        client.post("/connections", json={"name": "A", "tags": ["rare-tag"]}, headers=auth_headers)
+        data = _sync(client, auth_headers)
+        assert {"type": "connection", "category": "custom", "name": "rare-tag"}.items() <= data["tags"][-1].items()
+
+    def test_user_isolation(self, client, second_auth_headers, test_connection, test_log):
+        data = _sync(client, second_auth_headers)
+        assert data["connections"] == []
+        assert data["logs"] == []
+
+
+class TestDeltaSync:
+    def test_nothing_changed(self, client, auth_headers, test_connection):
+        cursor = _sync(client, auth_headers)["cursor"]
+        data = _sync(client, auth_headers, cursor)
+        assert data["connections"] == []
+        assert data["logs"] == []
+        assert data["tags"] == []
+        assert data["cursor"] == cursor
+
+    def test_returns_only_changed_connections(self, client, auth_headers, test_connection):
+        other = client.post("/connections", json={"name": "Other"}, headers=auth_headers).json()
+        cursor = _sync(client, auth_headers)["cursor"]
+        client.put(f"/connections/{test_connection.id}", json={"role": "CTO"}, headers=auth_headers)
+        data = _sync(client, auth_headers, cursor)
+        assert [c["id"] for c in data["connections"]] == [test_connection.id]
+        assert data["connections"][0]["role"] == "CTO"
+        assert other["id"] not in [c["id"] for c in data["connections"]]
+
+    def test_new_log_touches_its_connection(self, client, auth_headers, test_connection):
+        cursor = _sync(client, auth_headers)["cursor"]
+        client.post(
+            "/logs", json={"connection_id": test_connection.id, "notes": "Call"},
+            headers=auth_headers,
+        )
+        data = _sync(client, auth_headers, cursor)
+        assert len(data["logs"]) == 1
+        # lastContact moved, so the connection is part of the delta too
+        assert [c["id"] for c in data["connections"]] == [test_connection.id]
+
+    def test_deletes_are_reported(self, client, auth_headers, test_connection, test_log):
+        cursor = _sync(client, auth_headers)["cursor"]
+        client.delete(f"/logs/{test_log.id}", headers=auth_headers)
+        client.delete(f"/connections/{test_connection.id}", headers=auth_headers)
+        data = _sync(client, auth_headers, cursor)
+        assert data["deleted"] == {
+            "connections": [test_connection.id],
+            "logs": [test_log.id],
+            "tags": [],
+        }
+
+    def test_tombstones_are_per_user(self, client, auth_headers, second_auth_headers, test_connection):
+        cursor = _sync(client, second_auth_headers)["cursor"]
+        client.delete(f"/connections/{test_connection.id}", headers=auth_headers)
+        data = _sync(client, second_auth_headers, cursor)
+        assert data["deleted"] == {"connections": [], "logs": [], "tags": []}
+
+
+    def test_retired_tags_are_reported_to_every_user(self, client, auth_headers, second_auth_headers):
+        client.post("/connections", json={"name": "A", "tags": ["Seed Scout"]}, headers=auth_headers)
+        mine = _sync(client, auth_headers)
+        theirs = _sync(client, second_auth_headers)
+        retired_id = next(t["id"] for t in mine["tags"] if t["name"] == "Seed Scout")
+        client.post(
+            "/tags/connection/rename", json={"name": "Seed Scout", "new_name": "Scout"}, headers=auth_headers
+        )
+        assert _sync(client, auth_headers, mine["cursor"])["deleted"]["tags"] == [retired_id]
+        assert _sync(client, second_auth_headers, theirs["cursor"])["deleted"]["tags"] == [retired_id]
+
+    def test_initial_sync_skips_earlier_retired_tags(self, client, auth_headers):
+        client.post("/connections", json={"name": "A", "tags": ["Seed Scout"]}, headers=auth_headers)
+        client.post(
+            "/tags/connection/rename", json={"name": "Seed Scout", "new_name": "Scout"}, headers=auth_headers
+        )
+        data = _sync(client, auth_headers)
+        assert data["deleted"]["tags"] == []
+        assert _sync(client, auth_headers, data["cursor"])["deleted"]["tags"] == []
+
+    def test_late_commit_is_delivered_once(self, client, auth_headers, session, test_user, test_connection):
+        cursor = _sync(client, auth_headers)["cursor"]
+        # Stamped before the client synced, committed after
+        synced_to = sync.decode_cursor(cursor)["connections"].at
+        late = Connection(
+            id=str(uuid.uuid4()), user_id=test_user.id, name="Late",
+            updated_at=synced_to - timedelta(seconds=1),
+        )
+        session.add(late)
+        session.commit()
+        data = _sync(client, auth_headers, cursor)
+        assert [c["id"] for c in data["connections"]] == [late.id]
+        again = _sync(client, auth_headers, data["cursor"])
+        assert again["connections"] == []
+        assert again["cursor"] == data["cursor"]
+
+    def test_old_cursor_format_is_accepted(self, client, auth_headers, test_connection):
+        position = sync.decode_cursor(_sync(client, auth_headers)["cursor"])["connections"]
+        cursor = base64.urlsafe_b64encode(
+            orjson.dumps({"connections": [position.at.isoformat(), position.id]})
+        ).decode()
+        assert _sync(client, auth_headers, cursor)["connections"] == []
+
+
+class TestSyncPagination:
+    def test_pages_cover_every_row_once(self, client, auth_headers):
+        ids = {
+            client.post("/connections", json={"name": f"P{i}"}, headers=auth_headers).json()["id"]
+            for i in range(7)
+        }
+        cursor = _sync(client, auth_headers, limit=1000)["cursor"]  # skip the tag catalog
+        for connection_id in ids:
+            client.put(f"/connections/{connection_id}", json={"frequency": 7}, headers=auth_headers)
+        pages = _drain(client, auth_headers, cursor, limit=3)
+        seen = [c["id"] for page in pages for c in page["connections"]]
+        assert len(pages) == 3
+        assert sorted(seen) == sorted(ids)
+
+    def test_invalid_cursor(self, client, auth_headers):
+        response = client.get("/sync?since=not-a-cursor", headers=auth_headers)
+        assert response.status_code == 400
@@ -0,0 +1,133 @@
+"""Tests for tag_catalog.py - the per-process tag catalog cache."""
+
+import time
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import select
+
+from models import TagDefinition
+from serializers import JSON, MSGPACK
+from tag_catalog import TagCatalog
+
+
+def group_names(tags):
+    return sorted(tag.name for tag in tags)
+
+
+@pytest.fixture
+def seeded(session):
+    for name in ["Conference", "LinkedIn"]:
+        session.add(TagDefinition(type="connection", category="howMet", name=name))
+    session.add(TagDefinition(type="interaction", category="interactionType", name="Call"))
+    session.commit()
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+class TestTagCatalog:
+    def test_built_once(self, session, seeded, statements):
+        catalog = TagCatalog(group_names)
+        first = catalog.entry(session, "connection")
+        queries = len(statements)
+        assert catalog.entry(session, "connection") is first
+        assert len(statements) == queries
+        assert first.content == ["Conference", "LinkedIn"]
+        assert first.state == (2, 2)
+
+    def test_bodies_are_encoded_once_per_format(self, session, seeded):
+        entry = TagCatalog(group_names).entry(session, "interaction")
+        assert entry.body(JSON) == b'["Call"]'
+        assert entry.body(JSON) is entry.body(JSON)
+        assert entry.body(MSGPACK) != entry.body(JSON)
+
+    def test_invalidate(self, session, seeded):
+        catalog = TagCatalog(group_names)
+        catalog.entry(session, "connection")
+        session.add(TagDefinition(type="connection", category="custom", name="Seed Scout", is_custom=True))
+        session.commit()
+        assert "Seed Scout" not in catalog.entry(session, "connection").content
+        catalog.invalidate("connection")
+        assert "Seed Scout" in catalog.entry(session, "connection").content
+
+    def test_build_racing_an_invalidation_is_not_kept(self, session, seeded):
+        catalog = TagCatalog(lambda tags: catalog.invalidate() or group_names(tags))
+        first = catalog.entry(session, "connection")
+        assert catalog.entry(session, "connection") is not first
+
+    def test_expires_after_max_age(self, session, seeded):
+        catalog = TagCatalog(group_names, max_age=0.01)
+        first = catalog.entry(session, "connection")
+        time.sleep(0.02)
+        assert catalog.entry(session, "connection") is not first
+
+    def test_broadcast_reaches_other_processes(self, session, seeded):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        here = TagCatalog(group_names, fakeredis.FakeRedis(server=server))
+        there = TagCatalog(group_names, fakeredis.FakeRedis(server=server))
+        there.start_listener()
+        try:
+            stale = there.entry(session, "connection")
+            mine = here.entry(session, "connection")
+            here.invalidate("connection")
+            deadline = time.monotonic() + 2
+            while there._entries.get("connection") is stale and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert there._entries.get("connection") is None
+            # Own broadcasts are not re-applied
+            assert here._entries.get("connection") is None
+            assert mine is not here.entry(session, "connection")
+        finally:
+            there.stop_listener()
+
+
+class TestTagsEndpoint:
+    def test_served_from_catalog(self, client, auth_headers, seeded, statements):
+        client.get("/tags/connection", headers=auth_headers)
+        statements.clear()
+        response = client.get("/tags/connection", headers=auth_headers)
+        assert response.json()["howMet"]["options"] == ["Conference", "LinkedIn"]
+        assert not [s for s in statements if "tagdefinition" in s.lower()]
+
+    def test_etag_shared_across_users(self, client, auth_headers, second_auth_headers, seeded):
+        first = client.get("/tags/connection", headers=auth_headers)
+        second = client.get("/tags/connection", headers=second_auth_headers)
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+
+    def test_new_custom_tag_invalidates(self, client, auth_headers, seeded):
+        etag = client.get("/tags/connection", headers=auth_headers).headers["etag"]
+        client.post("/connections", json={"name": "A", "tags": ["Seed Scout"]}, headers=auth_headers)
+        response = client.get("/tags/connection", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["custom"]["options"] == ["Seed Scout"]
+
+    def test_tag_retired_behind_the_cache_is_added_again(self, client, auth_headers, session, seeded):
+        tag = TagDefinition(type="connection", category="custom", name="Seed Scout", is_custom=True)
+        session.add(tag)
+        session.commit()
+        client.get("/tags/connection", headers=auth_headers)
+        # Retired by another process; this one's catalog still lists it
+        session.delete(tag)
+        session.commit()
+        client.post("/connections", json={"name": "A", "tags": ["Seed Scout"]}, headers=auth_headers)
+        assert session.exec(
+            select(TagDefinition).where(TagDefinition.type == "connection", TagDefinition.name == "Seed Scout")
+        ).first() is not None
+
+    def test_existing_tags_are_checked_in_one_query(self, client, auth_headers, session, seeded, statements):
+        client.post("/connections", json={"name": "A", "tags": ["Conference", "LinkedIn"]}, headers=auth_headers)
+        statements.clear()
+        client.post("/connections", json={"name": "B", "tags": ["Conference", "LinkedIn"]}, headers=auth_headers)
+        assert len([s for s in statements if "tagdefinition" in s.lower()]) == 1
@@ -0,0 +1,213 @@
+"""Tests for POST /tags/{type}/merge and /rename and the set-based rewrite behind them."""
+
+import json
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+import main
+import queries
+import tag_merge
+import writes
+from models import Connection, TagDefinition, UserTagUsage
+
+
+def create(client, headers, *tags, name="P"):
+    response = client.post("/connections", json={"name": name, "tags": list(tags)}, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def tags_of(client, headers, connection_id):
+    return client.get(f"/connections/{connection_id}", headers=headers).json()["tags"]
+
+
+def catalog_names(session, tag_type="connection"):
+    return set(session.exec(select(TagDefinition.name).where(TagDefinition.type == tag_type)).all())
+
+
+class TestMergeEndpoint:
+    def test_merge_keeps_order_and_collapses_duplicates(self, client, auth_headers):
+        a = create(client, auth_headers, "VC", "Friend", "Investor", "Angel")
+        b = create(client, auth_headers, "Friend", "Angel")
+        untouched = create(client, auth_headers, "Friend")
+        response = client.post(
+            "/tags/connection/merge",
+            json={"sources": ["VC", "Angel"], "target": "Investor"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["updated"] == 2
+        assert tags_of(client, auth_headers, a) == ["Investor", "Friend"]
+        assert tags_of(client, auth_headers, b) == ["Friend", "Investor"]
+        assert tags_of(client, auth_headers, untouched) == ["Friend"]
+
+    def test_rename_non_ascii(self, client, auth_headers):
+        a = create(client, auth_headers, "Café Crowd", "Zürich")
+        response = client.post(
+            "/tags/connection/rename", json={"name": "Zürich", "new_name": "Zürich HQ"}, headers=auth_headers
+        )
+        assert response.json()["updated"] == 1
+        assert tags_of(client, auth_headers, a) == ["Café Crowd", "Zürich HQ"]
+
+    def test_other_users_untouched(self, client, auth_headers, second_auth_headers, session):
+        mine = create(client, auth_headers, "Seed Scout")
+        theirs = create(client, second_auth_headers, "Seed Scout")
+        response = client.post(
+            "/tags/connection/rename", json={"name": "Seed Scout", "new_name": "Scout"}, headers=auth_headers
+        )
+        assert response.json() == {"updated": 1, "retired": []}
+        assert tags_of(client, auth_headers, mine) == ["Scout"]
+        assert tags_of(client, second_auth_headers, theirs) == ["Seed Scout"]
+        # Still used by the other user
+        assert "Seed Scout" in catalog_names(session)
+
+    def test_sources_match_case_sensitively(self, client, auth_headers, session):
+        a = create(client, auth_headers, "Investor")
+        before = client.get("/connections", headers=auth_headers).headers["etag"]
+        response = client.post(
+            "/tags/connection/merge", json={"sources": ["investor"], "target": "VC"}, headers=auth_headers
+        )
+        assert response.json() == {"updated": 0, "retired": []}
+        assert tags_of(client, auth_headers, a) == ["Investor"]
+        assert "VC" not in catalog_names(session)
+        assert client.get("/connections", headers=auth_headers).headers["etag"] == before
+
+    def test_retires_unused_custom_tags_only(self, client, auth_headers, session):
+        session.add(TagDefinition(category="relationshipType", name="Mentor", type="connection"))
+        session.commit()
+        create(client, auth_headers, "Seed Scout", "Mentor")
+        response = client.post(
+            "/tags/connection/merge",
+            json={"sources": ["Seed Scout", "Mentor"], "target": "Seed Lead"},
+            headers=auth_headers,
+        )
+        assert response.json()["retired"] == ["Seed Scout"]
+        names = catalog_names(session)
+        assert "Seed Scout" not in names
+        # Standard tags stay in the catalog; the target is added as a custom tag
+        assert {"Mentor", "Seed Lead"} <= names
+
+    def test_catalog_etag_changes(self, client, auth_headers):
+        create(client, auth_headers, "Seed Scout")
+        before = client.get("/tags/connection", headers=auth_headers)
+        client.post(
+            "/tags/connection/rename", json={"name": "Seed Scout", "new_name": "Scout"}, headers=auth_headers
+        )
+        after = client.get("/tags/connection", headers=auth_headers)
+        assert after.headers["etag"] != before.headers["etag"]
+        options = [tag for category in after.json().values() for tag in category["options"]]
+        assert "Scout" in options and "Seed Scout" not in options
+
+    def test_moves_usage_counts(self, client, auth_headers, session, test_user):
+        create(client, auth_headers, "Seed Scout")
+        create(client, auth_headers, "Seed Scout", "Scout")
+        user_id = test_user.id
+        client.post(
+            "/tags/connection/rename", json={"name": "Seed Scout", "new_name": "Scout"}, headers=auth_headers
+        )
+        counts = dict(
+            session.exec(
+                select(UserTagUsage.name, UserTagUsage.count).where(UserTagUsage.user_id == user_id)
+            ).all()
+        )
+        # The second row carried both, so it counts once
+        assert counts == {"Scout": 2}
+
+    def test_bumps_data_version(self, client, auth_headers):
+        create(client, auth_headers, "Seed Scout")
+        before = client.get("/connections", headers=auth_headers).headers["etag"]
+        client.post(
+            "/tags/connection/rename", json={"name": "Seed Scout", "new_name": "Scout"}, headers=auth_headers
+        )
+        assert client.get("/connections", headers=auth_headers).headers["etag"] != before
+
+    def test_logs(self, client, auth_headers):
+        client.post("/logs", json={"notes": "n", "tags": ["Coffee", "Call"]}, headers=auth_headers)
+        response = client.post(
+            "/tags/interaction/merge", json={"sources": ["Call"], "target": "Coffee"}, headers=auth_headers
+        )
+        assert response.json()["updated"] == 1
+        assert client.get("/logs", headers=auth_headers).json()["items"][0]["tags"] == ["Coffee"]
+
+    def test_validation(self, client, auth_headers):
+        assert client.post(
+            "/tags/other/rename", json={"name": "A", "new_name": "B"}, headers=auth_headers
+        ).status_code == 400
+        assert client.post(
+            "/tags/connection/rename", json={"name": "A", "new_name": "A"}, headers=auth_headers
+        ).status_code == 400
+        assert client.post(
+            "/tags/connection/merge", json={"sources": [], "target": "A"}, headers=auth_headers
+        ).status_code == 422
+
+    def test_large_accounts_go_to_worker(self, client, auth_headers, monkeypatch):
+        calls = []
+
+        class FakeTask:
+            id = "task-1"
+
+        class FakeMergeTask:
+            def delay(self, *args):
+                calls.append(args)
+                return FakeTask()
+
+        monkeypatch.setattr(tag_merge, "TAG_REWRITE_INLINE_LIMIT", 1)
+        monkeypatch.setattr(main, "merge_tags_task", FakeMergeTask())
+        a = create(client, auth_headers, "Seed Scout")
+        create(client, auth_headers, "Seed Scout")
+        response = client.post(
+            "/tags/connection/rename", json={"name": "Seed Scout", "new_name": "Scout"}, headers=auth_headers
+        )
+        assert response.status_code == 202
+        assert response.json() == {"task_id": "task-1"}
+        assert calls[0][1:] == ("connection", ["Seed Scout"], "Scout")
+        assert tags_of(client, auth_headers, a) == ["Seed Scout"]
+
+
+class TestMergeTags:
+    def test_batches_commit_separately(self, session, test_user, monkeypatch):
+        for i in range(5):
+            session.add(Connection(id=str(uuid.uuid4()), user_id=test_user.id, name=f"P{i}", tags_json=json.dumps(["Old", "Keep"])))
+        session.commit()
+        batches = []
+        original = writes.rewrite_tags
+
+        def counting_rewrite(session, model, ids, sources, target):
+            batches.append(len(ids))
+            return original(session, model, ids, sources, target)
+
+        monkeypatch.setattr(writes, "rewrite_tags", counting_rewrite)
+        result = tag_merge.merge_tags(session, test_user.id, "connection", ["Old"], "New", batch_size=2)
+        assert result["updated"] == 5
+        assert batches == [2, 2, 1]
+        rows = session.connection().execute(text("SELECT DISTINCT tags_json FROM connection")).scalars().all()
+        assert [json.loads(row) for row in rows] == [["New", "Keep"]]
+
+    def test_catalog_callback(self, session, test_user):
+        session.add(Connection(id=str(uuid.uuid4()), user_id=test_user.id, name="P", tags_json=json.dumps(["Mentor"])))
+        session.commit()
+        changed = []
+        tag_merge.merge_tags(session, test_user.id, "connection", ["Mentor"], "Advisor", changed.append)
+        assert changed == ["connection"]
+        # Target already in the catalog, Advisor retired
+        result = tag_merge.merge_tags(session, test_user.id, "connection", ["Advisor"], "Mentor", changed.append)
+        assert result == {"updated": 1, "retired": ["Advisor"]}
+        assert changed == ["connection", "connection"]
+
+    def test_postgres_tag_match_compiles(self):
+        compiled = str(
+            queries.tags_json_contains(Connection.tags_json, "VC").compile(dialect=postgresql.dialect())
+        )
+        assert compiled.startswith("(CAST(connection.tags_json AS jsonb) @> jsonb_build_array(")
+
+    def test_postgres_rewrite_compiles(self):
+        sql = writes._REWRITE_TAGS_SQL["postgresql"].format(table="connection")
+        statement = text(sql).bindparams(
+            writes.bindparam("sources", expanding=True), writes.bindparam("ids", expanding=True)
+        )
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        assert "json_array_elements_text(connection.tags_json::json)" in compiled
+        assert "WITH ORDINALITY" in compiled
@@ -0,0 +1,133 @@
+"""Tests for GET /tags/{type}/suggest and the tag usage counters behind it."""
+
+from sqlmodel import select
+
+from models import TagUsage, UserTagUsage
+from queries import suggest_tags
+import writes
+
+
+def names(response):
+    return [(item["name"], item["source"]) for item in response.json()["items"]]
+
+
+class TestSuggestEndpoint:
+    def _connection(self, client, headers, *tags):
+        response = client.post("/connections", json={"name": "P", "tags": list(tags)}, headers=headers)
+        assert response.status_code == 201
+        return response.json()
+
+    def test_ranks_by_usage(self, client, auth_headers):
+        self._connection(client, auth_headers, "Investor", "Intro")
+        self._connection(client, auth_headers, "Investor")
+        self._connection(client, auth_headers, "Investor", "Intro", "Ideas")
+        response = client.get("/tags/connection/suggest?prefix=in", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["items"] == [
+            {"name": "Investor", "count": 3, "source": "user"},
+            {"name": "Intro", "count": 2, "source": "user"},
+        ]
+
+    def test_resaving_counts_only_added_tags(self, client, auth_headers):
+        connection = self._connection(client, auth_headers, "Investor")
+        for _ in range(3):
+            client.put(
+                f"/connections/{connection['id']}", json={"tags": ["Investor"]}, headers=auth_headers
+            )
+        client.put(
+            f"/connections/{connection['id']}", json={"tags": ["Investor", "Intro"]}, headers=auth_headers
+        )
+        response = client.get("/tags/connection/suggest?prefix=in", headers=auth_headers)
+        assert [(item["name"], item["count"]) for item in response.json()["items"]] == [
+            ("Intro", 1), ("Investor", 1),
+        ]
+
+    def test_bulk_update_counts_rows_the_tag_was_added_to(self, client, auth_headers):
+        self._connection(client, auth_headers, "Investor")
+        self._connection(client, auth_headers)
+        self._connection(client, auth_headers)
+        client.patch(
+            "/connections", json={"filter": {}, "update": {"tags": ["Investor", "Angel"]}}, headers=auth_headers
+        )
+        response = client.get("/tags/connection/suggest", headers=auth_headers)
+        assert [(item["name"], item["count"]) for item in response.json()["items"]] == [
+            ("Angel", 3), ("Investor", 3),
+        ]
+
+    def test_user_tags_then_global(self, client, auth_headers, second_auth_headers):
+        for _ in range(3):
+            self._connection(client, second_auth_headers, "Founder")
+        self._connection(client, second_auth_headers, "Fintech")
+        self._connection(client, auth_headers, "Fintech")
+        response = client.get("/tags/connection/suggest?prefix=F", headers=auth_headers)
+        assert names(response) == [("Fintech", "user"), ("Founder", "global")]
+        # The user's own entry is not repeated from the global list
+        assert len(response.json()["items"]) == 2
+
+    def test_limit_and_empty_prefix(self, client, auth_headers):
+        self._connection(client, auth_headers, "A", "B", "C")
+        self._connection(client, auth_headers, "B", "C")
+        self._connection(client, auth_headers, "C")
+        response = client.get("/tags/connection/suggest?limit=2", headers=auth_headers)
+        assert names(response) == [("C", "user"), ("B", "user")]
+
+    def test_counts_updates_bulk_and_logs(self, client, auth_headers):
+        a = self._connection(client, auth_headers)
+        b = self._connection(client, auth_headers)
+        client.put(f"/connections/{a['id']}", json={"tags": ["Quarterly"]}, headers=auth_headers)
+        client.patch(
+            "/connections", json={"ids": [a["id"], b["id"]], "update": {"tags": ["Quarterly"]}},
+            headers=auth_headers,
+        )
+        client.post("/logs", json={"notes": "n", "tags": ["Quick Call"]}, headers=auth_headers)
+        # a already had the tag when the bulk update ran, so only b counts there
+        assert client.get(
+            "/tags/connection/suggest?prefix=q", headers=auth_headers
+        ).json()["items"] == [{"name": "Quarterly", "count": 2, "source": "user"}]
+        assert names(client.get("/tags/interaction/suggest?prefix=Q", headers=auth_headers)) == [
+            ("Quick Call", "user")
+        ]
+
+    def test_invalid_type(self, client, auth_headers):
+        assert client.get("/tags/other/suggest", headers=auth_headers).status_code == 400
+
+    def test_deleting_account_removes_user_counts(self, client, auth_headers, session, test_user):
+        self._connection(client, auth_headers, "Investor")
+        user_id = test_user.id
+        client.delete("/users/me", headers=auth_headers)
+        assert session.exec(select(UserTagUsage).where(UserTagUsage.user_id == user_id)).all() == []
+        assert session.exec(select(TagUsage)).one().count == 1
+
+
+class TestSuggestQueries:
+    def test_prefix_range_handles_unicode(self, session, test_user):
+        writes.record_tag_usage(session, test_user.id, "connection", ["Café", "Cafe", "Cab", "Cäsar", "Ca😀"])
+        found = {item["name"] for item in suggest_tags(session, test_user.id, "connection", "caf", 10)}
+        assert found == {"Café", "Cafe"}
+        found = {item["name"] for item in suggest_tags(session, test_user.id, "connection", "CA", 10)}
+        assert found == {"Café", "Cafe", "Cab", "Ca😀"}
+
+    def test_duplicate_tags_count_once(self, session, test_user):
+        writes.record_tag_usage(session, test_user.id, "connection", ["X", "X"], times=4)
+        assert [item["count"] for item in suggest_tags(session, test_user.id, "connection", "x")] == [4]
+
+    def test_uses_prefix_index(self, session, test_user):
+        from queries import _prefix_range
+
+        for model, filters, index in (
+            (UserTagUsage, [UserTagUsage.user_id == test_user.id, UserTagUsage.type == "connection"],
+             "ix_usertagusage_prefix"),
+            (TagUsage, [TagUsage.type == "connection"], "ix_tagusage_prefix"),
+        ):
+            statement = (
+                select(model.name, model.count)
+                .where(*filters, *_prefix_range(model.name_key, "inv"))
+                .order_by(model.count.desc())
+                .limit(10)
+            )
+            compiled = statement.compile(
+                dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+            )
+            plan = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+            details = " ".join(row[-1] for row in plan)
+            assert f"COVERING INDEX {index}" in details
@@ -0,0 +1,135 @@
+"""Tests for GET /tasks/{id}/events and the task status events behind it."""
+
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import main
+import task_events
+import worker
+from enrichment_cache import enrichment_cache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def events(body: str):
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = fakeredis.FakeServer()
+    publisher = fakeredis.FakeRedis(server=server)
+    monkeypatch.setattr(task_events, "publisher", publisher)
+    monkeypatch.setattr(task_events, "subscriber", fakeredis.FakeAsyncRedis(server=server))
+    return publisher
+
+
+def publish_when_subscribed(publisher, task_id, event):
+    def run():
+        channel = task_events.TASK_EVENTS_PREFIX + task_id
+        for _ in range(200):
+            if publisher.pubsub_numsub(channel)[0][1]:
+                break
+            time.sleep(0.01)
+        task_events.publish(task_id, event)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+class TestTaskEventsEndpoint:
+    @patch("main.AsyncResult")
+    def test_pushes_changes_until_done(self, mock_async_result, client, auth_headers, fake_server):
+        mock_async_result.return_value = MagicMock(state="PENDING")
+        thread = publish_when_subscribed(fake_server, "task-1", {"status": "Success", "data": {"name": "A"}})
+        response = client.get("/tasks/task-1/events", headers=auth_headers)
+        thread.join()
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert events(response.text) == [
+            {"status": "Pending"},
+            {"status": "Success", "data": {"name": "A"}},
+        ]
+
+    @patch("main.AsyncResult")
+    def test_finished_task_ends_immediately(self, mock_async_result, client, auth_headers, fake_server):
+        mock_async_result.return_value = MagicMock(state="FAILURE", result=RuntimeError("blocked"))
+        response = client.get("/tasks/task-2/events", headers=auth_headers)
+        assert events(response.text) == [{"status": "Failure", "error": "blocked"}]
+
+    def test_cached_task(self, client, auth_headers, fake_server, monkeypatch):
+        monkeypatch.setattr(enrichment_cache, "redis", fakeredis.FakeRedis())
+        enrichment_cache.set("https://www.linkedin.com/in/a", {"name": "A"})
+        task_id = enrichment_cache.cached_task_id("https://www.linkedin.com/in/a")
+        response = client.get(f"/tasks/{task_id}/events", headers=auth_headers)
+        assert events(response.text) == [{"status": "Success", "data": {"name": "A"}}]
+
+    def test_polls_without_redis(self, client, auth_headers, monkeypatch):
+        statuses = iter([{"status": "Pending"}, {"status": "Pending"}, {"status": "STARTED"}, {"status": "Success"}])
+        monkeypatch.setattr(main, "_task_status", lambda task_id: next(statuses))
+        monkeypatch.setattr(task_events, "TASK_EVENTS_POLL_SECONDS", 0.01)
+        response = client.get("/tasks/task-3/events", headers=auth_headers)
+        # Unchanged statuses are not repeated
+        assert events(response.text) == [{"status": "Pending"}, {"status": "STARTED"}, {"status": "Success"}]
+
+    def test_requires_auth(self, client):
+        assert client.get("/tasks/task-1/events").status_code in (401, 403)
+
+
+class TestStream:
+    def test_ends_after_max_age(self, fake_server):
+        async def collect():
+            return [
+                chunk async for chunk in task_events.stream("task-4", lambda: {"status": "Pending"}, max_age=0.05)
+            ]
+        chunks = asyncio.run(collect())
+        assert events(b"".join(chunks).decode()) == [{"status": "Pending"}]
+
+    def test_polls_once_the_subscription_drops(self, fake_server, monkeypatch):
+        monkeypatch.setattr(task_events, "TASK_EVENTS_POLL_SECONDS", 0.01)
+        statuses = iter([{"status": "Pending"}, {"status": "Success", "data": {"name": "A"}}])
+
+        async def collect():
+            real_pubsub = task_events.subscriber.pubsub
+
+            def pubsub(**kwargs):
+                subscription = real_pubsub(**kwargs)
+                subscription.get_message = MagicMock(side_effect=task_events.redis.ConnectionError("gone"))
+                return subscription
+
+            monkeypatch.setattr(task_events.subscriber, "pubsub", pubsub)
+            return [chunk async for chunk in task_events.stream("task-6", lambda: next(statuses))]
+        chunks = asyncio.run(collect())
+        assert events(b"".join(chunks).decode()) == [
+            {"status": "Pending"},
+            {"status": "Success", "data": {"name": "A"}},
+        ]
+
+
+class TestWorkerPublishes:
+    def test_signals(self, fake_server):
+        pubsub = fake_server.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(task_events.TASK_EVENTS_PREFIX + "task-5")
+        worker.publish_task_started(task_id="task-5")
+        sender = MagicMock()
+        sender.request.id = "task-5"
+        worker.publish_task_success(sender=sender, result={"name": "A"})
+        worker.publish_task_failure(task_id="task-5", exception=ValueError("boom"))
+        received = []
+        for _ in range(10):
+            message = pubsub.get_message(timeout=0.1)
+            if message:
+                received.append(json.loads(message["data"]))
+        assert received == [
+            {"status": "STARTED"},
+            {"status": "Success", "data": {"name": "A"}},
+            {"status": "Failure", "error": "boom"},
+        ]
@@ -16,10 +16,10 @@ def _make_response(status_code, text):
 
 
 class TestEnrichLinkedinTask:
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_parses_json_ld_person_data(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
 
         json_ld = json.dumps({
             "@graph": [
@@ -46,10 +46,10 @@ class TestEnrichLinkedinTask:
         assert result["company"] == "Acme Corp"
         assert result["location"] == "San Francisco"
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_fallback_to_og_title(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
 
         html = """
         <html>
@@ -66,10 +66,10 @@ class TestEnrichLinkedinTask:
         assert result["role"] == "CTO"
         assert result["company"] == "TechCo"
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_fallback_to_url_slug(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
 
         html = """
         <html>
@@ -82,20 +82,20 @@ class TestEnrichLinkedinTask:
         result = enrich_linkedin_task("https://linkedin.com/in/bob-jones")
         assert result["name"] == "Bob Jones"
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_handles_non_200_response(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
         mock_get.return_value = _make_response(403, "Forbidden")
 
         result = enrich_linkedin_task("https://linkedin.com/in/blocked")
         assert "error" in result
         assert "403" in result["error"]
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_handles_request_exception(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
         mock_get.side_effect = Exception("Connection timeout")
 
         result = enrich_linkedin_task("https://linkedin.com/in/timeout-user")
@@ -104,10 +104,10 @@ class TestEnrichLinkedinTask:
         assert result["role"] == ""
         assert result["company"] == ""
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_filters_obfuscated_job_titles(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
 
         json_ld = json.dumps({
             "@graph": [
@@ -130,11 +130,11 @@ class TestEnrichLinkedinTask:
         result = enrich_linkedin_task("https://linkedin.com/in/alice")
         assert result["role"] == "Software Engineer"
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_og_title_without_role(self, mock_ua, mock_get):
         """og:title with just a company name (short, capitalized)."""
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
 
         html = """
         <html>
@@ -149,10 +149,10 @@ class TestEnrichLinkedinTask:
         result = enrich_linkedin_task("https://linkedin.com/in/samlee")
         assert result["name"] == "Sam Lee"
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_json_ld_with_location_fallback_from_worksFor(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
 
         json_ld = json.dumps({
             "@graph": [
@@ -176,10 +176,10 @@ class TestEnrichLinkedinTask:
         result = enrich_linkedin_task("https://linkedin.com/in/tom")
         assert result["location"] == "Boston"
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_result_always_has_required_keys(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "TestAgent/1.0"
+        mock_ua.return_value = "TestAgent/1.0"
         mock_get.return_value = _make_response(200, "<html></html>")
 
         result = enrich_linkedin_task("https://linkedin.com/in/empty-page")
@@ -189,13 +189,81 @@ class TestEnrichLinkedinTask:
         assert "location" in result
         assert "industry" in result
 
-    @patch("worker.requests.get")
-    @patch("worker.UserAgent")
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
     def test_uses_random_user_agent(self, mock_ua, mock_get):
-        mock_ua.return_value.random = "CustomAgent/2.0"
+        mock_ua.return_value = "CustomAgent/2.0"
         mock_get.return_value = _make_response(200, "<html></html>")
 
         enrich_linkedin_task("https://linkedin.com/in/test")
         mock_get.assert_called_once()
         call_args = mock_get.call_args
         assert call_args[1]["headers"]["User-Agent"] == "CustomAgent/2.0"
+
+
+class TestInflightClaim:
+    @pytest.fixture
+    def fake_redis(self, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        from enrichment_cache import enrichment_cache
+        monkeypatch.setattr(enrichment_cache, "redis", fakeredis.FakeRedis())
+        return enrichment_cache
+
+    @patch("requests.Session.get")
+    def test_released_on_cache_hit(self, mock_get, fake_redis):
+        url = "https://www.linkedin.com/in/jane"
+        fake_redis.set(url, {"name": "Jane"})
+        fake_redis.claim(url, "t1")
+        result = enrich_linkedin_task.apply(args=(url,), task_id="t1").get()
+        assert result == {"name": "Jane"}
+        mock_get.assert_not_called()
+        assert fake_redis.claim(url, "t2") is None
+
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
+    def test_released_after_fetch(self, mock_ua, mock_get, fake_redis):
+        url = "https://www.linkedin.com/in/jane"
+        mock_ua.return_value = "TestAgent/1.0"
+        mock_get.return_value = _make_response(999, "")
+        fake_redis.claim(url, "t1")
+        enrich_linkedin_task.apply(args=(url,), task_id="t1").get()
+        assert fake_redis.claim(url, "t2") is None
+
+
+class TestApplyToConnection:
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
+    def test_fills_connection(self, mock_ua, mock_get, engine, session, test_user, monkeypatch):
+        import database
+        import writes
+        from sqlalchemy import select
+        from models import Connection, User
+
+        monkeypatch.setattr(database, "engine", engine)
+        mock_ua.return_value = "TestAgent/1.0"
+        mock_get.return_value = _make_response(
+            200, '<meta property="og:title" content="Jane Smith - CTO at TechCo | LinkedIn">'
+        )
+        row = writes.insert_connection(session, test_user.id, {"name": "Jane", "frequency": 30})
+        session.commit()
+
+        result = enrich_linkedin_task(
+            "https://www.linkedin.com/in/jane", user_id=test_user.id, connection_id=row.id
+        )
+        assert result["company"] == "TechCo"
+        stored = session.connection().execute(
+            select(Connection.name, Connection.role, Connection.company).where(Connection.id == row.id)
+        ).one()
+        assert tuple(stored) == ("Jane", "CTO", "TechCo")
+        assert session.connection().execute(
+            select(User.data_version).where(User.id == test_user.id)
+        ).scalar_one() == 1
+
+    @patch("requests.Session.get")
+    @patch("http_client.user_agent")
+    @patch("worker.apply_enrichment")
+    def test_errors_are_not_applied(self, mock_apply, mock_ua, mock_get):
+        mock_ua.return_value = "TestAgent/1.0"
+        mock_get.return_value = _make_response(999, "")
+        enrich_linkedin_task("https://www.linkedin.com/in/jane", user_id="u", connection_id="c")
+        mock_apply.assert_not_called()
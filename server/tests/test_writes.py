@@ -0,0 +1,156 @@
+"""Unit tests for writes.py - single-statement INSERT/UPDATE ... RETURNING writes."""
+
+import datetime
+from contextlib import contextmanager
+
+from sqlalchemy import event, select
+
+from models import Connection, User, compute_next_due
+import writes
+
+
+@contextmanager
+def count_statements(session):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def stored_next_due(session, connection_id):
+    return session.connection().execute(
+        select(Connection.next_due).where(Connection.id == connection_id)
+    ).scalar_one()
+
+
+class TestInsertConnection:
+    def test_one_statement_returns_row(self, session, test_user):
+        user_id = test_user.id
+        with count_statements(session) as statements:
+            row = writes.insert_connection(session, user_id, {"name": "Ada", "frequency": 30, "tags": ["x"]})
+        assert len(statements) == 1
+        assert "RETURNING" in statements[0]
+        assert row.name == "Ada"
+        assert row.tags_json == '["x"]'
+        assert stored_next_due(session, row.id) == row.created_at + datetime.timedelta(days=30)
+
+
+class TestUpdateConnection:
+    def test_one_statement(self, session, test_user, test_connection):
+        user_id, connection_id = test_user.id, test_connection.id
+        with count_statements(session) as statements:
+            row = writes.update_connection(session, user_id, connection_id, {"company": "Initech"})
+        assert len(statements) == 1
+        assert row.company == "Initech"
+        assert row.name == "Jane Doe"
+
+    def test_other_users_row_is_untouched(self, session, second_user, test_connection):
+        assert writes.update_connection(session, second_user.id, test_connection.id, {"name": "X"}) is None
+
+    def test_next_due_matches_python(self, session, test_user, test_connection):
+        contacted = datetime.datetime(2024, 5, 1, 9, 30, 15, 123456)
+        writes.update_connection(session, test_user.id, test_connection.id, {"lastContact": contacted})
+        assert stored_next_due(session, test_connection.id) == compute_next_due(contacted, 30, None)
+
+        row = writes.update_connection(session, test_user.id, test_connection.id, {"frequency": 7})
+        assert stored_next_due(session, test_connection.id) == contacted + datetime.timedelta(days=7)
+
+        writes.update_connection(session, test_user.id, test_connection.id, {"lastContact": None})
+        assert stored_next_due(session, test_connection.id) == row.created_at + datetime.timedelta(days=7)
+
+    def test_returns_previous_tags(self, session, test_user, test_connection):
+        row = writes.update_connection(session, test_user.id, test_connection.id, {"tags": ["work", "go"]})
+        assert row.tags_json == '["work", "go"]'
+        assert row.previous_tags == ["work", "python"]
+        count, previous = writes.update_connections(session, test_user.id, [test_connection.id], {"tags": ["x"]})
+        assert (count, previous) == (1, [["work", "go"]])
+
+    def test_previous_tags_of_other_users_row(self, session, second_user, test_connection):
+        assert writes.update_connection(session, second_user.id, test_connection.id, {"tags": ["x"]}) is None
+        assert writes.update_connections(session, second_user.id, [test_connection.id], {"tags": ["x"]}) == (0, [])
+
+    def test_timezone_aware_last_contact(self, session, test_user, test_connection):
+        contacted = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+        writes.update_connection(session, test_user.id, test_connection.id, {"lastContact": contacted})
+        assert stored_next_due(session, test_connection.id) == datetime.datetime(2024, 5, 31)
+
+
+class TestTouchLastContact:
+    def test_moves_forward(self, session, test_user, test_connection):
+        later = datetime.datetime(2024, 2, 1)
+        assert writes.touch_last_contact(session, test_user.id, test_connection.id, later)
+        row = session.connection().execute(
+            select(Connection.lastContact, Connection.next_due).where(Connection.id == test_connection.id)
+        ).one()
+        assert row == (later, later + datetime.timedelta(days=30))
+
+    def test_never_moves_back(self, session, test_user, test_connection):
+        assert writes.touch_last_contact(session, test_user.id, test_connection.id, datetime.datetime(2023, 1, 1))
+        last_contact = session.connection().execute(
+            select(Connection.lastContact).where(Connection.id == test_connection.id)
+        ).scalar_one()
+        assert last_contact == datetime.datetime(2024, 1, 15)
+
+    def test_not_owner(self, session, second_user, test_connection):
+        assert not writes.touch_last_contact(
+            session, second_user.id, test_connection.id, datetime.datetime(2025, 1, 1)
+        )
+
+
+class TestApplyEnrichment:
+    PROFILE = {"name": "Ada L", "role": "CTO", "company": "Initech", "location": "London", "industry": ""}
+
+    def test_fills_only_empty_fields(self, session, test_user):
+        user_id = test_user.id
+        row = writes.insert_connection(session, user_id, {"name": "Ada", "company": "", "frequency": 30})
+        with count_statements(session) as statements:
+            assert writes.apply_enrichment(session, user_id, row.id, self.PROFILE)
+        assert len(statements) == 1
+        stored = session.connection().execute(
+            select(Connection.name, Connection.role, Connection.company, Connection.location,
+                   Connection.industry, Connection.updated_at).where(Connection.id == row.id)
+        ).one()
+        assert stored[:5] == ("Ada", "CTO", "Initech", "London", None)
+        assert stored.updated_at > row.updated_at
+
+    def test_no_write_when_nothing_to_fill(self, session, test_user, test_connection):
+        user_id, connection_id = test_user.id, test_connection.id
+        assert not writes.apply_enrichment(session, user_id, connection_id, self.PROFILE)
+        assert not writes.apply_enrichment(session, user_id, connection_id, {"error": "blocked"})
+        assert session.connection().execute(
+            select(Connection.role).where(Connection.id == connection_id)
+        ).scalar_one() == "Engineer"
+
+    def test_other_users_row_is_untouched(self, session, second_user, test_user):
+        row = writes.insert_connection(session, test_user.id, {"name": "Ada", "frequency": 30})
+        assert not writes.apply_enrichment(session, second_user.id, row.id, self.PROFILE)
+
+    def test_values_are_validated(self, session, test_user):
+        row = writes.insert_connection(session, test_user.id, {"name": "Ada", "frequency": 30})
+        profile = {"role": {"@type": "Role"}, "company": ["Initech"], "location": "x" * 501, "industry": " Tech "}
+        assert writes.apply_enrichment(session, test_user.id, row.id, profile)
+        stored = session.connection().execute(
+            select(Connection.role, Connection.company, Connection.location, Connection.industry)
+            .where(Connection.id == row.id)
+        ).one()
+        assert tuple(stored) == (None, None, None, "Tech")
+
+
+class TestUpdateUser:
+    def test_bumps_data_version_in_same_statement(self, session, test_user):
+        user_id = test_user.id
+        with count_statements(session) as statements:
+            updated = writes.update_user(session, user_id, {"name": "Renamed"})
+        assert len(statements) == 1
+        assert updated["name"] == "Renamed"
+        version = session.connection().execute(
+            select(User.data_version).where(User.id == test_user.id)
+        ).scalar_one()
+        assert version == 1
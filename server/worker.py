@@ -1,112 +1,142 @@
 from celery import Celery
+from celery.signals import task_failure, task_prerun, task_success, worker_process_init
 import os
-import re
-import json
-import requests
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
+
+from enrichment_cache import enrichment_cache
+import http_client
+from profile_parser import parse_profile, slug_profile
+from snapshot_store import snapshot_store
+import async_fetch
+import task_events
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
 celery_app = Celery("worker", broker=REDIS_URL, backend=REDIS_URL)
 
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    # Once per pool process, after the fork: keep-alive session and user agents
+    http_client.init()
+
+
+# Status changes for GET /tasks/{id}/events, in the GET /tasks/{id} shape
+
+@task_prerun.connect
+def publish_task_started(task_id=None, **kwargs):
+    task_events.publish(task_id, {"status": "STARTED"})
+
+
+@task_success.connect
+def publish_task_success(sender=None, result=None, **kwargs):
+    task_events.publish(sender.request.id, {"status": "Success", "data": result})
+
+
+@task_failure.connect
+def publish_task_failure(task_id=None, exception=None, **kwargs):
+    task_events.publish(task_id, {"status": "Failure", "error": str(exception)})
+
+
 @celery_app.task
-def enrich_linkedin_task(url: str):
-    ua = UserAgent()
-    headers = {'User-Agent': ua.random}
+def enrich_linkedin_task(url: str, user_id=None, connection_id=None):
+    """
+    url is normalized by /enrich. A result cached since the task was queued
+    is returned without fetching; the in-flight claim is always released.
+    With connection_id, the result is also written into that connection.
+    """
+    try:
+        result = enrichment_cache.get(url)
+        if result is None:
+            result = _scrape_profile(url)
+    finally:
+        enrichment_cache.release(url, enrich_linkedin_task.request.id)
+    if connection_id and "error" not in result:
+        apply_enrichment(user_id, connection_id, result)
+    return result
+
+
+def apply_enrichment(user_id, connection_id: str, profile: dict) -> bool:
+    """Fill the connection's empty fields from profile; bumps data_version on a write."""
+    from sqlmodel import Session
+    from database import engine
+    import writes
+
+    with Session(engine) as session:
+        applied = writes.apply_enrichment(session, user_id, connection_id, profile)
+        if applied:
+            writes.bump_data_version(session, user_id)
+            session.commit()
+        return applied
+
+
+def _scrape_profile(url: str):
+    headers = {'User-Agent': http_client.user_agent()}
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get_session().get(url, headers=headers, timeout=http_client.ENRICH_HTTP_TIMEOUT)
         if response.status_code != 200:
             return {"error": f"Failed to fetch profile: {response.status_code}"}
             
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        name = "Unknown"
-        role = ""
-        company = ""
-        location = ""
-        
-        # Try to parse JSON-LD structured data (schema.org)
-        json_ld_scripts = soup.find_all("script", type="application/ld+json")
-        for script in json_ld_scripts:
-            try:
-                data = json.loads(script.string)
-                graph = data.get("@graph", [data])
-                
-                for item in graph:
-                    if item.get("@type") == "Person":
-                        # Name
-                        name = item.get("name", name)
-                        
-                        # Location from address
-                        address = item.get("address", {})
-                        if isinstance(address, dict):
-                            location = address.get("addressLocality", "")
-                        
-                        # Current job from worksFor (first entry is usually current)
-                        works_for = item.get("worksFor", [])
-                        if works_for and len(works_for) > 0:
-                            current_job = works_for[0]
-                            company = current_job.get("name", "")
-                            job_location = current_job.get("location", "")
-                            if job_location and not location:
-                                location = job_location
-                        
-                        # Job titles (first is usually current)
-                        job_titles = item.get("jobTitle", [])
-                        if job_titles and len(job_titles) > 0:
-                            # Filter out obfuscated titles (contain ***)
-                            for title in job_titles:
-                                if "***" not in title:
-                                    role = title
-                                    break
-                        
-                        break  # Found Person, done
-            except (json.JSONDecodeError, TypeError):
-                continue
-        
-        # Fallback to og:title if JSON-LD parsing failed
-        if name == "Unknown":
-            og_title = soup.find("meta", property="og:title")
-            if og_title:
-                content = og_title.get("content", "")
-                main_part = content.split("|")[0].strip()
-                parts = main_part.split(" - ", 1)
-                name = parts[0].strip()
-                
-                if len(parts) > 1:
-                    headline = parts[1].strip()
-                    if " at " in headline:
-                        role_company = headline.split(" at ", 1)
-                        role = role_company[0].strip()
-                        company = role_company[1].strip()
-                    elif headline[0].isupper() and len(headline.split()) <= 4:
-                        company = headline
-                    else:
-                        role = headline
-        
-        # Final fallback to URL parsing
-        if name == "Unknown" or "Join LinkedIn" in name:
-            slug = url.split('/')[-1] or url.split('/')[-2]
-            name = slug.replace('-', ' ').title()
-        
-        return {
-            "name": name,
-            "role": role,
-            "company": company,
-            "location": location,
-            "industry": ""
-        }
+        snapshot_store.save(url, response.text)
+        result = parse_profile(response.text, url)
+        # Only pages that were actually fetched and parsed are cached
+        enrichment_cache.set(url, result)
+        return result
         
     except Exception as e:
         print(f"Scraping error: {e}")
-        slug = url.split('/')[-1] or url.split('/')[-2]
-        name = slug.replace('-', ' ').title()
-        return {
-            "name": name,
-            "role": "",
-            "company": "",
-            "location": "",
-            "industry": ""
-        }
+        return slug_profile(url)
+
+
+def _store_result(task_id: str, result: dict):
+    celery_app.backend.store_result(task_id, result, "SUCCESS")
+    task_events.publish(task_id, {"status": "Success", "data": result})
+
+
+@celery_app.task
+def enrich_profiles_task(items: list):
+    """
+    Async fetch mode for batches: [[url, task_id], ...] fetched concurrently
+    in this process. Each result is stored under its own task id as it
+    arrives, exactly as if enrich_linkedin_task had run with that id.
+    """
+    todo = []
+    for url, task_id in items:
+        cached = enrichment_cache.get(url)
+        if cached is not None:
+            _store_result(task_id, cached)
+            enrichment_cache.release(url, task_id)
+        else:
+            todo.append((url, task_id))
+
+    def store(index, result):
+        url, task_id = todo[index]
+        _store_result(task_id, result)
+        enrichment_cache.release(url, task_id)
+
+    async_fetch.enrich_many([url for url, _ in todo], on_result=store)
+    return len(items)
+
+
+@celery_app.task
+def continue_lane_task(items: list):
+    """Queue the next of a sync-mode batch lane's [[url, task_id], ...] items."""
+    import enrichment_batch
+
+    enrichment_batch.lane_head([tuple(item) for item in items]).apply_async()
+
+
+@celery_app.task
+def merge_tags_task(user_id: str, tag_type: str, sources: list, target: str):
+    """Background tag merge/rename for accounts too large to rewrite inline."""
+    from sqlmodel import Session
+    from database import engine
+    import tag_catalog
+    import tag_merge
+
+    client = tag_catalog.connect()
+    with Session(engine) as session:
+        return tag_merge.merge_tags(
+            session, user_id, tag_type, sources, target,
+            on_catalog_change=lambda changed: tag_catalog.publish_invalidation(client, changed),
+        )
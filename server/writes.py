@@ -0,0 +1,460 @@
+"""
+Single-statement write path.
+
+Each write is one INSERT/UPDATE ... RETURNING (Postgres, SQLite 3.35+)
+instead of flush, commit and a refresh SELECT. Ownership checks are folded
+into the WHERE clause, so a missing row and someone else's row look the
+same: no row comes back.
+
+These are Core statements, so the ORM before_insert/before_update
+listeners in models.py do not run; next_due and updated_at are set here.
+"""
+import json
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, case, delete, exists, insert, or_, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session
+
+from models import (
+    Connection, ConnectionUpdate, Log, TagDefinition, TagUsage, Tombstone, User, UserTagUsage,
+    compute_next_due, next_due_expression, tag_key,
+)
+from queries import ConnectionRow, LogRow, _columns, tags_json_contains
+
+USER_READ_FIELDS = (
+    "id", "firebase_uid", "email", "phone_number", "name",
+    "is_active", "is_onboarded", "created_at",
+)
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+def insert_connection(session: Session, user_id, data: dict) -> ConnectionRow:
+    """data is ConnectionCreate.dict(); returns the stored row."""
+    now = datetime.utcnow()
+    values = {key: value for key, value in data.items() if key != "tags"}
+    values.update(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        tags_json=json.dumps(data.get("tags", [])),
+        created_at=now,
+        updated_at=now,
+        next_due=compute_next_due(data.get("lastContact"), data.get("frequency"), now),
+    )
+    statement = insert(Connection).values(**values).returning(
+        *_columns(Connection, ConnectionRow.__slots__)
+    )
+    return ConnectionRow(session.connection().execute(statement).one())
+
+
+def _connection_update_values(data: dict) -> dict:
+    """SET clause for a partial update (ConnectionUpdate.dict(exclude_unset=True))."""
+    values = {key: value for key, value in data.items() if key != "tags"}
+    if "tags" in data:
+        values["tags_json"] = json.dumps(data["tags"])
+    if "lastContact" in data or "frequency" in data:
+        # SET expressions see the old row, so new values are passed in directly
+        values["next_due"] = next_due_expression(
+            _naive(data["lastContact"]) if "lastContact" in data else Connection.lastContact,
+            data["frequency"] if "frequency" in data else Connection.frequency,
+            Connection.created_at,
+        )
+    values["updated_at"] = datetime.utcnow()
+    return values
+
+
+class UpdatedConnectionRow(ConnectionRow):
+    """A ConnectionRow written by update_connection, with its tags before the write."""
+    __slots__ = ("previous_tags",)
+
+
+def _update_with_previous_tags(session: Session, statement, filters) -> list:
+    """
+    Run statement, an UPDATE of the Connection rows matching filters, and
+    return its RETURNING rows each followed by the row's tags before the
+    write, so usage counts only the tags a save adds.
+
+    On Postgres the old tags come from a self-join in the same statement,
+    locked FOR UPDATE: a concurrent save of the same row waits and then
+    sees this one's tags rather than the same old ones. SQLite's RETURNING
+    cannot read a FROM table, so there they are read first, in the same
+    transaction; SQLite runs one writer at a time.
+    """
+    statement = statement.where(*filters)
+    if session.get_bind().dialect.name == "postgresql":
+        old = select(Connection.id, Connection.tags_json).where(*filters).with_for_update().subquery("old")
+        rows = session.connection().execute(
+            statement.where(Connection.id == old.c.id).returning(old.c.tags_json)
+        ).all()
+        return [(*row[:-1], json.loads(row[-1])) for row in rows]
+    previous = dict(session.connection().execute(
+        select(Connection.id, Connection.tags_json).where(*filters)
+    ).all())
+    rows = session.connection().execute(statement.returning(Connection.id)).all()
+    return [(*row[:-1], json.loads(previous[row[-1]])) for row in rows]
+
+
+def update_connection(session: Session, user_id, connection_id: str, data: dict) -> Optional[ConnectionRow]:
+    """
+    Apply a partial update (ConnectionUpdate.dict(exclude_unset=True)).
+    Returns None when the connection does not exist or is not the user's.
+    With tags in data, the row is an UpdatedConnectionRow.
+    """
+    filters = [Connection.id == connection_id, Connection.user_id == user_id]
+    statement = (
+        update(Connection)
+        .values(**_connection_update_values(data))
+        .returning(*_columns(Connection, ConnectionRow.__slots__))
+    )
+    if "tags" in data:
+        rows = _update_with_previous_tags(session, statement, filters)
+        if not rows:
+            return None
+        return UpdatedConnectionRow(rows[0], ConnectionRow.__slots__ + UpdatedConnectionRow.__slots__)
+    row = session.connection().execute(statement.where(*filters)).one_or_none()
+    return ConnectionRow(row) if row is not None else None
+
+
+# Rows per bulk UPDATE; each batch is its own short transaction
+BULK_BATCH_SIZE = 500
+
+
+def bump_data_version(session: Session, user_id):
+    session.connection().execute(
+        update(User).where(User.id == user_id).values(data_version=User.data_version + 1)
+    )
+
+
+def id_batches(session: Session, model, filters, batch_size: int = BULK_BATCH_SIZE) -> Iterator[List[str]]:
+    """
+    Ids of the model's rows matching filters, in id order, batch_size at a
+    time. Each batch is selected fresh after the previous one (keyset on
+    id), so the caller may commit in between.
+    """
+    last_id = None
+    while True:
+        statement = select(model.id).where(*filters).order_by(model.id).limit(batch_size)
+        if last_id is not None:
+            statement = statement.where(model.id > last_id)
+        ids = list(session.connection().execute(statement).scalars())
+        if not ids:
+            return
+        yield ids
+        if len(ids) < batch_size:
+            return
+        last_id = ids[-1]
+
+
+def update_connections(
+    session: Session, user_id, connection_ids: List[str], data: dict
+) -> Tuple[int, List[List[str]]]:
+    """
+    Apply one partial update to many connections. Returns the affected row
+    count and, when data has tags, each updated row's tags before the write.
+    """
+    filters = [Connection.id.in_(connection_ids), Connection.user_id == user_id]
+    statement = update(Connection).values(**_connection_update_values(data))
+    if "tags" in data:
+        rows = _update_with_previous_tags(session, statement, filters)
+        return len(rows), [row[-1] for row in rows]
+    return session.connection().execute(statement.where(*filters)).rowcount, []
+
+
+def touch_last_contact(session: Session, user_id, connection_id: str, contacted_at: datetime) -> bool:
+    """
+    Move the connection's lastContact forward to contacted_at (never back).
+    Returns False when the connection is not the user's.
+    """
+    contacted_at = _naive(contacted_at)
+    newer = or_(Connection.lastContact.is_(None), Connection.lastContact < contacted_at)
+
+    def when_newer(value, otherwise):
+        return case((newer, value), else_=otherwise)
+
+    statement = (
+        update(Connection)
+        .where(Connection.id == connection_id, Connection.user_id == user_id)
+        .values(
+            lastContact=when_newer(contacted_at, Connection.lastContact),
+            next_due=when_newer(
+                next_due_expression(contacted_at, Connection.frequency, Connection.created_at),
+                Connection.next_due,
+            ),
+            updated_at=when_newer(datetime.utcnow(), Connection.updated_at),
+        )
+        .returning(Connection.id)
+    )
+    return session.connection().execute(statement).first() is not None
+
+
+ENRICHED_FIELDS = ("name", "role", "company", "location", "industry")
+
+
+def _enriched_value(field: str, value) -> Optional[str]:
+    """
+    A scraped value as ConnectionUpdate would store it (trimmed, length
+    checked); None for non-strings and values the API would reject.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return getattr(ConnectionUpdate.model_validate({field: value}), field)
+    except ValidationError:
+        return None
+
+
+def apply_enrichment(session: Session, user_id, connection_id: str, profile: dict) -> bool:
+    """
+    Fill the connection's empty enriched fields from profile, in one
+    conditional UPDATE. Fields that already have a value are the user's and
+    are kept. Returns False when nothing changed (nothing new to fill, or
+    not the user's connection), so the caller only bumps versions on a write.
+    """
+    def empty(column):
+        return or_(column.is_(None), column == "")
+
+    values, fills = {}, []
+    for field in ENRICHED_FIELDS:
+        value = _enriched_value(field, profile.get(field))
+        if not value:
+            continue
+        column = getattr(Connection, field)
+        values[field] = case((empty(column), value), else_=column)
+        fills.append(empty(column))
+    if not fills:
+        return False
+    statement = (
+        update(Connection)
+        .where(Connection.id == connection_id, Connection.user_id == user_id, or_(*fills))
+        .values(**values, updated_at=datetime.utcnow())
+        .returning(Connection.id)
+    )
+    return session.connection().execute(statement).first() is not None
+
+
+def insert_log(session: Session, user_id, data: dict) -> LogRow:
+    """data is LogCreate.dict(); returns the stored row."""
+    now = datetime.utcnow()
+    statement = insert(Log).values(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        connection_id=data.get("connection_id"),
+        type=data["type"],
+        notes=data["notes"],
+        tags_json=json.dumps(data.get("tags", [])),
+        created_at=data.get("created_at") or now,
+        updated_at=now,
+    ).returning(*_columns(Log, LogRow.__slots__))
+    return LogRow(session.connection().execute(statement).one())
+
+
+def update_user(session: Session, user_id, data: dict) -> dict:
+    """Apply a partial profile update and bump data_version in the same statement."""
+    statement = (
+        update(User)
+        .where(User.id == user_id)
+        .values(**data, data_version=User.data_version + 1)
+        .returning(*_columns(User, USER_READ_FIELDS))
+    )
+    return dict(session.connection().execute(statement).one()._mapping)
+
+
+def _upsert_counts(session: Session, model, rows: List[dict], key: List[str]):
+    """INSERT ... ON CONFLICT (key) DO UPDATE SET count = count + excluded.count."""
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(model).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=key, set_={"count": model.count + statement.excluded.count}
+    )
+    session.connection().execute(statement)
+
+
+def record_tag_usage(session: Session, user_id, tag_type: str, tags: List[str], times: int = 1):
+    """Count `times` uses of each tag, for the user and globally (two statements)."""
+    names = list(dict.fromkeys(tags))
+    if not names or times <= 0:
+        return
+    rows = [
+        {"type": tag_type, "name": name, "name_key": tag_key(name), "count": times}
+        for name in names
+    ]
+    _upsert_counts(session, TagUsage, rows, ["type", "name"])
+    _upsert_counts(
+        session, UserTagUsage, [{**row, "user_id": user_id} for row in rows],
+        ["user_id", "type", "name"],
+    )
+
+
+def record_added_tag_usage(
+    session: Session, user_id, tag_type: str, tags: List[str], previous: Iterable[List[str]]
+):
+    """
+    Count each of tags once for every row it was added to: previous holds
+    each updated row's tags before the write. Re-saving a row with the tags
+    it already had counts nothing, so edits do not inflate the ranking.
+    """
+    names = list(dict.fromkeys(tags))
+    added = Counter()
+    for old in previous:
+        old = set(old)
+        added.update(name for name in names if name not in old)
+    by_times = defaultdict(list)
+    for name, times in added.items():
+        by_times[times].append(name)
+    for times, group in by_times.items():
+        record_tag_usage(session, user_id, tag_type, group, times=times)
+
+
+# ===== Tag rename/merge =====
+
+# Rewrites a row's JSON tag list in place: sources become target, duplicates
+# collapse to their first position and the order is otherwise kept.
+_REWRITE_TAGS_SQL = {
+    "sqlite": """
+        UPDATE {table} SET updated_at = :now, tags_json = (
+            SELECT json_group_array(tag) FROM (
+                SELECT CASE WHEN je.value IN :sources THEN :target ELSE je.value END AS tag,
+                       min(je.key) AS position
+                FROM json_each({table}.tags_json) AS je
+                GROUP BY tag ORDER BY position
+            )
+        )
+        WHERE id IN :ids
+    """,
+    "postgresql": """
+        UPDATE {table} SET updated_at = :now, tags_json = (
+            SELECT coalesce(json_agg(tag ORDER BY position), '[]'::json)::text FROM (
+                SELECT CASE WHEN e.value IN :sources THEN :target ELSE e.value END AS tag,
+                       min(e.position) AS position
+                FROM json_array_elements_text({table}.tags_json::json)
+                     WITH ORDINALITY AS e(value, position)
+                GROUP BY 1
+            ) AS rewritten
+        )
+        WHERE id IN :ids
+    """,
+}
+
+
+def rewrite_tags(session: Session, model, ids: List[str], sources: List[str], target: str) -> int:
+    """Replace sources with target in the tags of the given rows, in one UPDATE."""
+    dialect = session.get_bind().dialect.name
+    statement = text(_REWRITE_TAGS_SQL[dialect].format(table=model.__tablename__)).bindparams(
+        bindparam("sources", expanding=True), bindparam("ids", expanding=True),
+    )
+    result = session.connection().execute(
+        statement,
+        {"now": datetime.utcnow(), "sources": sources, "target": target, "ids": ids},
+    )
+    return result.rowcount
+
+
+def ensure_tag_definition(session: Session, tag_type: str, name: str) -> bool:
+    """Add name to the catalog as a custom tag unless it is there already."""
+    return bool(ensure_tag_definitions(session, tag_type, [name]))
+
+
+def ensure_tag_definitions(session: Session, tag_type: str, names: List[str]) -> List[str]:
+    """
+    Add each of names missing from the catalog as a custom tag, checking
+    the database (never a cached catalog, which may lag a retirement) in one
+    SELECT. Returns the names added.
+    """
+    names = list(dict.fromkeys(names))
+    existing = set(session.connection().execute(
+        select(TagDefinition.name).where(TagDefinition.type == tag_type, TagDefinition.name.in_(names))
+    ).scalars())
+    added = [name for name in names if name not in existing]
+    if added:
+        session.connection().execute(insert(TagDefinition), [
+            {"type": tag_type, "category": "custom", "name": name, "is_custom": True} for name in added
+        ])
+    return added
+
+
+def retire_unused_tags(session: Session, model, tag_type: str, names: List[str]) -> List[str]:
+    """
+    Delete the custom catalog entries among names that no row of model uses
+    any more, for any user, and leave a tombstone (with no user, as the
+    catalog is shared) so /sync removes them from clients. Standard tags are
+    never removed.
+    """
+    retired = []
+    for name in names:
+        in_use = session.connection().execute(
+            select(exists().where(tags_json_contains(model.tags_json, name)))
+        ).scalar()
+        if in_use:
+            continue
+        deleted_id = session.connection().execute(
+            delete(TagDefinition).where(
+                TagDefinition.type == tag_type,
+                TagDefinition.name == name,
+                TagDefinition.is_custom.is_(True),
+            ).returning(TagDefinition.id)
+        ).scalar()
+        if deleted_id is not None:
+            session.connection().execute(
+                insert(Tombstone).values(
+                    user_id=None, entity_type="tag", entity_id=str(deleted_id),
+                    deleted_at=datetime.utcnow(),
+                )
+            )
+            retired.append(name)
+    return retired
+
+
+def merged_duplicates(session: Session, model, ids: List[str], names: List[str]) -> int:
+    """
+    Tag entries a merge of names into one tag removes from the given rows
+    (before rewrite_tags runs on them): a row keeps one however many of
+    names it carries.
+    """
+    names = set(names)
+    rows = session.connection().execute(select(model.tags_json).where(model.id.in_(ids))).scalars()
+    return sum(max(0, len(names.intersection(json.loads(tags_json))) - 1) for tags_json in rows)
+
+
+def move_tag_usage(
+    session: Session, user_id, tag_type: str, sources: List[str], target: str, duplicates: int = 0
+):
+    """
+    Fold the user's usage counts for sources into target, per user and
+    globally, less the duplicates the merge collapsed (see merged_duplicates),
+    so a row that carried several of them counts once.
+    """
+    mine = session.connection().execute(
+        select(UserTagUsage.name, UserTagUsage.count).where(
+            UserTagUsage.user_id == user_id,
+            UserTagUsage.type == tag_type,
+            UserTagUsage.name.in_(sources),
+        )
+    ).all()
+    if not mine:
+        return
+    session.connection().execute(
+        delete(UserTagUsage).where(
+            UserTagUsage.user_id == user_id,
+            UserTagUsage.type == tag_type,
+            UserTagUsage.name.in_(sources),
+        )
+    )
+    for name, count in mine:
+        session.connection().execute(
+            update(TagUsage)
+            .where(TagUsage.type == tag_type, TagUsage.name == name)
+            .values(count=TagUsage.count - count)
+        )
+    session.connection().execute(
+        delete(TagUsage).where(TagUsage.type == tag_type, TagUsage.count <= 0)
+    )
+    record_tag_usage(
+        session, user_id, tag_type, [target], times=sum(count for _, count in mine) - duplicates
+    )